@@ -0,0 +1,284 @@
+"""
+Sérialisation des documents archivés (devis et factures)
+
+Deux formats de fichier sont pris en charge : JSON (*.json, historique) et
+le format binaire compact de format_archive (*.minv). Chaque fichier est
+autonome : il contient l'instantané de l'entreprise.
+"""
+import json
+import os
+import weakref
+from datetime import datetime
+from decimal import Decimal
+from typing import Callable, Optional
+from models import Client, Article, Devis, Facture, Entreprise, calculer_totaux
+import format_archive
+
+
+# Extension des archives au format compact
+EXTENSION_ARCHIVE = ".minv"
+
+# Entreprises des documents chargés : une seule instance par instantané
+_entreprises_partagees = weakref.WeakValueDictionary()
+
+
+def type_document(document) -> str:
+    """Retourne le libellé du type de document ("Devis" ou "Facture")"""
+    return "Devis" if isinstance(document, Devis) else "Facture"
+
+
+def document_vers_dict(document, type_doc: str) -> dict:
+    """Convertit un document en dictionnaire sérialisable en JSON"""
+    data = {
+        'numero': document.numero,
+        'date': document.date.isoformat(),
+        'entreprise': {
+            'nom': document.entreprise.nom,
+            'adresse': document.entreprise.adresse,
+            'code_postal': document.entreprise.code_postal,
+            'ville': document.entreprise.ville,
+            'siret': document.entreprise.siret,
+            'tva_intracommunautaire': document.entreprise.tva_intracommunautaire,
+            'telephone': document.entreprise.telephone,
+            'email': document.entreprise.email,
+            'logo': document.entreprise.logo
+        },
+        'client': {
+            'nom': document.client.nom,
+            'prenom': document.client.prenom,
+            'entreprise': document.client.entreprise,
+            'adresse': document.client.adresse,
+            'code_postal': document.client.code_postal,
+            'ville': document.client.ville,
+            'email': document.client.email,
+            'telephone': document.client.telephone
+        },
+        'articles': [
+            {
+                'designation': art.designation,
+                'quantite': float(art.quantite),
+                'prix_unitaire': float(art.prix_unitaire),
+                'tva': float(art.tva)
+            } for art in document.articles
+        ],
+        'conditions': document.conditions,
+        'notes': document.notes,
+        'type': type_doc.lower()
+    }
+
+    # Ajouter les champs spécifiques
+    if isinstance(document, Devis):
+        data['validite_jours'] = document.validite_jours
+    elif isinstance(document, Facture):
+        data['date_echeance'] = document.date_echeance.isoformat()
+        data['reference_devis'] = document.reference_devis
+        data['payee'] = document.payee
+
+    return data
+
+
+def entreprise_depuis_dict(data: dict) -> Entreprise:
+    """
+    Retourne l'Entreprise correspondant à un instantané d'archive
+
+    Tous les documents chargés avec le même instantané partagent la même
+    instance : elle ne doit pas être modifiée en place.
+    """
+    cle = tuple(sorted(data.items()))
+    entreprise = _entreprises_partagees.get(cle)
+    if entreprise is None:
+        entreprise = Entreprise(**data)
+        _entreprises_partagees[cle] = entreprise
+    return entreprise
+
+
+def articles_depuis_liste(articles_data: list) -> list:
+    """Reconstitue les articles depuis leur liste de dictionnaires d'archive"""
+    return [
+        Article(
+            designation=art_data['designation'],
+            quantite=Decimal(str(art_data['quantite'])),
+            prix_unitaire=Decimal(str(art_data['prix_unitaire'])),
+            tva=Decimal(str(art_data['tva']))
+        ) for art_data in articles_data
+    ]
+
+
+def document_depuis_dict(data: dict, articles: Optional[list] = None, entreprise: Optional[Entreprise] = None):
+    """
+    Reconstitue un document depuis son dictionnaire d'archive
+
+    Args:
+        data: Dictionnaire d'archive
+        articles: Articles déjà reconstitués (sinon lus depuis data)
+        entreprise: Entreprise déjà reconstituée (sinon instance partagée lue depuis data)
+
+    Returns:
+        Tuple (document, type) où type vaut 'devis' ou 'facture'
+    """
+    # Reconstituer l'entreprise (instance partagée entre documents)
+    if entreprise is None:
+        entreprise = entreprise_depuis_dict(data['entreprise'])
+
+    # Reconstituer le client
+    client = Client(**data['client'])
+
+    # Reconstituer les articles
+    if articles is None:
+        articles = articles_depuis_liste(data['articles'])
+
+    # Créer le document approprié
+    if data['type'] == 'devis':
+        document = Devis(
+            numero=data['numero'],
+            date=datetime.fromisoformat(data['date']),
+            client=client,
+            articles=articles,
+            entreprise=entreprise,
+            conditions=data['conditions'],
+            notes=data['notes'],
+            validite_jours=data['validite_jours']
+        )
+    else:  # facture
+        document = Facture(
+            numero=data['numero'],
+            date=datetime.fromisoformat(data['date']),
+            client=client,
+            articles=articles,
+            entreprise=entreprise,
+            conditions=data['conditions'],
+            notes=data['notes'],
+            date_echeance=datetime.fromisoformat(data['date_echeance']),
+            reference_devis=data.get('reference_devis', ''),
+            payee=data.get('payee', False)
+        )
+
+    return document, data['type']
+
+
+def ecrire_fichier_archive(document, type_doc: str, filename: str):
+    """
+    Écrit un document dans un fichier d'archive
+
+    Le format dépend de l'extension : compact pour *.minv, JSON sinon.
+    L'écriture passe par un fichier temporaire : une archive existante n'est
+    jamais laissée à moitié écrite.
+    """
+    data = document_vers_dict(document, type_doc)
+    if filename.endswith(EXTENSION_ARCHIVE):
+        contenu = format_archive.encoder(data)
+    else:
+        contenu = json.dumps(data, ensure_ascii=False, indent=4).encode('utf-8')
+
+    temporaire = f"{filename}.tmp"
+    try:
+        with open(temporaire, 'wb') as f:
+            f.write(contenu)
+        os.replace(temporaire, filename)
+    except BaseException:
+        if os.path.exists(temporaire):
+            os.remove(temporaire)
+        raise
+
+
+def lire_donnees_archive(filename: str) -> dict:
+    """Lit le dictionnaire d'archive d'un fichier JSON ou compact"""
+    with open(filename, 'rb') as f:
+        contenu = f.read()
+    if format_archive.est_archive_compacte(contenu):
+        return format_archive.decoder(contenu)
+    return json.loads(contenu.decode('utf-8'))
+
+
+def lire_fichier_archive(filename: str):
+    """Lit un fichier d'archive (JSON ou compact) et reconstitue le document"""
+    return document_depuis_dict(lire_donnees_archive(filename))
+
+
+class DocumentArchive:
+    """
+    Vue paresseuse d'un document archivé
+
+    Les champs d'en-tête (type, numéro, date, client, total, payée) sont
+    disponibles immédiatement. Le contenu complet de l'archive n'est lu qu'au
+    premier accès aux articles, au client ou au document, puis conservé.
+    """
+    __slots__ = ("id", "type", "numero", "date_iso", "client_nom", "payee",
+                 "_total_ttc", "_charger_donnees", "_donnees", "_articles")
+
+    def __init__(self, type: str, numero: str, date_iso: str, client_nom: str,
+                 total_ttc: Optional[Decimal] = None, payee: bool = False,
+                 donnees: Optional[dict] = None,
+                 charger_donnees: Optional[Callable[[], dict]] = None, id: Optional[int] = None):
+        self.id = id
+        self.type = type
+        self.numero = numero
+        self.date_iso = date_iso
+        self.client_nom = client_nom
+        self.payee = payee
+        self._total_ttc = total_ttc
+        self._charger_donnees = charger_donnees
+        self._donnees = donnees
+        self._articles = None
+
+    @classmethod
+    def depuis_dict(cls, data: dict) -> "DocumentArchive":
+        """Crée une vue sur un dictionnaire d'archive déjà lu"""
+        client = data['client']
+        nom_client = client.get('entreprise') or f"{client.get('prenom', '')} {client.get('nom', '')}".strip()
+        return cls(
+            type=data['type'],
+            numero=data['numero'],
+            date_iso=data['date'],
+            client_nom=nom_client,
+            payee=data.get('payee', False),
+            donnees=data,
+        )
+
+    @classmethod
+    def depuis_fichier(cls, filename: str) -> "DocumentArchive":
+        """Crée une vue sur un fichier d'archive (JSON ou compact)"""
+        return cls.depuis_dict(lire_donnees_archive(filename))
+
+    def __repr__(self):
+        return f"DocumentArchive(type={self.type!r}, numero={self.numero!r}, date={self.date_iso!r}, client={self.client_nom!r})"
+
+    @property
+    def date(self) -> datetime:
+        """Date du document"""
+        return datetime.fromisoformat(self.date_iso)
+
+    @property
+    def donnees(self) -> dict:
+        """Dictionnaire complet de l'archive (chargé au premier accès)"""
+        if self._donnees is None:
+            self._donnees = self._charger_donnees()
+        return self._donnees
+
+    @property
+    def client(self) -> Client:
+        """Client du document"""
+        return Client(**self.donnees['client'])
+
+    @property
+    def articles(self) -> list:
+        """Articles du document (reconstitués au premier accès)"""
+        if self._articles is None:
+            self._articles = articles_depuis_liste(self.donnees['articles'])
+        return self._articles
+
+    @property
+    def total_ttc(self) -> Decimal:
+        """Total TTC (lu depuis l'index si disponible, sinon calculé)"""
+        if self._total_ttc is None:
+            self._total_ttc = calculer_totaux(self.articles).total_ttc
+        return self._total_ttc
+
+    def document(self):
+        """
+        Reconstitue le document complet
+
+        Returns:
+            Tuple (document, type) où type vaut 'devis' ou 'facture'
+        """
+        return document_depuis_dict(self.donnees, list(self.articles))
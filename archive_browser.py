@@ -0,0 +1,222 @@
+"""
+Navigateur des archives - liste paginée des devis et factures archivés
+"""
+from PyQt6.QtWidgets import (QWidget, QVBoxLayout, QHBoxLayout, QLabel, QLineEdit,
+                             QPushButton, QComboBox, QTableView, QAbstractItemView,
+                             QHeaderView)
+from PyQt6.QtCore import Qt, QAbstractTableModel, QModelIndex, pyqtSignal
+
+
+# Nombre de lignes chargées à chaque défilement
+TAILLE_PAGE = 200
+
+# (titre de colonne, clé de tri de ArchiveStore.lister)
+COLONNES = [
+    ("Type", "type"),
+    ("Numéro", "numero"),
+    ("Date", "date"),
+    ("Client", "client"),
+    ("Total TTC", "total"),
+    ("Payée", "payee"),
+]
+
+
+class ArchiveTableModel(QAbstractTableModel):
+    """Modèle de table qui charge les archives page par page depuis ArchiveStore"""
+
+    def __init__(self, archive_store, parent=None):
+        super().__init__(parent)
+        self.archive_store = archive_store
+        self.filtres = {}
+        self.tri = "date"
+        self.decroissant = True
+        self.lignes = []
+        self.total = 0
+        self.recharger()
+
+    def recharger(self):
+        """Recharge la première page avec les filtres et le tri courants"""
+        self.beginResetModel()
+        self.total = self.archive_store.compter(**self.filtres)
+        self.lignes = self._page(0)
+        self.endResetModel()
+
+    def _page(self, decalage):
+        """Lit une page d'en-têtes dans la base"""
+        return self.archive_store.lister(
+            tri=self.tri, decroissant=self.decroissant,
+            limite=TAILLE_PAGE, decalage=decalage, **self.filtres
+        )
+
+    def definir_filtres(self, **filtres):
+        """Applique de nouveaux filtres (type_doc, client, payee, texte...)"""
+        self.filtres = {cle: valeur for cle, valeur in filtres.items() if valeur not in (None, "")}
+        # Une recherche plein texte est classée par pertinence
+        if "texte" in self.filtres:
+            self.tri = "pertinence"
+        elif self.tri == "pertinence":
+            self.tri, self.decroissant = "date", True
+        self.recharger()
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.lignes)
+
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(COLONNES)
+
+    def canFetchMore(self, parent=QModelIndex()):
+        return not parent.isValid() and len(self.lignes) < self.total
+
+    def fetchMore(self, parent=QModelIndex()):
+        page = self._page(len(self.lignes))
+        if not page:
+            self.total = len(self.lignes)
+            return
+        self.beginInsertRows(QModelIndex(), len(self.lignes), len(self.lignes) + len(page) - 1)
+        self.lignes.extend(page)
+        self.endInsertRows()
+
+    def headerData(self, section, orientation, role=Qt.ItemDataRole.DisplayRole):
+        if role == Qt.ItemDataRole.DisplayRole and orientation == Qt.Orientation.Horizontal:
+            return COLONNES[section][0]
+        return None
+
+    def data(self, index, role=Qt.ItemDataRole.DisplayRole):
+        if not index.isValid():
+            return None
+        entete = self.lignes[index.row()]
+        colonne = index.column()
+
+        if role == Qt.ItemDataRole.DisplayRole:
+            if colonne == 0:
+                return entete.type.capitalize()
+            if colonne == 1:
+                return entete.numero
+            if colonne == 2:
+                return entete.date.strftime("%d/%m/%Y")
+            if colonne == 3:
+                return entete.client_nom
+            if colonne == 4:
+                return f"{entete.total_ttc:.2f} €"
+            if colonne == 5:
+                if entete.type != "facture":
+                    return ""
+                return "Oui" if entete.payee else "Non"
+        elif role == Qt.ItemDataRole.TextAlignmentRole and colonne == 4:
+            return int(Qt.AlignmentFlag.AlignRight | Qt.AlignmentFlag.AlignVCenter)
+        return None
+
+    def sort(self, column, order=Qt.SortOrder.AscendingOrder):
+        self.tri = COLONNES[column][1]
+        self.decroissant = order == Qt.SortOrder.DescendingOrder
+        self.recharger()
+
+    def id_document(self, row):
+        """Retourne l'identifiant en base du document affiché à la ligne donnée"""
+        return self.lignes[row].id
+
+
+class ArchiveBrowser(QWidget):
+    """Fenêtre de consultation des archives"""
+
+    # Émis avec l'identifiant en base du document à ouvrir
+    document_selectionne = pyqtSignal(int)
+
+    def __init__(self, archive_store, parent=None):
+        super().__init__(parent, Qt.WindowType.Window)
+        self.setWindowTitle("Archives")
+        self.resize(900, 600)
+        self.archive_store = archive_store
+
+        self.setup_ui()
+
+    def setup_ui(self):
+        """Configure l'interface de la fenêtre"""
+        layout = QVBoxLayout(self)
+        layout.setContentsMargins(10, 10, 10, 10)
+
+        # Recherche plein texte
+        recherche_layout = QHBoxLayout()
+        recherche_layout.addWidget(QLabel("Rechercher:"))
+        self.recherche_entry = QLineEdit()
+        self.recherche_entry.setPlaceholderText("Désignation, client, email, notes...")
+        self.recherche_entry.returnPressed.connect(self.appliquer_filtres)
+        recherche_layout.addWidget(self.recherche_entry)
+        layout.addLayout(recherche_layout)
+        
+        # Filtres
+        filtres_layout = QHBoxLayout()
+
+        filtres_layout.addWidget(QLabel("Type:"))
+        self.type_combo = QComboBox()
+        self.type_combo.addItem("Tous", None)
+        self.type_combo.addItem("Devis", "devis")
+        self.type_combo.addItem("Factures", "facture")
+        self.type_combo.currentIndexChanged.connect(self.appliquer_filtres)
+        filtres_layout.addWidget(self.type_combo)
+
+        filtres_layout.addWidget(QLabel("Client:"))
+        self.client_filtre = QLineEdit()
+        self.client_filtre.setPlaceholderText("Début du nom du client")
+        self.client_filtre.returnPressed.connect(self.appliquer_filtres)
+        filtres_layout.addWidget(self.client_filtre)
+
+        btn_filtrer = QPushButton("Filtrer")
+        btn_filtrer.clicked.connect(self.appliquer_filtres)
+        filtres_layout.addWidget(btn_filtrer)
+
+        layout.addLayout(filtres_layout)
+
+        # Table des archives
+        self.model = ArchiveTableModel(self.archive_store, self)
+
+        self.table = QTableView()
+        self.table.setModel(self.model)
+        self.table.setSortingEnabled(True)
+        self.table.sortByColumn(2, Qt.SortOrder.DescendingOrder)
+        self.table.setSelectionBehavior(QAbstractItemView.SelectionBehavior.SelectRows)
+        self.table.setSelectionMode(QAbstractItemView.SelectionMode.SingleSelection)
+        self.table.setEditTriggers(QAbstractItemView.EditTrigger.NoEditTriggers)
+        self.table.verticalHeader().setVisible(False)
+        self.table.horizontalHeader().setSectionResizeMode(3, QHeaderView.ResizeMode.Stretch)
+        self.table.doubleClicked.connect(self.ouvrir_selection)
+        layout.addWidget(self.table)
+
+        # Compteur et boutons
+        bas_layout = QHBoxLayout()
+        self.label_total = QLabel()
+        bas_layout.addWidget(self.label_total)
+        bas_layout.addStretch()
+
+        btn_ouvrir = QPushButton("Ouvrir")
+        btn_ouvrir.clicked.connect(self.ouvrir_selection)
+        btn_ouvrir.setDefault(True)
+        bas_layout.addWidget(btn_ouvrir)
+
+        btn_fermer = QPushButton("Fermer")
+        btn_fermer.clicked.connect(self.close)
+        bas_layout.addWidget(btn_fermer)
+
+        layout.addLayout(bas_layout)
+
+        self.model.modelReset.connect(self.mettre_a_jour_total)
+        self.mettre_a_jour_total()
+
+    def appliquer_filtres(self):
+        """Recharge la liste avec les filtres saisis"""
+        self.model.definir_filtres(
+            type_doc=self.type_combo.currentData(),
+            client=self.client_filtre.text().strip(),
+            texte=self.recherche_entry.text().strip(),
+        )
+
+    def mettre_a_jour_total(self):
+        """Affiche le nombre de documents correspondant aux filtres"""
+        self.label_total.setText(f"{self.model.total} document(s)")
+
+    def ouvrir_selection(self):
+        """Demande l'ouverture du document sélectionné"""
+        index = self.table.currentIndex()
+        if not index.isValid():
+            return
+        self.document_selectionne.emit(self.model.id_document(index.row()))
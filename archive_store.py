@@ -0,0 +1,472 @@
+"""
+Stockage indexé des archives (SQLite)
+
+Remplace le parcours des fichiers archives/<type>_<numero>.json pour les
+recherches et listings : les champs d'en-tête (numéro, date, client, type,
+total, payée) sont indexés, le document complet est conservé au format
+compact de format_archive. Les instantanés d'entreprise sont rangés une seule
+fois dans la table entreprises (adressée par empreinte) et référencés par
+identifiant depuis chaque document.
+Un index plein texte (FTS5) couvre les désignations d'articles, le client,
+son email, les notes et les conditions.
+"""
+import argparse
+import glob
+import json
+import os
+import re
+import sqlite3
+import sys
+from datetime import datetime, timedelta
+from decimal import Decimal
+from typing import Callable, List, Optional
+
+from archive import (document_vers_dict, document_depuis_dict, lire_donnees_archive,
+                     DocumentArchive, EXTENSION_ARCHIVE)
+import format_archive
+from repertoire_clients import _borne_prefixe
+
+
+# Version du schéma de la base (PRAGMA user_version)
+SCHEMA_VERSION = 5
+
+# Clé de la table etat marquant la fin de l'import initial des fichiers d'archive
+ETAT_IMPORT_FICHIERS = "import_fichiers"
+
+# Colonnes autorisées pour le tri des listings
+COLONNES_TRI = {
+    "numero": "numero",
+    "date": "date",
+    "client": "client_nom",
+    "total": "CAST(total_ttc AS REAL)",
+    "payee": "payee",
+    "type": "type",
+    "pertinence": "documents_fts.rank",
+}
+
+
+def _decoder_donnees(valeur) -> dict:
+    """Décode la colonne donnees (format compact, ou JSON texte avant la version 3)"""
+    if isinstance(valeur, bytes):
+        return format_archive.decoder(valeur)
+    return json.loads(valeur)
+
+
+def requete_plein_texte(texte: str) -> str:
+    """Convertit une saisie libre en requête FTS5 (tous les mots, en préfixe)"""
+    mots = re.findall(r"\w+", texte)
+    return " ".join(f'"{mot}"*' for mot in mots)
+
+
+class ArchiveStore:
+    """Base SQLite des devis et factures archivés"""
+
+    def __init__(self, chemin: str):
+        self.chemin = chemin
+        self.connexion = sqlite3.connect(chemin)
+        self.connexion.row_factory = sqlite3.Row
+        self.connexion.execute("PRAGMA journal_mode=WAL")
+        self.connexion.execute("PRAGMA synchronous=NORMAL")
+
+        # Instantanés d'entreprise déjà lus : empreinte -> id, id -> dictionnaire
+        self._ids_entreprises = {}
+        self._entreprises = {}
+        self._creer_schema()
+
+        # True tant que l'import initial des fichiers d'archive n'a pas abouti
+        self.nouvelle = self.connexion.execute(
+            "SELECT 1 FROM etat WHERE cle = ?", (ETAT_IMPORT_FICHIERS,)).fetchone() is None
+
+    def _version_schema(self) -> int:
+        """Retourne la version du schéma de la base"""
+        return self.connexion.execute("PRAGMA user_version").fetchone()[0]
+
+    def _creer_schema(self):
+        """Crée les tables et index si nécessaire"""
+        with self.connexion:
+            self.connexion.executescript("""
+                CREATE TABLE IF NOT EXISTS entreprises (
+                    id INTEGER PRIMARY KEY,
+                    empreinte TEXT NOT NULL UNIQUE,
+                    donnees BLOB NOT NULL
+                );
+                CREATE TABLE IF NOT EXISTS documents (
+                    id INTEGER PRIMARY KEY,
+                    type TEXT NOT NULL,
+                    numero TEXT NOT NULL,
+                    date TEXT NOT NULL,
+                    client_nom TEXT NOT NULL COLLATE NOCASE,
+                    total_ttc TEXT NOT NULL,
+                    payee INTEGER NOT NULL DEFAULT 0,
+                    donnees BLOB NOT NULL,
+                    entreprise_id INTEGER REFERENCES entreprises (id),
+                    UNIQUE (type, numero)
+                );
+                CREATE INDEX IF NOT EXISTS idx_documents_numero ON documents (numero);
+                CREATE INDEX IF NOT EXISTS idx_documents_date ON documents (date);
+                CREATE INDEX IF NOT EXISTS idx_documents_client ON documents (client_nom);
+                CREATE INDEX IF NOT EXISTS idx_documents_type ON documents (type, date);
+                CREATE INDEX IF NOT EXISTS idx_documents_payee ON documents (payee, date);
+                CREATE VIRTUAL TABLE IF NOT EXISTS documents_fts USING fts5(
+                    reference, client, email, designations, notes, conditions,
+                    tokenize = 'unicode61 remove_diacritics 2'
+                );
+                CREATE TABLE IF NOT EXISTS etat (
+                    cle TEXT PRIMARY KEY,
+                    valeur TEXT NOT NULL
+                );
+            """)
+            # Version 1 -> 2 : indexer en plein texte les documents existants
+            if 0 < self._version_schema() < 2:
+                for ligne in self.connexion.execute("SELECT id, donnees FROM documents").fetchall():
+                    self._indexer_texte(ligne['id'], _decoder_donnees(ligne['donnees']))
+            # Version 2 -> 3 : JSON texte -> format compact
+            if 0 < self._version_schema() < 3:
+                for ligne in self.connexion.execute(
+                        "SELECT id, donnees FROM documents WHERE typeof(donnees) = 'text'").fetchall():
+                    self.connexion.execute(
+                        "UPDATE documents SET donnees = ? WHERE id = ?",
+                        (format_archive.encoder(json.loads(ligne['donnees'])), ligne['id'])
+                    )
+            # Version 3 -> 4 : instantanés d'entreprise sortis des documents
+            if 0 < self._version_schema() < 4:
+                self._migrer_entreprises()
+            # Version 4 -> 5 : les bases existantes ont été importées à leur création
+            if 0 < self._version_schema() < 5:
+                self._marquer_import_termine()
+            self.connexion.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+
+    def _marquer_import_termine(self):
+        """Enregistre la fin de l'import initial des fichiers d'archive (sans gérer la transaction)"""
+        self.connexion.execute(
+            "INSERT OR REPLACE INTO etat (cle, valeur) VALUES (?, ?)",
+            (ETAT_IMPORT_FICHIERS, datetime.now().isoformat(timespec="seconds"))
+        )
+
+    def _migrer_entreprises(self):
+        """Déplace l'entreprise incluse dans chaque document vers la table entreprises"""
+        colonnes = [ligne['name'] for ligne in self.connexion.execute("PRAGMA table_info(documents)")]
+        if 'entreprise_id' not in colonnes:
+            self.connexion.execute(
+                "ALTER TABLE documents ADD COLUMN entreprise_id INTEGER REFERENCES entreprises (id)")
+        lignes = self.connexion.execute(
+            "SELECT id, donnees FROM documents WHERE entreprise_id IS NULL").fetchall()
+        for ligne in lignes:
+            donnees, id_entreprise = self._separer_entreprise(_decoder_donnees(ligne['donnees']))
+            self.connexion.execute(
+                "UPDATE documents SET donnees = ?, entreprise_id = ? WHERE id = ?",
+                (format_archive.encoder(donnees), id_entreprise, ligne['id'])
+            )
+
+    def _separer_entreprise(self, data: dict) -> tuple:
+        """
+        Range l'entreprise d'un dictionnaire d'archive dans la table entreprises
+
+        Returns:
+            Tuple (dictionnaire sans entreprise, identifiant de l'instantané)
+        """
+        data = dict(data)
+        entreprise = data.pop('entreprise')
+        empreinte = format_archive.empreinte_entreprise(entreprise)
+
+        id_entreprise = self._ids_entreprises.get(empreinte)
+        if id_entreprise is None:
+            self.connexion.execute(
+                "INSERT OR IGNORE INTO entreprises (empreinte, donnees) VALUES (?, ?)",
+                (empreinte, format_archive.encoder(entreprise))
+            )
+            id_entreprise = self.connexion.execute(
+                "SELECT id FROM entreprises WHERE empreinte = ?", (empreinte,)
+            ).fetchone()[0]
+            self._ids_entreprises[empreinte] = id_entreprise
+        return data, id_entreprise
+
+    def _donnees_entreprise(self, id_entreprise: int) -> dict:
+        """Instantané d'entreprise (lu une seule fois par identifiant)"""
+        entreprise = self._entreprises.get(id_entreprise)
+        if entreprise is None:
+            ligne = self.connexion.execute(
+                "SELECT donnees FROM entreprises WHERE id = ?", (id_entreprise,)
+            ).fetchone()
+            entreprise = format_archive.decoder(ligne['donnees'])
+            self._entreprises[id_entreprise] = entreprise
+        return entreprise
+
+    def fermer(self):
+        """Ferme la connexion à la base"""
+        self.connexion.close()
+
+    def enregistrer(self, document, type_doc: str) -> int:
+        """Enregistre (ou remplace) un document et retourne son identifiant"""
+        try:
+            with self.connexion:
+                return self._inserer(document, document_vers_dict(document, type_doc))
+        except Exception:
+            # Un instantané d'entreprise inséré dans la transaction annulée n'existe plus
+            self._ids_entreprises.clear()
+            raise
+
+    def enregistrer_lot(self, documents) -> List[int]:
+        """
+        Enregistre (ou remplace) plusieurs documents en une seule transaction
+
+        Args:
+            documents: Tuples (document, type)
+
+        Returns:
+            Identifiants des documents, dans l'ordre ; rien n'est écrit si
+            l'un d'eux échoue
+        """
+        try:
+            with self.connexion:
+                return [self._inserer(document, document_vers_dict(document, type_doc))
+                        for document, type_doc in documents]
+        except Exception:
+            # Un instantané d'entreprise inséré dans la transaction annulée n'existe plus
+            self._ids_entreprises.clear()
+            raise
+
+    def existe(self, type_doc: str, numero: str) -> bool:
+        """Indique si un document de ce type porte déjà ce numéro"""
+        return self.connexion.execute(
+            "SELECT 1 FROM documents WHERE type = ? AND numero = ?", (type_doc.lower(), numero)
+        ).fetchone() is not None
+
+    def _inserer(self, document, data: dict) -> int:
+        """Insère un document sans gérer la transaction"""
+        donnees, id_entreprise = self._separer_entreprise(data)
+        self.connexion.execute("""
+            INSERT INTO documents (type, numero, date, client_nom, total_ttc, payee, donnees, entreprise_id)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+            ON CONFLICT (type, numero) DO UPDATE SET
+                date = excluded.date,
+                client_nom = excluded.client_nom,
+                total_ttc = excluded.total_ttc,
+                payee = excluded.payee,
+                donnees = excluded.donnees,
+                entreprise_id = excluded.entreprise_id
+        """, (
+            data['type'],
+            data['numero'],
+            data['date'],
+            document.client.get_nom_complet(),
+            str(document.get_total_ttc()),
+            int(bool(data.get('payee', False))),
+            format_archive.encoder(donnees),
+            id_entreprise,
+        ))
+        id_document = self.connexion.execute(
+            "SELECT id FROM documents WHERE type = ? AND numero = ?", (data['type'], data['numero'])
+        ).fetchone()[0]
+        self._indexer_texte(id_document, data)
+        return id_document
+
+    def _indexer_texte(self, id_document: int, data: dict):
+        """Met à jour l'index plein texte d'un document"""
+        client = data['client']
+        self.connexion.execute("DELETE FROM documents_fts WHERE rowid = ?", (id_document,))
+        self.connexion.execute("""
+            INSERT INTO documents_fts (rowid, reference, client, email, designations, notes, conditions)
+            VALUES (?, ?, ?, ?, ?, ?, ?)
+        """, (
+            id_document,
+            f"{data['numero']} {data.get('reference_devis', '')}",
+            " ".join(filter(None, (client.get('entreprise'), client.get('prenom'), client.get('nom'), client.get('ville')))),
+            client.get('email', ''),
+            "\n".join(article['designation'] for article in data['articles']),
+            data.get('notes', ''),
+            data.get('conditions', ''),
+        ))
+
+    def charger(self, id_document: int):
+        """
+        Charge un document complet par son identifiant
+
+        Returns:
+            Tuple (document, type) ou (None, None) si absent
+        """
+        donnees = self.charger_donnees(id_document)
+        if donnees is None:
+            return None, None
+        return document_depuis_dict(donnees)
+
+    def charger_donnees(self, id_document: int) -> Optional[dict]:
+        """Charge le dictionnaire d'archive complet d'un document"""
+        ligne = self.connexion.execute(
+            "SELECT donnees, entreprise_id FROM documents WHERE id = ?", (id_document,)
+        ).fetchone()
+        if ligne is None:
+            return None
+        data = _decoder_donnees(ligne['donnees'])
+        if ligne['entreprise_id'] is not None:
+            data['entreprise'] = self._donnees_entreprise(ligne['entreprise_id'])
+        return data
+
+    def charger_numero(self, numero: str, type_doc: Optional[str] = None):
+        """Charge un document par son numéro (et éventuellement son type)"""
+        requete = "SELECT id FROM documents WHERE numero = ?"
+        params = [numero]
+        if type_doc:
+            requete += " AND type = ?"
+            params.append(type_doc.lower())
+        ligne = self.connexion.execute(requete, params).fetchone()
+        if ligne is None:
+            return None, None
+        return self.charger(ligne['id'])
+
+    def _filtres(self, type_doc=None, client=None, payee=None, date_debut=None, date_fin=None, texte=None):
+        """Construit la jointure plein texte, la clause WHERE et leurs paramètres"""
+        jointure = ""
+        conditions = []
+        params = []
+        requete = requete_plein_texte(texte) if texte else ""
+        if requete:
+            jointure = "JOIN documents_fts ON documents_fts.rowid = documents.id"
+            conditions.append("documents_fts MATCH ?")
+            params.append(requete)
+        if type_doc:
+            conditions.append("type = ?")
+            params.append(type_doc.lower())
+        if client:
+            # Intervalle de préfixe plutôt que LIKE : % et _ d'un nom ne sont pas des jokers
+            conditions.append("client_nom >= ? AND client_nom < ?")
+            params += [client, _borne_prefixe(client)]
+        if payee is not None:
+            conditions.append("payee = ?")
+            params.append(int(payee))
+        if date_debut:
+            conditions.append("date >= ?")
+            params.append(date_debut.isoformat())
+        if date_fin:
+            # Jour de fin inclus en entier : comparaison au lendemain 00:00
+            jour_fin = date_fin.date() if isinstance(date_fin, datetime) else date_fin
+            conditions.append("date < ?")
+            params.append((jour_fin + timedelta(days=1)).isoformat())
+        clause = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+        return f"{jointure} {clause}", params
+
+    def lister(self, type_doc: Optional[str] = None, client: Optional[str] = None,
+               payee: Optional[bool] = None, date_debut=None, date_fin=None,
+               texte: Optional[str] = None, tri: str = "date", decroissant: bool = True,
+               limite: int = 100, decalage: int = 0) -> List[DocumentArchive]:
+        """
+        Liste les documents archivés, page par page
+
+        Seuls les champs d'en-tête indexés sont lus ; le contenu complet de
+        chaque document n'est chargé qu'à l'accès à ses articles.
+
+        Args:
+            type_doc: "devis" ou "facture" (tous si None)
+            client: Préfixe du nom du client
+            payee: Filtre sur le statut payé des factures
+            date_debut, date_fin: Bornes de date (datetime ou date), jour de fin inclus
+            texte: Recherche plein texte (désignations, client, email, notes...)
+            tri: Colonne de tri (numero, date, client, total, payee, type,
+                 ou pertinence si une recherche plein texte est active)
+            decroissant: Ordre de tri décroissant
+            limite, decalage: Pagination
+        """
+        clause, params = self._filtres(type_doc, client, payee, date_debut, date_fin, texte)
+        if tri == "pertinence" and "MATCH" not in clause:
+            tri = "date"
+        colonne = COLONNES_TRI.get(tri, "date")
+        ordre = "DESC" if decroissant else "ASC"
+        if tri == "pertinence":
+            # rank FTS5 : plus petit = plus pertinent
+            ordre = "ASC"
+        lignes = self.connexion.execute(f"""
+            SELECT documents.id, type, numero, date, client_nom, total_ttc, payee
+            FROM documents {clause}
+            ORDER BY {colonne} {ordre}, documents.id {ordre}
+            LIMIT ? OFFSET ?
+        """, params + [limite, decalage]).fetchall()
+        return [self._vue(ligne) for ligne in lignes]
+
+    def compter(self, type_doc: Optional[str] = None, client: Optional[str] = None,
+                payee: Optional[bool] = None, date_debut=None, date_fin=None,
+                texte: Optional[str] = None) -> int:
+        """Compte les documents correspondant aux filtres"""
+        clause, params = self._filtres(type_doc, client, payee, date_debut, date_fin, texte)
+        return self.connexion.execute(f"SELECT COUNT(*) FROM documents {clause}", params).fetchone()[0]
+
+    def rechercher(self, texte: str, limite: int = 50, decalage: int = 0, **filtres) -> List[DocumentArchive]:
+        """Recherche plein texte, résultats classés par pertinence et paginés"""
+        return self.lister(texte=texte, tri="pertinence", limite=limite, decalage=decalage, **filtres)
+
+    def _vue(self, ligne) -> DocumentArchive:
+        """Convertit une ligne SQL en vue paresseuse DocumentArchive"""
+        id_document = ligne['id']
+        return DocumentArchive(
+            id=id_document,
+            type=ligne['type'],
+            numero=ligne['numero'],
+            date_iso=ligne['date'],
+            client_nom=ligne['client_nom'],
+            total_ttc=Decimal(ligne['total_ttc']),
+            payee=bool(ligne['payee']),
+            charger_donnees=lambda: self.charger_donnees(id_document),
+        )
+
+    def importer_json(self, dossier: str, taille_lot: int = 500,
+                      interrompre: Optional[Callable[[], bool]] = None) -> tuple:
+        """
+        Importe les archives existantes d'un dossier (JSON et compactes)
+
+        Les fichiers sont validés par transactions de taille_lot documents
+        (la base reste accessible en écriture aux autres connexions). La fin
+        de l'import n'est enregistrée qu'après le dernier lot : un import
+        interrompu est repris à l'ouverture suivante (un document déjà
+        importé est simplement remplacé).
+
+        Args:
+            interrompre: Fonction consultée avant chaque lot, arrête l'import si elle retourne True
+
+        Returns:
+            Tuple (nombre importés, liste des (fichier, erreur))
+        """
+        nb_importes = 0
+        erreurs = []
+        fichiers = sorted(glob.glob(os.path.join(dossier, "*.json")) +
+                          glob.glob(os.path.join(dossier, f"*{EXTENSION_ARCHIVE}")))
+        for debut in range(0, len(fichiers), taille_lot):
+            if interrompre is not None and interrompre():
+                return nb_importes, erreurs
+            try:
+                with self.connexion:
+                    for fichier in fichiers[debut:debut + taille_lot]:
+                        try:
+                            data = lire_donnees_archive(fichier)
+                            document, _ = document_depuis_dict(data)
+                            self._inserer(document, data)
+                            nb_importes += 1
+                        except Exception as e:
+                            erreurs.append((fichier, str(e)))
+            except Exception:
+                # Un instantané d'entreprise inséré dans la transaction annulée n'existe plus
+                self._ids_entreprises.clear()
+                raise
+        with self.connexion:
+            self._marquer_import_termine()
+        self.nouvelle = False
+        return nb_importes, erreurs
+
+
+def main(argv=None):
+    """Import en ligne de commande des archives (JSON et compactes) dans la base"""
+    parser = argparse.ArgumentParser(description="Import des archives myInvo dans la base indexée")
+    parser.add_argument("dossier", nargs="?", default="archives", help="Dossier des archives")
+    parser.add_argument("--base", default=None, help="Chemin de la base (par défaut: <dossier>/archives.db)")
+    args = parser.parse_args(argv)
+
+    store = ArchiveStore(args.base or os.path.join(args.dossier, "archives.db"))
+    nb_importes, erreurs = store.importer_json(args.dossier)
+    store.fermer()
+
+    for fichier, erreur in erreurs:
+        print(f"ERREUR  {fichier} - {erreur}")
+    print(f"{nb_importes} document(s) importé(s) - {len(erreurs)} erreur(s)")
+    return 1 if erreurs else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,173 @@
+"""
+Génération de PDF en lot, sans interface graphique
+
+Répartit le rendu d'une liste de devis/factures (ou de fichiers d'archive)
+sur un pool de processus. Chaque processus conserve son propre PDFGenerator.
+
+Utilisation en ligne de commande (archives .minv, ou .json plus anciennes) :
+    python batch.py archives/*.minv archives/*.json -o export/ -j 8
+    python batch.py archives/facture_*.minv --fusion export/janvier.pdf
+"""
+import argparse
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from dataclasses import dataclass
+from typing import Iterable, Iterator, Optional, Union
+
+from archive import lire_fichier_archive, type_document
+from models import Document
+
+
+# Générateur propre à chaque processus du pool (initialisé une seule fois)
+_generateur = None
+
+
+@dataclass
+class ResultatRendu:
+    """Résultat du rendu d'un document"""
+    source: str
+    numero: str = ""
+    fichier: str = ""
+    duree: float = 0.0
+    erreur: str = ""
+    nb_documents: int = 1
+
+    @property
+    def succes(self) -> bool:
+        """True si le PDF a été généré sans erreur"""
+        return not self.erreur
+
+
+def _initialiser_worker(dossier_cache: Optional[str] = None):
+    """Crée le PDFGenerator du processus (appelé une fois par worker)"""
+    global _generateur
+    from pdf_generator import PDFGenerator
+    from cache_rendu import CacheRendu
+    _generateur = PDFGenerator(cache=CacheRendu(dossier_cache) if dossier_cache else None)
+
+
+def _rendre_document(source: Union[Document, str], dossier_sortie: str, is_trial: bool) -> ResultatRendu:
+    """Rend un document dans le processus courant"""
+    debut = time.perf_counter()
+    nom_source = source if isinstance(source, str) else getattr(source, "numero", "")
+    resultat = ResultatRendu(source=nom_source)
+    try:
+        if _generateur is None:
+            _initialiser_worker()
+
+        if isinstance(source, str):
+            document, _ = lire_fichier_archive(source)
+        else:
+            document = source
+
+        type_label = type_document(document)
+        fichier = os.path.join(dossier_sortie, f"{type_label}_{document.numero}.pdf")
+        _generateur.generer_pdf(document, fichier, type_label, is_trial)
+
+        resultat.numero = document.numero
+        resultat.fichier = fichier
+    except Exception as e:
+        resultat.erreur = f"{type(e).__name__}: {e}"
+    resultat.duree = time.perf_counter() - debut
+    return resultat
+
+
+def generer_lot(sources: Iterable[Union[Document, str]], dossier_sortie: str,
+                max_workers: Optional[int] = None, is_trial: bool = False,
+                dossier_cache: Optional[str] = None) -> Iterator[ResultatRendu]:
+    """
+    Génère les PDF d'une liste de documents sur un pool de processus
+
+    Args:
+        sources: Instances de Devis/Facture ou chemins de fichiers d'archive (JSON ou compacts)
+        dossier_sortie: Dossier dans lequel écrire les PDF
+        max_workers: Nombre de processus (par défaut: nombre de cœurs)
+        is_trial: True si version d'essai (ajoute un filigrane)
+        dossier_cache: Dossier du cache des rendus (désactivé si None)
+
+    Yields:
+        Un ResultatRendu par document, dans l'ordre de fin de rendu
+    """
+    os.makedirs(dossier_sortie, exist_ok=True)
+
+    with ProcessPoolExecutor(max_workers=max_workers, initializer=_initialiser_worker,
+                             initargs=(dossier_cache,)) as executor:
+        futures = [
+            executor.submit(_rendre_document, source, dossier_sortie, is_trial)
+            for source in sources
+        ]
+        for future in as_completed(futures):
+            yield future.result()
+
+
+def generer_fusion(sources: Iterable[Union[Document, str]], fichier_sortie: str,
+                   is_trial: bool = False, signets: bool = True) -> ResultatRendu:
+    """
+    Génère un seul PDF regroupant tous les documents (triés par date puis numéro)
+
+    Args:
+        sources: Instances de Devis/Facture ou chemins de fichiers d'archive (JSON ou compacts)
+        fichier_sortie: Chemin du PDF regroupé
+        is_trial: True si version d'essai (ajoute un filigrane)
+        signets: True pour ajouter un signet par document
+    """
+    from pdf_generator import PDFGenerator
+
+    debut = time.perf_counter()
+    resultat = ResultatRendu(source=fichier_sortie, fichier=fichier_sortie)
+    try:
+        documents = [lire_fichier_archive(source)[0] if isinstance(source, str) else source
+                     for source in sources]
+        documents.sort(key=lambda document: (document.date, document.numero))
+
+        dossier = os.path.dirname(fichier_sortie)
+        if dossier:
+            os.makedirs(dossier, exist_ok=True)
+        resultat.nb_documents = PDFGenerator().generer_pdf_groupe(documents, fichier_sortie, is_trial, signets)
+    except Exception as e:
+        resultat.erreur = f"{type(e).__name__}: {e}"
+    resultat.duree = time.perf_counter() - debut
+    return resultat
+
+
+def main(argv=None):
+    """Point d'entrée de la ligne de commande"""
+    parser = argparse.ArgumentParser(description="Génération de PDF en lot depuis les archives myInvo")
+    parser.add_argument("fichiers", nargs="+", help="Fichiers d'archive à rendre (.minv ou .json)")
+    parser.add_argument("-o", "--sortie", default="export", help="Dossier de sortie des PDF")
+    parser.add_argument("-j", "--processus", type=int, default=None, help="Nombre de processus")
+    parser.add_argument("--essai", action="store_true", help="Ajouter le filigrane de version d'essai")
+    parser.add_argument("--cache", default=None, help="Dossier du cache des rendus PDF")
+    parser.add_argument("--fusion", metavar="FICHIER", default=None,
+                        help="Regrouper tous les documents dans ce seul PDF")
+    parser.add_argument("--sans-signets", action="store_true", help="Ne pas ajouter de signet par document (avec --fusion)")
+    args = parser.parse_args(argv)
+
+    if args.fusion:
+        resultat = generer_fusion(args.fichiers, args.fusion, args.essai, not args.sans_signets)
+        if resultat.succes:
+            print(f"OK      {resultat.duree * 1000:8.1f} ms  {resultat.fichier} ({resultat.nb_documents} document(s))")
+            return 0
+        print(f"ERREUR  {resultat.duree * 1000:8.1f} ms  {resultat.fichier} - {resultat.erreur}")
+        return 1
+
+    debut = time.perf_counter()
+    nb_erreurs = 0
+    nb_total = 0
+    for resultat in generer_lot(args.fichiers, args.sortie, args.processus, args.essai, args.cache):
+        nb_total += 1
+        if resultat.succes:
+            print(f"OK      {resultat.duree * 1000:8.1f} ms  {resultat.fichier}")
+        else:
+            nb_erreurs += 1
+            print(f"ERREUR  {resultat.duree * 1000:8.1f} ms  {resultat.source} - {resultat.erreur}")
+
+    duree = time.perf_counter() - debut
+    print(f"{nb_total} document(s) en {duree:.2f} s - {nb_erreurs} erreur(s)")
+    return 1 if nb_erreurs else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,8 @@
+"""
+Bancs d'essai de performance de myInvo (rendu PDF, calcul des totaux, archives)
+
+Utilisation :
+    python -m benchmarks
+    python -m benchmarks --enregistrer-reference benchmarks/reference.json
+    python -m benchmarks --comparer benchmarks/reference.json
+"""
@@ -0,0 +1,238 @@
+"""
+Lanceur des bancs d'essai : python -m benchmarks [options]
+"""
+import argparse
+import io
+import json
+import os
+import statistics
+import sys
+import tempfile
+import time
+import tracemalloc
+from dataclasses import dataclass, asdict
+
+from archive import ecrire_fichier_archive, lire_fichier_archive, type_document
+from archive_store import ArchiveStore
+from benchmarks.donnees import PROFILS, creer_document, creer_logo_svg
+
+
+SCENARIOS = ("pdf", "totaux", "archive")
+
+
+@dataclass
+class Resultat:
+    """Mesures d'un scénario"""
+    nom: str
+    repetitions: int
+    p50_ms: float
+    p99_ms: float
+    moyenne_ms: float
+    debit_par_s: float
+    memoire_max_ko: float
+
+
+def _centile(durees, centile):
+    """Centile (0-100) d'une liste de durées, par interpolation linéaire"""
+    valeurs = sorted(durees)
+    if len(valeurs) == 1:
+        return valeurs[0]
+    position = (len(valeurs) - 1) * centile / 100
+    bas = int(position)
+    haut = min(bas + 1, len(valeurs) - 1)
+    return valeurs[bas] + (valeurs[haut] - valeurs[bas]) * (position - bas)
+
+
+def mesurer(nom, fonction, repetitions, preparer=None):
+    """
+    Exécute un scénario et retourne ses mesures
+
+    Args:
+        nom: Nom du scénario
+        fonction: Appelable mesuré (reçoit le résultat de preparer s'il est fourni)
+        repetitions: Nombre d'exécutions chronométrées
+        preparer: Appelable non chronométré exécuté avant chaque mesure
+    """
+    def executer():
+        argument = preparer() if preparer else None
+        debut = time.perf_counter()
+        if preparer:
+            fonction(argument)
+        else:
+            fonction()
+        return time.perf_counter() - debut
+
+    # Échauffement (caches, imports)
+    executer()
+
+    durees = [executer() for _ in range(repetitions)]
+
+    # Pic mémoire mesuré sur une exécution séparée (tracemalloc ralentit le code)
+    argument = preparer() if preparer else None
+    tracemalloc.start()
+    if preparer:
+        fonction(argument)
+    else:
+        fonction()
+    _, pic = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    moyenne = statistics.fmean(durees)
+    return Resultat(
+        nom=nom,
+        repetitions=repetitions,
+        p50_ms=_centile(durees, 50) * 1000,
+        p99_ms=_centile(durees, 99) * 1000,
+        moyenne_ms=moyenne * 1000,
+        debit_par_s=1 / moyenne if moyenne else 0.0,
+        memoire_max_ko=pic / 1024,
+    )
+
+
+def _repetitions(profil, repetitions):
+    """Réduit le nombre de répétitions pour les gros documents"""
+    return repetitions if PROFILS[profil] < 1000 else max(3, repetitions // 10)
+
+
+def scenarios_pdf(profils, repetitions, dossier):
+    """Rendu PDF : chaque étape _creer_* puis la mise en page (doc.build)"""
+    from reportlab.lib.pagesizes import A4
+    from reportlab.lib.units import mm
+    from reportlab.platypus import SimpleDocTemplate
+    from pdf_generator import PDFGenerator
+
+    logo_svg = creer_logo_svg(dossier)
+    resultats = []
+    for profil in profils:
+        n = _repetitions(profil, repetitions)
+        for variante, logo in (("sans_logo", ""), ("logo_svg", logo_svg)):
+            prefixe = f"pdf/{profil}/{variante}"
+
+            # Générateur et document neufs à chaque mesure : le décodage du logo
+            # et le calcul des montants des articles sont toujours inclus
+            def neufs(profil=profil, logo=logo):
+                document = creer_document(profil, logo=logo)
+                return PDFGenerator(), document, type_document(document)
+
+            def story_neuve(neufs=neufs):
+                generateur, document, type_doc = neufs()
+                return generateur._construire_story(document, type_doc, False)
+
+            resultats.append(mesurer(f"{prefixe}/entete",
+                                     lambda a: a[0]._creer_entete(a[1], a[2]), n, preparer=neufs))
+            resultats.append(mesurer(f"{prefixe}/infos_parties",
+                                     lambda a: a[0]._creer_infos_parties(a[1]), n, preparer=neufs))
+            resultats.append(mesurer(f"{prefixe}/tableau_articles",
+                                     lambda a: a[0]._creer_tableau_articles(a[1]), n, preparer=neufs))
+            resultats.append(mesurer(f"{prefixe}/totaux",
+                                     lambda a: a[0]._creer_totaux(a[1]), n, preparer=neufs))
+
+            def construire(story):
+                doc = SimpleDocTemplate(io.BytesIO(), pagesize=A4, rightMargin=20*mm,
+                                        leftMargin=20*mm, topMargin=20*mm, bottomMargin=20*mm)
+                doc.build(story)
+
+            resultats.append(mesurer(f"{prefixe}/build", construire, n, preparer=story_neuve))
+            resultats.append(mesurer(f"{prefixe}/total",
+                                     lambda a: a[0].generer_pdf_bytes(a[1], a[2]), n, preparer=neufs))
+    return resultats
+
+
+def scenarios_totaux(profils, repetitions, dossier):
+    """Détail de TVA par taux d'un document (Document.get_tva_par_taux)"""
+    resultats = []
+    for profil in profils:
+        # Document neuf à chaque mesure : les montants des articles ne sont pas encore en cache
+        resultats.append(mesurer(f"totaux/{profil}",
+                                 lambda document: document.get_tva_par_taux(),
+                                 _repetitions(profil, repetitions),
+                                 preparer=lambda profil=profil: creer_document(profil)))
+    return resultats
+
+
+def scenarios_archive(profils, repetitions, dossier):
+    """
+    Chargement d'un document archivé (fichier JSON et base indexée)
+
+    archive/*/json mesure lire_fichier_archive, tout le travail de
+    charger_document (méthode de la fenêtre principale, hors interface).
+    """
+    store = ArchiveStore(os.path.join(dossier, "bench.db"))
+    resultats = []
+    for profil in profils:
+        document = creer_document(profil)
+        type_doc = type_document(document)
+        fichier = os.path.join(dossier, f"{profil}.json")
+        ecrire_fichier_archive(document, type_doc, fichier)
+        id_document = store.enregistrer(document, type_doc)
+
+        n = _repetitions(profil, repetitions)
+        resultats.append(mesurer(f"archive/{profil}/json", lambda: lire_fichier_archive(fichier), n))
+        resultats.append(mesurer(f"archive/{profil}/base", lambda: store.charger(id_document), n))
+    store.fermer()
+    return resultats
+
+
+def afficher(resultats, reference=None):
+    """Affiche les résultats (et l'écart par rapport à la référence)"""
+    print(f"{'Scénario':45} {'p50 ms':>10} {'p99 ms':>10} {'débit/s':>10} {'mém. Ko':>10} {'écart p50':>10}")
+    for r in resultats:
+        ecart = ""
+        if reference and r.nom in reference:
+            ecart = f"{(r.p50_ms / reference[r.nom]['p50_ms'] - 1) * 100:+.1f}%"
+        print(f"{r.nom:45} {r.p50_ms:10.3f} {r.p99_ms:10.3f} {r.debit_par_s:10.1f} {r.memoire_max_ko:10.1f} {ecart:>10}")
+
+
+def regressions(resultats, reference, tolerance):
+    """Liste les scénarios dont la médiane dépasse la référence de plus de tolerance"""
+    return [
+        (r.nom, reference[r.nom]['p50_ms'], r.p50_ms)
+        for r in resultats
+        if r.nom in reference and r.p50_ms > reference[r.nom]['p50_ms'] * (1 + tolerance)
+    ]
+
+
+def main(argv=None):
+    """Point d'entrée des bancs d'essai"""
+    parser = argparse.ArgumentParser(description="Bancs d'essai de performance myInvo")
+    parser.add_argument("--scenarios", default=",".join(SCENARIOS),
+                        help=f"Scénarios à exécuter, séparés par des virgules ({', '.join(SCENARIOS)})")
+    parser.add_argument("--profils", default=",".join(PROFILS),
+                        help=f"Profils de document ({', '.join(PROFILS)})")
+    parser.add_argument("-n", "--repetitions", type=int, default=20, help="Nombre de répétitions par scénario")
+    parser.add_argument("--enregistrer-reference", metavar="FICHIER", help="Enregistre les résultats comme référence")
+    parser.add_argument("--comparer", metavar="FICHIER", help="Compare les résultats à une référence")
+    parser.add_argument("--tolerance", type=float, default=0.2,
+                        help="Régression tolérée sur la médiane (0.2 = +20%%)")
+    args = parser.parse_args(argv)
+
+    profils = [p for p in args.profils.split(",") if p]
+    fonctions = {"pdf": scenarios_pdf, "totaux": scenarios_totaux, "archive": scenarios_archive}
+
+    resultats = []
+    with tempfile.TemporaryDirectory() as dossier:
+        for scenario in args.scenarios.split(","):
+            resultats.extend(fonctions[scenario](profils, args.repetitions, dossier))
+
+    reference = None
+    if args.comparer:
+        with open(args.comparer, 'r', encoding='utf-8') as f:
+            reference = json.load(f)
+
+    afficher(resultats, reference)
+
+    if args.enregistrer_reference:
+        with open(args.enregistrer_reference, 'w', encoding='utf-8') as f:
+            json.dump({r.nom: asdict(r) for r in resultats}, f, ensure_ascii=False, indent=4)
+        print(f"Référence enregistrée: {args.enregistrer_reference}")
+
+    if reference:
+        lentes = regressions(resultats, reference, args.tolerance)
+        for nom, avant, apres in lentes:
+            print(f"RÉGRESSION  {nom}: {avant:.3f} ms -> {apres:.3f} ms")
+        return 1 if lentes else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,101 @@
+"""
+Génération de documents synthétiques pour les bancs d'essai
+"""
+import os
+import random
+from datetime import datetime
+from decimal import Decimal
+
+from models import Client, Article, Devis, Facture, Entreprise
+
+
+# Nombre d'articles par profil de document
+PROFILS = {
+    "petit": 3,
+    "typique": 25,
+    "gros": 5000,
+}
+
+TAUX_TVA = [Decimal("20.0"), Decimal("10.0"), Decimal("5.5"), Decimal("2.1")]
+
+DESIGNATIONS = [
+    "Prestation de conseil", "Développement logiciel", "Maintenance annuelle",
+    "Formation utilisateurs", "Licence logicielle", "Installation sur site",
+    "Fourniture de matériel", "Déplacement", "Support technique", "Audit de sécurité",
+]
+
+LOGO_SVG = """<?xml version="1.0" encoding="UTF-8"?>
+<svg xmlns="http://www.w3.org/2000/svg" width="200" height="200" viewBox="0 0 200 200">
+  <circle cx="100" cy="100" r="90" fill="#0078d4" stroke="#ffffff" stroke-width="4"/>
+  {formes}
+  <text x="100" y="115" font-family="Helvetica" font-size="48" fill="#ffffff" text-anchor="middle">mI</text>
+</svg>
+"""
+
+
+def creer_logo_svg(dossier: str, nb_formes: int = 200) -> str:
+    """Écrit un logo SVG synthétique (avec nb_formes éléments) et retourne son chemin"""
+    aleatoire = random.Random(0)
+    formes = "\n  ".join(
+        f'<rect x="{aleatoire.randint(20, 170)}" y="{aleatoire.randint(20, 170)}" '
+        f'width="8" height="8" fill="#ffffff" opacity="0.3"/>'
+        for _ in range(nb_formes)
+    )
+    chemin = os.path.join(dossier, "logo_bench.svg")
+    with open(chemin, 'w', encoding='utf-8') as f:
+        f.write(LOGO_SVG.format(formes=formes))
+    return chemin
+
+
+def creer_entreprise(logo: str = "") -> Entreprise:
+    """Crée l'entreprise émettrice des documents synthétiques"""
+    return Entreprise(
+        nom="Entreprise Bench",
+        adresse="1 rue des Mesures",
+        code_postal="75000",
+        ville="Paris",
+        siret="123 456 789 00010",
+        tva_intracommunautaire="FR12345678901",
+        telephone="01 23 45 67 89",
+        email="bench@exemple.fr",
+        logo=logo,
+    )
+
+
+def creer_articles(nb_articles: int, graine: int = 0) -> list:
+    """Crée une liste d'articles reproductible"""
+    aleatoire = random.Random(graine)
+    return [
+        Article(
+            designation=f"{aleatoire.choice(DESIGNATIONS)} - lot {i + 1}",
+            quantite=Decimal(aleatoire.choice(["1", "2", "0.5", "1.5", "10"])),
+            prix_unitaire=Decimal(aleatoire.randint(100, 500000)) / 100,
+            tva=aleatoire.choice(TAUX_TVA),
+        )
+        for i in range(nb_articles)
+    ]
+
+
+def creer_document(profil: str = "typique", type_doc: str = "Facture", logo: str = "", graine: int = 0):
+    """Crée un devis ou une facture synthétique selon le profil demandé"""
+    nb_articles = PROFILS[profil]
+    client = Client(
+        nom="Dupont",
+        prenom="Marie",
+        entreprise="Client Bench SARL",
+        adresse="10 avenue des Tests",
+        code_postal="69000",
+        ville="Lyon",
+        email="marie.dupont@exemple.fr",
+        telephone="04 00 00 00 00",
+    )
+    classe = Devis if type_doc == "Devis" else Facture
+    return classe(
+        numero=f"BENCH-{profil}-{graine}",
+        date=datetime(2025, 1, 15),
+        client=client,
+        articles=creer_articles(nb_articles, graine),
+        entreprise=creer_entreprise(logo),
+        conditions="Paiement à 30 jours.",
+        notes="Document généré pour les bancs d'essai.",
+    )
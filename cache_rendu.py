@@ -0,0 +1,165 @@
+"""
+Cache disque des PDF générés, adressé par le contenu du document
+
+La clé est une empreinte SHA-256 du document sérialisé (entreprise comprise),
+de l'empreinte du logo, du thème et du mode d'essai. Un second rendu d'un
+document inchangé devient une simple copie de fichier.
+"""
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+
+from archive import document_vers_dict
+
+
+# À incrémenter lorsque la mise en page des PDF change (invalide le cache)
+VERSION_RENDU = 1
+
+# Taille maximale par défaut du cache (octets)
+TAILLE_MAX_CACHE = 200 * 1024 * 1024
+
+# Nombre maximal d'écritures entre deux parcours complets du dossier
+ECRITURES_ENTRE_PARCOURS = 50
+
+# Une éviction ramène le cache à cette fraction de la taille maximale, pour
+# que les écritures suivantes ne déclenchent pas chacune un parcours
+FRACTION_APRES_EVICTION = 0.9
+
+
+def empreinte_fichier(chemin: str):
+    """Empreinte légère d'un fichier (chemin, date de modification, taille)"""
+    if not chemin or not os.path.exists(chemin):
+        return None
+    stat = os.stat(chemin)
+    return [os.path.abspath(chemin), stat.st_mtime_ns, stat.st_size]
+
+
+class CacheRendu:
+    """Cache LRU de PDF sur disque, borné en taille"""
+
+    def __init__(self, dossier: str, taille_max: int = TAILLE_MAX_CACHE):
+        self.dossier = dossier
+        self.taille_max = taille_max
+        os.makedirs(dossier, exist_ok=True)
+        # Taille du dossier au dernier parcours, augmentée des écritures depuis
+        # (None : jamais parcouru). D'autres processus peuvent aussi écrire :
+        # le dossier est reparcouru toutes les ECRITURES_ENTRE_PARCOURS écritures.
+        self._taille_estimee = None
+        self._ecritures = 0
+
+    def cle(self, document, type_doc: str, is_trial: bool, theme=None) -> str:
+        """Calcule la clé de cache d'un rendu"""
+        donnees = document_vers_dict(document, type_doc)
+        # Valeurs Decimal en texte : 2 et 2.0 sont égaux mais s'impriment différemment
+        donnees['articles'] = [
+            [article.designation, str(article.quantite), str(article.prix_unitaire), str(article.tva)]
+            for article in document.articles
+        ]
+        contenu = {
+            "version": VERSION_RENDU,
+            "document": donnees,
+            "logo": empreinte_fichier(document.entreprise.logo),
+            "essai": bool(is_trial),
+            "theme": repr(theme),
+        }
+        texte = json.dumps(contenu, ensure_ascii=False, sort_keys=True, separators=(',', ':'))
+        return hashlib.sha256(texte.encode('utf-8')).hexdigest()
+
+    def _chemin(self, cle: str) -> str:
+        """Chemin du PDF en cache pour une clé"""
+        return os.path.join(self.dossier, f"{cle}.pdf")
+
+    def obtenir(self, cle: str, destination) -> bool:
+        """
+        Copie le PDF en cache vers la destination (chemin ou flux binaire)
+
+        Returns:
+            True si le PDF était en cache
+        """
+        chemin = self._chemin(cle)
+        try:
+            if isinstance(destination, str):
+                shutil.copyfile(chemin, destination)
+            else:
+                with open(chemin, 'rb') as f:
+                    shutil.copyfileobj(f, destination)
+            # Marquer l'entrée comme récemment utilisée (éviction LRU)
+            os.utime(chemin)
+        except FileNotFoundError:
+            return False
+        return True
+
+    def ajouter(self, cle: str, source: str):
+        """Ajoute au cache le PDF généré à l'emplacement source"""
+        with open(source, 'rb') as f:
+            self._ecrire(cle, f)
+
+    def ajouter_contenu(self, cle: str, contenu: bytes):
+        """Ajoute au cache un PDF généré en mémoire"""
+        self._ecrire(cle, contenu)
+
+    def _ecrire(self, cle: str, source):
+        """Écrit une entrée de façon atomique puis applique la limite de taille"""
+        descripteur, temporaire = tempfile.mkstemp(dir=self.dossier, suffix=".tmp")
+        try:
+            with os.fdopen(descripteur, 'wb') as f:
+                if isinstance(source, bytes):
+                    f.write(source)
+                else:
+                    shutil.copyfileobj(source, f)
+            taille = os.path.getsize(temporaire)
+            os.replace(temporaire, self._chemin(cle))
+        except BaseException:
+            if os.path.exists(temporaire):
+                os.remove(temporaire)
+            raise
+
+        # Parcours du dossier seulement si la limite peut être dépassée
+        self._ecritures += 1
+        if (self._taille_estimee is None or self._ecritures >= ECRITURES_ENTRE_PARCOURS
+                or self._taille_estimee + taille > self.taille_max):
+            self.evincer()
+        else:
+            self._taille_estimee += taille
+
+    def evincer(self):
+        """
+        Supprime les entrées les moins récemment utilisées si la taille maximale est dépassée
+
+        Le cache est alors ramené à FRACTION_APRES_EVICTION de sa taille maximale.
+        """
+        entrees = []
+        taille_totale = 0
+        for entree in os.scandir(self.dossier):
+            if not entree.name.endswith(".pdf"):
+                continue
+            try:
+                stat = entree.stat()
+            except FileNotFoundError:
+                continue
+            entrees.append((stat.st_mtime, stat.st_size, entree.path))
+            taille_totale += stat.st_size
+
+        entrees.sort()
+        cible = self.taille_max * FRACTION_APRES_EVICTION if taille_totale > self.taille_max else self.taille_max
+        for _, taille, chemin in entrees:
+            if taille_totale <= cible:
+                break
+            try:
+                os.remove(chemin)
+            except FileNotFoundError:
+                pass
+            taille_totale -= taille
+
+        self._taille_estimee = taille_totale
+        self._ecritures = 0
+
+    def vider(self):
+        """Supprime toutes les entrées du cache"""
+        for entree in os.scandir(self.dossier):
+            if entree.name.endswith(".pdf"):
+                os.remove(entree.path)
+        self._taille_estimee = 0
+        self._ecritures = 0
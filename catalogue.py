@@ -0,0 +1,274 @@
+"""
+Catalogue des articles et prestations (SQLite)
+
+Chaque désignation (normalisée) n'y figure qu'une fois, avec le dernier prix
+unitaire et le dernier taux de TVA pratiqués. La recherche utilise un index
+de préfixe sur la désignation complète, puis un index des mots de la
+désignation pour les correspondances qui ne commencent pas au premier mot.
+"""
+import argparse
+import os
+import sqlite3
+import sys
+from dataclasses import dataclass
+from datetime import datetime
+from decimal import Decimal
+from typing import Callable, Iterable, List, Optional, Tuple
+
+from repertoire_clients import normaliser, _borne_prefixe
+
+
+# Au-delà de ce nombre d'articles, un mot est considéré comme fréquent
+PLAFOND_FREQUENCE = 5000
+
+
+@dataclass
+class EntreeCatalogue:
+    """Article du catalogue"""
+    designation: str
+    prix_unitaire: Decimal
+    tva: Decimal
+    nb_utilisations: int = 0
+
+
+class CatalogueArticles:
+    """Base SQLite des articles déjà facturés"""
+
+    def __init__(self, chemin: str):
+        self.chemin = chemin
+        self.connexion = sqlite3.connect(chemin)
+        self.connexion.row_factory = sqlite3.Row
+        self.connexion.execute("PRAGMA journal_mode=WAL")
+        self.connexion.execute("PRAGMA synchronous=NORMAL")
+
+        # True tant que l'import initial des archives n'a pas abouti (PRAGMA
+        # user_version n'est écrit qu'à la fin de importer_archives)
+        self.nouveau = self.connexion.execute("PRAGMA user_version").fetchone()[0] == 0
+        self._creer_schema()
+
+    def _creer_schema(self):
+        """Crée les tables et index si nécessaire"""
+        with self.connexion:
+            self.connexion.executescript("""
+                CREATE TABLE IF NOT EXISTS catalogue (
+                    id INTEGER PRIMARY KEY,
+                    designation TEXT NOT NULL,
+                    designation_normalisee TEXT NOT NULL UNIQUE,
+                    prix_unitaire TEXT NOT NULL,
+                    tva TEXT NOT NULL,
+                    derniere_utilisation TEXT NOT NULL,
+                    nb_utilisations INTEGER NOT NULL DEFAULT 0
+                );
+                CREATE TABLE IF NOT EXISTS catalogue_mots (
+                    mot TEXT NOT NULL,
+                    article_id INTEGER NOT NULL,
+                    PRIMARY KEY (mot, article_id)
+                ) WITHOUT ROWID;
+            """)
+
+    def fermer(self):
+        """Ferme la connexion à la base"""
+        self.connexion.close()
+
+    def enregistrer(self, articles: Iterable, date: Optional[datetime] = None) -> int:
+        """
+        Ajoute au catalogue les articles d'un document (ou met à jour leur prix)
+
+        Returns:
+            Nombre d'articles enregistrés
+        """
+        date = date or datetime.now()
+        nb_articles = 0
+        with self.connexion:
+            for article in articles:
+                self._inserer(article.designation, article.prix_unitaire, article.tva, date)
+                nb_articles += 1
+        return nb_articles
+
+    def enregistrer_lot(self, documents: Iterable[Tuple[Iterable, datetime]]) -> int:
+        """
+        Ajoute au catalogue les articles de plusieurs documents en une seule transaction
+
+        Args:
+            documents: Tuples (articles du document, date du document)
+
+        Returns:
+            Nombre d'articles enregistrés
+        """
+        nb_articles = 0
+        with self.connexion:
+            for articles, date in documents:
+                for article in articles:
+                    self._inserer(article.designation, article.prix_unitaire, article.tva, date)
+                    nb_articles += 1
+        return nb_articles
+
+    def _inserer(self, designation: str, prix_unitaire: Decimal, tva: Decimal, date: datetime):
+        """Insère ou met à jour une entrée sans gérer la transaction"""
+        designation = designation.strip()
+        designation_normalisee = normaliser(designation)
+        if not designation_normalisee:
+            return
+        # Le prix et la TVA les plus récents remplacent les précédents
+        self.connexion.execute("""
+            INSERT INTO catalogue (designation, designation_normalisee, prix_unitaire, tva,
+                                   derniere_utilisation, nb_utilisations)
+            VALUES (?, ?, ?, ?, ?, 1)
+            ON CONFLICT (designation_normalisee) DO UPDATE SET
+                designation = CASE WHEN excluded.derniere_utilisation >= derniere_utilisation
+                                   THEN excluded.designation ELSE designation END,
+                prix_unitaire = CASE WHEN excluded.derniere_utilisation >= derniere_utilisation
+                                     THEN excluded.prix_unitaire ELSE prix_unitaire END,
+                tva = CASE WHEN excluded.derniere_utilisation >= derniere_utilisation
+                           THEN excluded.tva ELSE tva END,
+                derniere_utilisation = MAX(derniere_utilisation, excluded.derniere_utilisation),
+                nb_utilisations = nb_utilisations + 1
+        """, (designation, designation_normalisee, str(prix_unitaire), str(tva), date.isoformat()))
+        id_article = self.connexion.execute(
+            "SELECT id FROM catalogue WHERE designation_normalisee = ?", (designation_normalisee,)
+        ).fetchone()[0]
+        self.connexion.executemany(
+            "INSERT OR IGNORE INTO catalogue_mots (mot, article_id) VALUES (?, ?)",
+            [(mot, id_article) for mot in set(designation_normalisee.split()[1:])]
+        )
+
+    def rechercher(self, saisie: str, limite: int = 20) -> List[EntreeCatalogue]:
+        """
+        Articles dont la désignation ou l'un de ses mots commence par la saisie
+
+        Les désignations qui commencent par la saisie viennent en premier
+        (ordre alphabétique), puis celles dont un autre mot correspond au
+        mot saisi le plus sélectif et qui contiennent la saisie complète.
+        """
+        texte = normaliser(saisie)
+        if not texte:
+            return []
+
+        lignes = self.connexion.execute("""
+            SELECT * FROM catalogue
+            WHERE designation_normalisee >= ? AND designation_normalisee < ?
+            ORDER BY designation_normalisee
+            LIMIT ?
+        """, (texte, _borne_prefixe(texte), limite)).fetchall()
+
+        if len(lignes) < limite:
+            # Parcours des articles du mot le plus sélectif, vérifiés par instr()
+            debut, fin = self._bornes_mot_le_plus_rare(texte.split())
+            deja_trouves = [ligne['id'] for ligne in lignes]
+            exclusion = f"AND catalogue.id NOT IN ({', '.join('?' * len(deja_trouves))})" if deja_trouves else ""
+            lignes += self.connexion.execute(f"""
+                SELECT DISTINCT catalogue.* FROM catalogue_mots
+                JOIN catalogue ON catalogue.id = catalogue_mots.article_id
+                WHERE catalogue_mots.mot >= ? AND catalogue_mots.mot < ?
+                  AND instr(designation_normalisee, ?) > 0
+                  {exclusion}
+                LIMIT ?
+            """, (debut, fin, texte, *deja_trouves, limite - len(lignes))).fetchall()
+
+        return [
+            EntreeCatalogue(
+                designation=ligne['designation'],
+                prix_unitaire=Decimal(ligne['prix_unitaire']),
+                tva=Decimal(ligne['tva']),
+                nb_utilisations=ligne['nb_utilisations'],
+            )
+            for ligne in lignes
+        ]
+
+    def _bornes_mot_le_plus_rare(self, mots: list) -> tuple:
+        """
+        Bornes (début, fin) dans catalogue_mots du mot saisi le plus sélectif
+
+        Les mots complets sont cherchés tels quels, le dernier (en cours de
+        frappe) comme préfixe.
+        """
+        bornes = [(mot, mot + "\0") for mot in mots[:-1]]
+        bornes.append((mots[-1], _borne_prefixe(mots[-1])))
+        if len(bornes) == 1:
+            return bornes[0]
+
+        def frequence(borne):
+            # Comptage plafonné : seul l'ordre de grandeur compte
+            return self.connexion.execute("""
+                SELECT COUNT(*) FROM (
+                    SELECT 1 FROM catalogue_mots WHERE mot >= ? AND mot < ? LIMIT ?
+                )
+            """, (*borne, PLAFOND_FREQUENCE)).fetchone()[0]
+
+        return min(bornes, key=frequence)
+
+    def vider(self):
+        """Supprime toutes les entrées du catalogue"""
+        with self.connexion:
+            self.connexion.execute("DELETE FROM catalogue_mots")
+            self.connexion.execute("DELETE FROM catalogue")
+
+    def compter(self) -> int:
+        """Nombre d'entrées du catalogue"""
+        return self.connexion.execute("SELECT COUNT(*) FROM catalogue").fetchone()[0]
+
+    def importer_archives(self, archive_store, taille_page: int = 500,
+                          interrompre: Optional[Callable[[], bool]] = None) -> tuple:
+        """
+        Alimente le catalogue avec les articles des documents archivés
+
+        Chaque page est validée dans sa propre transaction ; un document
+        illisible est ignoré et rapporté. Le catalogue n'est marqué comme
+        importé qu'après la dernière page : un import interrompu est repris
+        à l'ouverture suivante.
+
+        Args:
+            interrompre: Fonction consultée avant chaque page, arrête l'import si elle retourne True
+
+        Returns:
+            Tuple (nombre de documents parcourus, liste des (numéro, erreur))
+        """
+        nb_documents = 0
+        erreurs = []
+        while True:
+            if interrompre is not None and interrompre():
+                return nb_documents, erreurs
+            page = archive_store.lister(tri="date", decroissant=False,
+                                       limite=taille_page, decalage=nb_documents)
+            with self.connexion:
+                for entete in page:
+                    try:
+                        articles = entete.articles
+                    except Exception as e:
+                        erreurs.append((entete.numero, str(e)))
+                        continue
+                    for article in articles:
+                        self._inserer(article.designation, article.prix_unitaire, article.tva, entete.date)
+            nb_documents += len(page)
+            if len(page) < taille_page:
+                break
+        with self.connexion:
+            self.connexion.execute("PRAGMA user_version = 1")
+        self.nouveau = False
+        return nb_documents, erreurs
+
+
+def main(argv=None):
+    """Construction en ligne de commande du catalogue depuis la base des archives"""
+    from archive_store import ArchiveStore
+
+    parser = argparse.ArgumentParser(description="Construit le catalogue des articles depuis les archives myInvo")
+    parser.add_argument("dossier", nargs="?", default="archives", help="Dossier des archives")
+    parser.add_argument("--base", default=None, help="Base des archives (par défaut: <dossier>/archives.db)")
+    args = parser.parse_args(argv)
+
+    store = ArchiveStore(args.base or os.path.join(args.dossier, "archives.db"))
+    catalogue = CatalogueArticles(os.path.join(args.dossier, "catalogue.db"))
+    catalogue.vider()
+    nb_documents, erreurs = catalogue.importer_archives(store)
+    for numero, erreur in erreurs:
+        print(f"ERREUR  {numero} - {erreur}")
+    print(f"{nb_documents} document(s) parcouru(s) - {catalogue.compter()} article(s) au catalogue - "
+          f"{len(erreurs)} erreur(s)")
+    catalogue.fermer()
+    store.fermer()
+    return 1 if erreurs else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
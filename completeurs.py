@@ -0,0 +1,118 @@
+"""
+Auto-complétion des champs de saisie à partir des bases locales
+"""
+from PyQt6.QtWidgets import QCompleter
+from PyQt6.QtGui import QStandardItemModel, QStandardItem
+from PyQt6.QtCore import Qt, QModelIndex, QTimer, pyqtSignal
+
+
+# Nombre de propositions affichées
+NB_PROPOSITIONS = 15
+
+# Rôle portant le texte inséré dans le champ (le libellé affiché est plus détaillé)
+ROLE_COMPLETION = Qt.ItemDataRole.UserRole + 1
+
+# Rôle portant la position de l'objet dans la liste des propositions
+ROLE_POSITION = Qt.ItemDataRole.UserRole + 2
+
+
+class CompleteurBase(QCompleter):
+    """
+    QCompleter dont les propositions sont recalculées à chaque frappe
+
+    Le filtrage est fait par la base (recherche indexée) : le completer
+    affiche les propositions telles quelles. Les sous-classes redéfinissent
+    rechercher(), et libelle()/valeur() si str(objet) ne convient pas.
+    """
+
+    # Émis avec l'objet correspondant à la proposition choisie
+    proposition_choisie = pyqtSignal(object)
+
+    def __init__(self, champ, parent=None):
+        super().__init__(parent)
+        self.modele = QStandardItemModel(self)
+        self.setModel(self.modele)
+        self.setCompletionMode(QCompleter.CompletionMode.UnfilteredPopupCompletion)
+        self.setCompletionRole(ROLE_COMPLETION)
+        self.setCaseSensitivity(Qt.CaseSensitivity.CaseInsensitive)
+        self.setMaxVisibleItems(NB_PROPOSITIONS)
+        self.objets = []
+
+        champ.setCompleter(self)
+        champ.textEdited.connect(self.mettre_a_jour)
+        self.activated[QModelIndex].connect(self._choisir)
+
+    def rechercher(self, texte):
+        """Retourne la liste des objets proposés pour le texte saisi (aucun par défaut)"""
+        return []
+
+    def libelle(self, objet) -> str:
+        """Libellé affiché dans la liste des propositions"""
+        return str(objet)
+
+    def valeur(self, objet) -> str:
+        """Texte inséré dans le champ (le libellé par défaut)"""
+        return self.libelle(objet)
+
+    def mettre_a_jour(self, texte):
+        """Recalcule les propositions pour le texte saisi"""
+        self.objets = self.rechercher(texte) if texte.strip() else []
+        self.modele.clear()
+        for position, objet in enumerate(self.objets):
+            item = QStandardItem(self.libelle(objet))
+            item.setData(self.valeur(objet), ROLE_COMPLETION)
+            item.setData(position, ROLE_POSITION)
+            self.modele.appendRow(item)
+        if self.objets:
+            self.complete()
+        else:
+            self.popup().hide()
+
+    def _choisir(self, index):
+        # index appartient au modèle de complétion : la position est lue dans ses données
+        position = index.data(ROLE_POSITION)
+        if position is not None and position < len(self.objets):
+            objet = self.objets[position]
+            # Différé : le champ reçoit d'abord le texte de la proposition (QLineEdit)
+            QTimer.singleShot(0, lambda: self.proposition_choisie.emit(objet))
+
+
+class CompleteurClients(CompleteurBase):
+    """Propose les clients du répertoire sur le champ nom ou entreprise"""
+
+    def __init__(self, repertoire, champ, cle="nom", parent=None):
+        self.repertoire = repertoire
+        self.cle = cle
+        super().__init__(champ, parent)
+
+    def rechercher(self, texte):
+        return self.repertoire.rechercher(texte, self.cle, NB_PROPOSITIONS)
+
+    def libelle(self, client) -> str:
+        nom = f"{client.nom} {client.prenom}".strip()
+        parties = [client.entreprise, nom] if self.cle == "entreprise" else [nom, client.entreprise]
+        texte = " - ".join(partie for partie in parties if partie)
+        if client.ville:
+            texte += f" ({client.ville})"
+        return texte
+
+    def valeur(self, client) -> str:
+        return client.entreprise if self.cle == "entreprise" else client.nom
+
+
+class CompleteurArticles(CompleteurBase):
+    """Propose les articles du catalogue sur le champ désignation"""
+
+    def __init__(self, catalogue, champ, parent=None):
+        self.catalogue = catalogue
+        super().__init__(champ, parent)
+
+    def rechercher(self, texte):
+        return self.catalogue.rechercher(texte, NB_PROPOSITIONS)
+
+    def libelle(self, entree) -> str:
+        # Valeurs exactes du catalogue : un prix à 3 décimales ne doit pas paraître arrondi
+        return f"{entree.designation} - {entree.prix_unitaire} € HT - TVA {entree.tva}%"
+
+    def valeur(self, entree) -> str:
+        return entree.designation
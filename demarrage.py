@@ -0,0 +1,168 @@
+"""
+Chronométrage du démarrage de l'application
+
+Avec l'option --profile-startup, la durée de chaque import de module est
+également mesurée et un rapport est écrit dans logs/ une fois la fenêtre
+affichée. L'option --cprofile y ajoute un profil cProfile du démarrage
+(fichier .prof lisible avec pstats ou snakeviz).
+"""
+import builtins
+import os
+import sys
+import time
+from contextlib import contextmanager
+from datetime import datetime
+from typing import List, Tuple
+
+
+OPTION_PROFILAGE = "--profile-startup"
+OPTION_CPROFILE = "--cprofile"
+
+# Nombre de lignes des tableaux du rapport
+NB_LIGNES_RAPPORT = 30
+
+
+class ChronometreDemarrage:
+    """Mesure la durée de chaque phase du démarrage (imports, configuration, interface...)"""
+
+    def __init__(self):
+        self.debut = time.perf_counter()
+        self._dernier = self.debut
+        self.phases: List[Tuple[str, float]] = []
+        # (module, durée incluant ses propres imports, profondeur d'imbrication)
+        self.imports: List[Tuple[str, float, int]] = []
+        self.profilage = False
+        self.profileur = None
+        self._importer = None
+        self._profondeur = 0
+
+    def marquer(self, nom: str):
+        """Enregistre la phase qui se termine maintenant (depuis la marque précédente)"""
+        maintenant = time.perf_counter()
+        self.phases.append((nom, maintenant - self._dernier))
+        self._dernier = maintenant
+
+    @contextmanager
+    def phase(self, nom: str):
+        """Mesure le bloc de code exécuté dans le contexte"""
+        self._dernier = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.marquer(nom)
+
+    def duree_totale(self) -> float:
+        """Temps écoulé depuis le début du chronométrage (secondes)"""
+        return self._dernier - self.debut
+
+    def rapport(self) -> str:
+        """Tableau texte des phases mesurées"""
+        lignes = [f"{nom:32} {duree * 1000:9.1f} ms" for nom, duree in self.phases]
+        lignes.append(f"{'total':32} {self.duree_totale() * 1000:9.1f} ms")
+        return "\n".join(lignes)
+
+    def activer_profilage(self, cprofile: bool = False):
+        """Mesure les imports à venir (et lance cProfile si demandé)"""
+        self.profilage = True
+        self._importer = builtins.__import__
+        builtins.__import__ = self._importer_chronometre
+        if cprofile:
+            import cProfile
+            self.profileur = cProfile.Profile()
+            self.profileur.enable()
+
+    @staticmethod
+    def _modules_a_charger(name, fromlist):
+        """
+        Nom des modules que l'appel à __import__ va charger, None s'ils le sont tous déjà
+
+        « from paquet import sous_module » charge le sous-module même quand le
+        paquet est déjà importé : il est alors compté sous son nom complet.
+        """
+        module = sys.modules.get(name)
+        if module is None:
+            return name
+        if not fromlist or not hasattr(module, '__path__'):
+            return None
+        nouveaux = [f"{name}.{nom}" for nom in fromlist
+                    if nom != '*' and not hasattr(module, nom) and f"{name}.{nom}" not in sys.modules]
+        return ", ".join(nouveaux) or None
+
+    def _importer_chronometre(self, name, globals=None, locals=None, fromlist=(), level=0):
+        """Remplaçant de __import__ qui chronomètre le premier import de chaque module"""
+        nom = None if level else self._modules_a_charger(name, fromlist)
+        if nom is None:
+            return self._importer(name, globals, locals, fromlist, level)
+        self._profondeur += 1
+        debut = time.perf_counter()
+        try:
+            return self._importer(name, globals, locals, fromlist, level)
+        finally:
+            self._profondeur -= 1
+            self.imports.append((nom, time.perf_counter() - debut, self._profondeur))
+
+    def terminer_profilage(self):
+        """Arrête la mesure des imports et cProfile"""
+        if self._importer is not None:
+            builtins.__import__ = self._importer
+            self._importer = None
+        if self.profileur is not None:
+            self.profileur.disable()
+
+    def rapport_imports(self) -> str:
+        """Tableau texte des imports de premier niveau puis des plus coûteux"""
+        lignes = ["Imports de premier niveau :"]
+        premier_niveau = sorted((i for i in self.imports if i[2] == 0), key=lambda i: i[1], reverse=True)
+        lignes += [f"  {nom:40} {duree * 1000:9.1f} ms" for nom, duree, _ in premier_niveau[:NB_LIGNES_RAPPORT]]
+        lignes.append("Imports les plus coûteux (durée incluant leurs propres imports) :")
+        tous = sorted(self.imports, key=lambda i: i[1], reverse=True)
+        lignes += [f"  {'  ' * profondeur}{nom:40} {duree * 1000:9.1f} ms"
+                   for nom, duree, profondeur in tous[:NB_LIGNES_RAPPORT]]
+        return "\n".join(lignes)
+
+    def ecrire_rapport(self, dossier: str) -> str:
+        """
+        Écrit le rapport de démarrage (et le profil cProfile) dans le dossier
+
+        Returns:
+            Chemin du rapport texte
+        """
+        self.terminer_profilage()
+        horodatage = datetime.now().strftime("%Y%m%d_%H%M%S")
+        chemin = os.path.join(dossier, f"demarrage_{horodatage}.txt")
+
+        sections = [
+            f"=== PROFIL DE DÉMARRAGE - {datetime.now().strftime('%Y-%m-%d %H:%M:%S')} ===",
+            f"Python: {sys.version}",
+            "",
+            "Phases :",
+            self.rapport(),
+            "",
+            self.rapport_imports(),
+        ]
+
+        if self.profileur is not None:
+            chemin_profil = os.path.join(dossier, f"demarrage_{horodatage}.prof")
+            self.profileur.dump_stats(chemin_profil)
+            import io
+            import pstats
+            texte = io.StringIO()
+            pstats.Stats(self.profileur, stream=texte).sort_stats("cumulative").print_stats(NB_LIGNES_RAPPORT)
+            sections += ["", f"cProfile ({chemin_profil}) :", texte.getvalue()]
+
+        with open(chemin, 'w', encoding='utf-8') as f:
+            f.write("\n".join(sections) + "\n")
+        return chemin
+
+    def journaliser(self, logger):
+        """Émet un enregistrement par phase sur le logger donné"""
+        for nom, duree in self.phases:
+            logger.info(f"DEMARRAGE phase={nom} duree_ms={duree * 1000:.1f}")
+        logger.info(f"DEMARRAGE total_ms={self.duree_totale() * 1000:.1f}")
+
+
+# Chronomètre du processus, démarré au premier import de ce module
+chrono = ChronometreDemarrage()
+
+if OPTION_PROFILAGE in sys.argv:
+    chrono.activer_profilage(cprofile=OPTION_CPROFILE in sys.argv)
@@ -0,0 +1,318 @@
+"""
+Journal d'événements structuré (JSON lines) et agrégation des métriques
+
+Chaque opération importante (ajout d'article, mise à jour des totaux,
+génération PDF, sauvegarde ou chargement d'un document) peut être écrite
+comme une ligne JSON dans logs/evenements.jsonl :
+
+    {"ts": "2026-10-17T14:03:12.418", "evenement": "pdf_genere", "statut": "ok",
+     "duree_ms": 412.7, "taille_octets": 48213, ...}
+
+L'écriture passe par la même file d'attente asynchrone que le journal
+texte. L'agrégateur (python evenements.py logs) donne par jour et par
+événement le nombre d'occurrences, le taux d'erreur et l'histogramme des
+durées.
+"""
+import argparse
+import glob
+import json
+import logging
+import logging.handlers
+import os
+import queue
+import sys
+import time
+from collections import Counter
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from datetime import date, datetime
+from typing import Dict, Iterable, Iterator, List, Optional
+
+from journalisation import EcouteurJournal, FichierJournalRotatif, arreter_journalisation
+
+
+LOGGER_EVENEMENTS = "myInvo.evenements"
+FICHIER_EVENEMENTS = "evenements.jsonl"
+
+# Événements émis par l'application
+ARTICLE_AJOUTE = "article_ajoute"
+ARTICLE_SUPPRIME = "article_supprime"
+TOTAUX_MIS_A_JOUR = "totaux_mis_a_jour"
+PDF_GENERE = "pdf_genere"
+DOCUMENT_SAUVEGARDE = "document_sauvegarde"
+DOCUMENT_CHARGE = "document_charge"
+
+# Statuts d'un événement
+STATUT_OK = "ok"
+STATUT_ERREUR = "erreur"
+STATUT_ANNULE = "annule"
+
+# Bornes supérieures (ms) des classes de l'histogramme des durées
+BORNES_HISTOGRAMME_MS = (1, 5, 10, 50, 100, 500, 1000, 5000)
+
+
+class JournalEvenements:
+    """
+    Écrit les événements de l'application en JSON lines
+
+    Désactivé, emettre() et mesurer() ne coûtent qu'un test : le fichier
+    n'est ouvert qu'à l'activation.
+
+    Args:
+        dossier_logs: Dossier du fichier evenements.jsonl
+        actif: Active immédiatement l'écriture
+    """
+
+    def __init__(self, dossier_logs: str, actif: bool = False):
+        self.chemin = os.path.join(dossier_logs, FICHIER_EVENEMENTS)
+        self.actif = False
+        self.logger = logging.getLogger(LOGGER_EVENEMENTS)
+        self.logger.setLevel(logging.INFO)
+        # Les lignes JSON ne vont pas dans myinvo.log
+        self.logger.propagate = False
+        self._ecouteur = None
+        self._handler = None
+        if actif:
+            self.activer()
+
+    def activer(self):
+        """Démarre l'écriture des événements"""
+        if self._ecouteur is None:
+            fichier = FichierJournalRotatif(self.chemin)
+            fichier.setFormatter(logging.Formatter('%(message)s'))
+            file_attente = queue.SimpleQueue()
+            self._handler = logging.handlers.QueueHandler(file_attente)
+            self.logger.addHandler(self._handler)
+            self._ecouteur = EcouteurJournal(file_attente, fichier)
+            self._ecouteur.start()
+        self.actif = True
+
+    def desactiver(self):
+        """Arrête l'écriture après avoir écrit les événements en attente"""
+        self.actif = False
+        if self._ecouteur is not None:
+            self.logger.removeHandler(self._handler)
+            arreter_journalisation(self._ecouteur)
+            self._ecouteur = None
+            self._handler = None
+
+    def fermer(self):
+        """Écrit les événements en attente et ferme le fichier"""
+        self.desactiver()
+
+    def emettre(self, evenement: str, statut: str = STATUT_OK, **champs):
+        """Écrit un événement (sans effet si le journal est désactivé)"""
+        if not self.actif:
+            return
+        ligne = {
+            "ts": datetime.now().isoformat(timespec="milliseconds"),
+            "evenement": evenement,
+            "statut": statut,
+            **champs,
+        }
+        self.logger.info(json.dumps(ligne, ensure_ascii=False, default=str))
+
+    @contextmanager
+    def mesurer(self, evenement: str, duree_prealable: float = 0.0, **champs):
+        """
+        Mesure le bloc exécuté dans le contexte et émet l'événement avec duree_ms
+
+        Le contexte fournit le dictionnaire des champs, que le bloc peut
+        compléter. Une exception est enregistrée avec le statut "erreur"
+        puis propagée. duree_prealable (secondes) est ajoutée à la mesure :
+        partie de l'opération déjà faite ailleurs, dans un autre thread par exemple.
+        """
+        if not self.actif:
+            yield champs
+            return
+        debut = time.perf_counter() - duree_prealable
+        try:
+            yield champs
+        except Exception as e:
+            self.emettre(evenement, STATUT_ERREUR, duree_ms=_duree_ms(debut), erreur=str(e), **champs)
+            raise
+        self.emettre(evenement, duree_ms=_duree_ms(debut), **champs)
+
+
+def _duree_ms(debut: float) -> float:
+    return round((time.perf_counter() - debut) * 1000, 3)
+
+
+@dataclass
+class StatistiquesEvenement:
+    """Compteurs d'un événement sur une journée"""
+    nb: int = 0
+    statuts: Counter = field(default_factory=Counter)
+    nb_durees: int = 0
+    duree_totale_ms: float = 0.0
+    duree_max_ms: float = 0.0
+    # Une classe par borne de BORNES_HISTOGRAMME_MS, plus une au-delà
+    histogramme: List[int] = field(default_factory=lambda: [0] * (len(BORNES_HISTOGRAMME_MS) + 1))
+
+    def ajouter(self, ligne: dict):
+        """Compte une ligne du journal"""
+        self.nb += 1
+        self.statuts[ligne.get("statut", STATUT_OK)] += 1
+        duree = ligne.get("duree_ms")
+        if isinstance(duree, (int, float)):
+            self.nb_durees += 1
+            self.duree_totale_ms += duree
+            self.duree_max_ms = max(self.duree_max_ms, duree)
+            self.histogramme[_classe(duree)] += 1
+
+    @property
+    def taux_erreur(self) -> float:
+        """Part des occurrences en erreur (0 à 1)"""
+        return self.statuts[STATUT_ERREUR] / self.nb if self.nb else 0.0
+
+    @property
+    def duree_moyenne_ms(self) -> Optional[float]:
+        return self.duree_totale_ms / self.nb_durees if self.nb_durees else None
+
+    def percentile_ms(self, p: float) -> Optional[float]:
+        """
+        Estimation du p-ième percentile à partir de l'histogramme
+
+        Les durées sont supposées réparties uniformément dans la classe qui
+        contient le percentile : la valeur est interpolée entre ses bornes.
+        La borne haute est plafonnée par la durée maximale observée (c'est
+        elle qui ferme la dernière classe, au-delà de la plus grande borne).
+        """
+        if not self.nb_durees:
+            return None
+        rang = p / 100 * self.nb_durees
+        cumul = 0
+        for classe, nb in enumerate(self.histogramme):
+            if nb and cumul + nb >= rang:
+                basse = BORNES_HISTOGRAMME_MS[classe - 1] if classe else 0
+                haute = BORNES_HISTOGRAMME_MS[classe] if classe < len(BORNES_HISTOGRAMME_MS) else self.duree_max_ms
+                haute = min(haute, self.duree_max_ms)
+                basse = min(basse, haute)
+                return float(basse + (haute - basse) * (rang - cumul) / nb)
+            cumul += nb
+        return self.duree_max_ms
+
+    def en_dict(self) -> dict:
+        return {
+            "nb": self.nb,
+            "statuts": dict(self.statuts),
+            "taux_erreur": self.taux_erreur,
+            "duree_moyenne_ms": self.duree_moyenne_ms,
+            "duree_p50_ms": self.percentile_ms(50),
+            "duree_p95_ms": self.percentile_ms(95),
+            "duree_max_ms": self.duree_max_ms if self.nb_durees else None,
+            "histogramme": dict(zip(_libelles_classes(), self.histogramme)),
+        }
+
+
+def _classe(duree_ms: float) -> int:
+    """Indice de la classe de l'histogramme d'une durée"""
+    for classe, borne in enumerate(BORNES_HISTOGRAMME_MS):
+        if duree_ms <= borne:
+            return classe
+    return len(BORNES_HISTOGRAMME_MS)
+
+
+def _libelles_classes() -> List[str]:
+    return [f"<={borne}ms" for borne in BORNES_HISTOGRAMME_MS] + [f">{BORNES_HISTOGRAMME_MS[-1]}ms"]
+
+
+def fichiers_evenements(dossier_logs: str) -> List[str]:
+    """Fichiers du journal, du plus ancien (dernière rotation) au plus récent"""
+    chemin = os.path.join(dossier_logs, FICHIER_EVENEMENTS)
+    anciens = glob.glob(glob.escape(chemin) + ".*")
+    anciens.sort(key=lambda f: int(f.rsplit(".", 1)[1]) if f.rsplit(".", 1)[1].isdigit() else 0,
+                 reverse=True)
+    return anciens + ([chemin] if os.path.exists(chemin) else [])
+
+
+def lire_evenements(fichiers: Iterable[str]) -> Iterator[dict]:
+    """Lit les lignes JSON des fichiers une à une (les lignes illisibles sont ignorées)"""
+    for fichier in fichiers:
+        with open(fichier, 'r', encoding='utf-8') as f:
+            for ligne in f:
+                try:
+                    evenement = json.loads(ligne)
+                except ValueError:
+                    continue
+                if isinstance(evenement, dict) and "ts" in evenement and "evenement" in evenement:
+                    yield evenement
+
+
+def agreger(evenements: Iterable[dict], depuis: Optional[date] = None,
+            jusqu_a: Optional[date] = None, filtre: Optional[str] = None
+            ) -> Dict[str, Dict[str, StatistiquesEvenement]]:
+    """
+    Statistiques par jour puis par événement
+
+    La mémoire utilisée ne dépend que du nombre de jours et de types
+    d'événements, pas du nombre de lignes lues.
+    """
+    jours: Dict[str, Dict[str, StatistiquesEvenement]] = {}
+    debut = depuis.isoformat() if depuis else None
+    fin = jusqu_a.isoformat() if jusqu_a else None
+    for evenement in evenements:
+        jour = str(evenement["ts"])[:10]
+        if (debut and jour < debut) or (fin and jour > fin):
+            continue
+        if filtre and evenement["evenement"] != filtre:
+            continue
+        par_evenement = jours.setdefault(jour, {})
+        par_evenement.setdefault(evenement["evenement"], StatistiquesEvenement()).ajouter(evenement)
+    return dict(sorted(jours.items()))
+
+
+def _format_ms(valeur: Optional[float]) -> str:
+    return f"{valeur:.1f}" if valeur is not None else "-"
+
+
+def rapport(agregat: Dict[str, Dict[str, StatistiquesEvenement]], histogrammes: bool = True) -> str:
+    """Rapport texte de l'agrégation"""
+    if not agregat:
+        return "Aucun événement"
+    lignes = []
+    for jour, par_evenement in agregat.items():
+        lignes.append(f"=== {jour} ===")
+        lignes.append(f"  {'événement':22} {'nb':>7} {'erreurs':>8} {'moy ms':>9} "
+                      f"{'p50 ms':>9} {'p95 ms':>9} {'max ms':>9}")
+        for nom, stats in sorted(par_evenement.items()):
+            lignes.append(
+                f"  {nom:22} {stats.nb:7} {stats.taux_erreur * 100:7.1f}% "
+                f"{_format_ms(stats.duree_moyenne_ms):>9} {_format_ms(stats.percentile_ms(50)):>9} "
+                f"{_format_ms(stats.percentile_ms(95)):>9} "
+                f"{_format_ms(stats.duree_max_ms if stats.nb_durees else None):>9}"
+            )
+            if histogrammes and stats.nb_durees:
+                classes = [f"{libelle}:{nb}" for libelle, nb in zip(_libelles_classes(), stats.histogramme) if nb]
+                lignes.append(f"  {'':22} {' '.join(classes)}")
+        lignes.append("")
+    return "\n".join(lignes)
+
+
+def main(argv=None):
+    """Agrégation en ligne de commande du journal d'événements"""
+    parser = argparse.ArgumentParser(description="Métriques du journal d'événements myInvo")
+    parser.add_argument("dossier", nargs="?", default="logs", help="Dossier des journaux")
+    parser.add_argument("--depuis", type=date.fromisoformat, default=None, help="Premier jour (AAAA-MM-JJ)")
+    parser.add_argument("--jusqu-a", type=date.fromisoformat, default=None, help="Dernier jour (AAAA-MM-JJ)")
+    parser.add_argument("--evenement", default=None, help="Limiter à un type d'événement")
+    parser.add_argument("--json", action="store_true", help="Sortie JSON")
+    parser.add_argument("--sans-histogrammes", action="store_true", help="Ne pas afficher les histogrammes")
+    args = parser.parse_args(argv)
+
+    fichiers = fichiers_evenements(args.dossier)
+    if not fichiers:
+        print(f"Aucun journal d'événements dans {args.dossier}", file=sys.stderr)
+        return 1
+
+    agregat = agreger(lire_evenements(fichiers), args.depuis, args.jusqu_a, args.evenement)
+    if args.json:
+        print(json.dumps({jour: {nom: stats.en_dict() for nom, stats in par_evenement.items()}
+                          for jour, par_evenement in agregat.items()}, ensure_ascii=False, indent=2))
+    else:
+        print(rapport(agregat, histogrammes=not args.sans_histogrammes))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
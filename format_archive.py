@@ -0,0 +1,97 @@
+"""
+Format binaire compact des archives
+
+Structure d'une archive compacte :
+    MAGIQUE (4 octets) | version du format (1 octet) | codec (1 octet) | contenu zlib
+
+Le contenu est le dictionnaire d'archive (voir archive.document_vers_dict)
+encodé en MessagePack si le module est installé, sinon en JSON compact. Les
+articles y sont rangés en lignes (listes de valeurs) plutôt qu'en
+dictionnaires. Dans la base des archives, l'entreprise est retirée du
+dictionnaire et rangée une seule fois par empreinte (voir
+archive_store.ArchiveStore._separer_entreprise).
+"""
+import hashlib
+import json
+import struct
+import zlib
+
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+
+
+MAGIQUE = b"MINV"
+VERSION_FORMAT = 1
+
+CODEC_JSON = 0
+CODEC_MSGPACK = 1
+
+# Ordre des champs d'un article dans une ligne compacte
+CHAMPS_ARTICLE = ("designation", "quantite", "prix_unitaire", "tva")
+
+_ENTETE = struct.Struct("<4sBB")
+
+
+class ErreurFormatArchive(ValueError):
+    """Archive compacte illisible (en-tête, version ou codec inconnus)"""
+
+
+def est_archive_compacte(contenu: bytes) -> bool:
+    """True si le contenu commence par l'en-tête d'une archive compacte"""
+    return contenu[:len(MAGIQUE)] == MAGIQUE
+
+
+def empreinte_entreprise(entreprise: dict) -> str:
+    """Empreinte SHA-256 d'un instantané d'entreprise (dictionnaire d'archive)"""
+    texte = json.dumps(entreprise, ensure_ascii=False, sort_keys=True, separators=(',', ':'))
+    return hashlib.sha256(texte.encode('utf-8')).hexdigest()
+
+
+def _compacter(data: dict) -> dict:
+    """Range les articles en lignes de valeurs"""
+    if 'articles' not in data:
+        return data
+    data = dict(data)
+    data['articles'] = [[article[champ] for champ in CHAMPS_ARTICLE] for article in data['articles']]
+    return data
+
+
+def _decompacter(data: dict) -> dict:
+    """Reconstitue les dictionnaires d'articles"""
+    if 'articles' in data:
+        data['articles'] = [dict(zip(CHAMPS_ARTICLE, ligne)) for ligne in data['articles']]
+    return data
+
+
+def encoder(data: dict, niveau_compression: int = 6) -> bytes:
+    """Encode un dictionnaire d'archive au format compact"""
+    data = _compacter(data)
+    if msgpack is not None:
+        codec = CODEC_MSGPACK
+        brut = msgpack.packb(data, use_bin_type=True)
+    else:
+        codec = CODEC_JSON
+        brut = json.dumps(data, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+    return _ENTETE.pack(MAGIQUE, VERSION_FORMAT, codec) + zlib.compress(brut, niveau_compression)
+
+
+def decoder(contenu: bytes) -> dict:
+    """Décode une archive compacte en dictionnaire d'archive"""
+    if len(contenu) < _ENTETE.size or not est_archive_compacte(contenu):
+        raise ErreurFormatArchive("En-tête d'archive compacte absent")
+    _, version, codec = _ENTETE.unpack_from(contenu)
+    if version > VERSION_FORMAT:
+        raise ErreurFormatArchive(f"Version de format {version} non prise en charge (max {VERSION_FORMAT})")
+
+    brut = zlib.decompress(contenu[_ENTETE.size:])
+    if codec == CODEC_MSGPACK:
+        if msgpack is None:
+            raise ErreurFormatArchive("Archive encodée en MessagePack : installer le module msgpack")
+        data = msgpack.unpackb(brut, raw=False)
+    elif codec == CODEC_JSON:
+        data = json.loads(brut)
+    else:
+        raise ErreurFormatArchive(f"Codec d'archive inconnu: {codec}")
+    return _decompacter(data)
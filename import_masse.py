@@ -0,0 +1,542 @@
+"""
+Import en masse de factures et devis depuis un fichier CSV ou Excel
+
+Chaque ligne du fichier décrit un article ; les lignes consécutives portant
+le même numéro de document forment un document. Les colonnes d'en-tête
+(date, client, échéance...) sont lues sur la première ligne du document.
+
+Le fichier est lu en flux (csv, ou openpyxl en lecture seule pour .xlsx) :
+seuls le document en cours et le lot à écrire sont gardés en mémoire. Les
+documents valides sont écrits dans la base des archives par transactions de
+TAILLE_LOT documents ; chaque erreur est rapportée avec son numéro de ligne.
+Un numéro déjà utilisé (dans le lot en cours ou dans les archives) est
+rejeté : l'import ne remplace jamais un document existant. En vérification
+seule, les numéros vus sont rangés dans une table SQLite temporaire.
+
+Utilisation en ligne de commande :
+    python import_masse.py export_erp.csv --entreprise config/config_entreprise.json
+    python import_masse.py factures.xlsx --feuille 2023 --verifier
+"""
+import argparse
+import csv
+import json
+import os
+import sqlite3
+import sys
+from dataclasses import dataclass, field
+from datetime import datetime
+from decimal import Decimal, InvalidOperation
+from itertools import groupby
+from typing import Callable, Iterable, Iterator, List, Optional, Tuple
+
+try:
+    import openpyxl
+except ImportError:
+    openpyxl = None
+
+from archive import entreprise_depuis_dict
+from models import Article, Client, Devis, Entreprise, Facture
+from repertoire_clients import normaliser
+
+
+# Nombre de documents écrits par transaction
+TAILLE_LOT = 500
+
+# Nombre maximal d'erreurs conservées dans le rapport (les suivantes sont seulement comptées)
+MAX_ERREURS_CONSERVEES = 1000
+
+# Colonnes reconnues (en-têtes normalisés : minuscules, sans accents, espaces -> _)
+COLONNES = (
+    "type", "numero", "date", "date_echeance", "reference_devis", "payee", "validite_jours",
+    "client_nom", "client_prenom", "client_entreprise", "client_adresse", "client_code_postal",
+    "client_ville", "client_email", "client_telephone",
+    "designation", "quantite", "prix_unitaire", "tva", "notes", "conditions",
+)
+COLONNES_OBLIGATOIRES = ("numero", "date", "designation", "quantite", "prix_unitaire")
+
+# Autres intitulés acceptés pour les colonnes
+ALIAS_COLONNES = {
+    "n": "numero",
+    "no": "numero",
+    "n_facture": "numero",
+    "no_facture": "numero",
+    "numero_facture": "numero",
+    "numero_document": "numero",
+    "date_facture": "date",
+    "echeance": "date_echeance",
+    "devis": "reference_devis",
+    "client": "client_nom",
+    "nom": "client_nom",
+    "prenom": "client_prenom",
+    "entreprise": "client_entreprise",
+    "societe": "client_entreprise",
+    "adresse": "client_adresse",
+    "code_postal": "client_code_postal",
+    "cp": "client_code_postal",
+    "ville": "client_ville",
+    "email": "client_email",
+    "telephone": "client_telephone",
+    "article": "designation",
+    "libelle": "designation",
+    "qte": "quantite",
+    "prix": "prix_unitaire",
+    "prix_ht": "prix_unitaire",
+    "taux_tva": "tva",
+}
+
+FORMATS_DATE = ("%d/%m/%Y", "%Y-%m-%d", "%d-%m-%Y", "%d.%m.%Y")
+VALEURS_VRAIES = {"1", "oui", "o", "vrai", "true", "yes", "x"}
+VALEURS_FAUSSES = {"", "0", "non", "n", "faux", "false", "no"}
+
+
+class ErreurImport(Exception):
+    """Erreur de validation d'une ligne du fichier importé"""
+
+    def __init__(self, ligne: int, message: str, numero: str = ""):
+        super().__init__(message)
+        self.ligne = ligne
+        self.message = message
+        self.numero = numero
+
+    def __str__(self):
+        document = f" [{self.numero}]" if self.numero else ""
+        return f"ligne {self.ligne}{document}: {self.message}"
+
+
+@dataclass
+class RapportImport:
+    """Résultat d'un import"""
+    nb_lignes: int = 0
+    nb_documents: int = 0
+    nb_documents_rejetes: int = 0
+    nb_erreurs: int = 0
+    erreurs: List[ErreurImport] = field(default_factory=list)
+
+    def ajouter_erreur(self, erreur: ErreurImport):
+        self.nb_erreurs += 1
+        if len(self.erreurs) < MAX_ERREURS_CONSERVEES:
+            self.erreurs.append(erreur)
+
+
+def normaliser_colonne(intitule) -> str:
+    """Nom de colonne reconnu pour un intitulé d'en-tête"""
+    nom = normaliser(str(intitule or "")).replace("°", "")
+    nom = "_".join(nom.replace("-", " ").replace(".", " ").split())
+    return ALIAS_COLONNES.get(nom, nom)
+
+
+def _verifier_entete(colonnes: List[str]):
+    manquantes = [colonne for colonne in COLONNES_OBLIGATOIRES if colonne not in colonnes]
+    if manquantes:
+        raise ErreurImport(1, f"Colonne(s) obligatoire(s) absente(s): {', '.join(manquantes)}")
+    if "client_nom" not in colonnes and "client_entreprise" not in colonnes:
+        raise ErreurImport(1, "Colonne client_nom ou client_entreprise absente")
+
+
+def lire_csv(chemin: str, delimiteur: Optional[str] = None, encodage: str = "utf-8-sig") -> Iterator[Tuple[int, dict]]:
+    """
+    Lit un fichier CSV ligne par ligne
+
+    Le séparateur (; , tabulation) est détecté sur le début du fichier s'il
+    n'est pas donné.
+
+    Yields:
+        Tuples (numéro de ligne dans le fichier, {colonne: valeur})
+    """
+    with open(chemin, "r", encoding=encodage, newline="") as f:
+        if delimiteur is None:
+            try:
+                delimiteur = csv.Sniffer().sniff(f.read(64 * 1024), delimiters=";,\t").delimiter
+            except csv.Error:
+                delimiteur = ";"
+            f.seek(0)
+        lecteur = csv.reader(f, delimiter=delimiteur)
+        entete = next(lecteur, None)
+        if entete is None:
+            return
+        colonnes = [normaliser_colonne(intitule) for intitule in entete]
+        _verifier_entete(colonnes)
+        for valeurs in lecteur:
+            if any(valeur.strip() for valeur in valeurs):
+                yield lecteur.line_num, dict(zip(colonnes, valeurs))
+
+
+def lire_xlsx(chemin: str, feuille: Optional[str] = None) -> Iterator[Tuple[int, dict]]:
+    """
+    Lit une feuille Excel ligne par ligne (openpyxl en lecture seule)
+
+    Yields:
+        Tuples (numéro de ligne dans la feuille, {colonne: valeur})
+    """
+    if openpyxl is None:
+        raise ImportError("Lecture des fichiers Excel : installer le module openpyxl")
+    classeur = openpyxl.load_workbook(chemin, read_only=True, data_only=True)
+    try:
+        onglet = classeur[feuille] if feuille else classeur.active
+        lignes = onglet.iter_rows(values_only=True)
+        entete = next(lignes, None)
+        if entete is None:
+            return
+        colonnes = [normaliser_colonne(intitule) for intitule in entete]
+        _verifier_entete(colonnes)
+        for numero_ligne, valeurs in enumerate(lignes, start=2):
+            if any(valeur not in (None, "") for valeur in valeurs):
+                yield numero_ligne, dict(zip(colonnes, valeurs))
+    finally:
+        classeur.close()
+
+
+def lire_fichier(chemin: str, feuille: Optional[str] = None, delimiteur: Optional[str] = None) -> Iterator[Tuple[int, dict]]:
+    """Lit un fichier CSV ou Excel selon son extension"""
+    if os.path.splitext(chemin)[1].lower() in (".xlsx", ".xlsm"):
+        return lire_xlsx(chemin, feuille)
+    return lire_csv(chemin, delimiteur)
+
+
+def _texte(valeur) -> str:
+    if valeur is None:
+        return ""
+    if isinstance(valeur, float) and valeur.is_integer():
+        # Numéros et codes postaux lus comme nombres dans Excel
+        return str(int(valeur))
+    return str(valeur).strip()
+
+
+def _decimal(valeur, nom: str) -> Decimal:
+    if isinstance(valeur, (int, float, Decimal)) and not isinstance(valeur, bool):
+        return Decimal(str(valeur))
+    texte = _texte(valeur).replace(" ", "").replace("\u00a0", "").replace("\u202f", "").replace("€", "").replace("%", "")
+    try:
+        nombre = Decimal(texte.replace(",", "."))
+    except InvalidOperation:
+        nombre = None
+    if nombre is None or not nombre.is_finite():
+        raise ValueError(f"{nom} invalide: {valeur!r}")
+    return nombre
+
+
+def _date(valeur, nom: str) -> datetime:
+    if isinstance(valeur, datetime):
+        return valeur
+    texte = _texte(valeur)
+    for format_date in FORMATS_DATE:
+        try:
+            return datetime.strptime(texte, format_date)
+        except ValueError:
+            continue
+    try:
+        return datetime.fromisoformat(texte)
+    except ValueError:
+        raise ValueError(f"{nom} invalide: {valeur!r} (attendu JJ/MM/AAAA)")
+
+
+def _booleen(valeur, nom: str) -> bool:
+    if isinstance(valeur, bool):
+        return valeur
+    texte = normaliser(_texte(valeur))
+    if texte in VALEURS_VRAIES:
+        return True
+    if texte in VALEURS_FAUSSES:
+        return False
+    raise ValueError(f"{nom} invalide: {valeur!r} (attendu oui/non)")
+
+
+def _type_document(valeur) -> str:
+    texte = normaliser(_texte(valeur))
+    if texte in ("", "facture", "f"):
+        return "Facture"
+    if texte in ("devis", "d"):
+        return "Devis"
+    raise ValueError(f"type invalide: {valeur!r} (attendu facture ou devis)")
+
+
+def _cle_document(ligne: Tuple[int, dict]) -> Tuple[str, str]:
+    """Clé de regroupement des lignes : (type brut, numéro)"""
+    valeurs = ligne[1]
+    return normaliser(_texte(valeurs.get("type"))), _texte(valeurs.get("numero"))
+
+
+def grouper_par_document(lignes: Iterable[Tuple[int, dict]]) -> Iterator[List[Tuple[int, dict]]]:
+    """Regroupe les lignes consécutives de même type et même numéro"""
+    for _, groupe in groupby(lignes, key=_cle_document):
+        yield list(groupe)
+
+
+def lire_article(numero_ligne: int, valeurs: dict) -> Article:
+    """Valide une ligne et retourne l'article correspondant"""
+    try:
+        designation = _texte(valeurs.get("designation"))
+        if not designation:
+            raise ValueError("désignation vide")
+        quantite = _decimal(valeurs.get("quantite"), "quantité")
+        prix = _decimal(valeurs.get("prix_unitaire"), "prix unitaire")
+        tva_brute = valeurs.get("tva")
+        tva = _decimal(tva_brute, "TVA") if _texte(tva_brute) else Decimal("20.0")
+        if not Decimal("0") <= tva <= Decimal("100"):
+            raise ValueError(f"TVA hors limites: {tva}")
+        return Article(designation=designation, quantite=quantite, prix_unitaire=prix, tva=tva)
+    except ValueError as e:
+        raise ErreurImport(numero_ligne, str(e), _texte(valeurs.get("numero")))
+
+
+def construire_document(lignes: List[Tuple[int, dict]], entreprise: Entreprise):
+    """
+    Valide les lignes d'un document et construit le Devis ou la Facture
+
+    Returns:
+        Tuple (document, type) ou (None, liste des ErreurImport) si une
+        ligne est invalide (le document entier est alors rejeté)
+    """
+    premiere_ligne, entete = lignes[0]
+    numero = _texte(entete.get("numero"))
+    erreurs = []
+    articles = []
+
+    for numero_ligne, valeurs in lignes:
+        try:
+            articles.append(lire_article(numero_ligne, valeurs))
+        except ErreurImport as e:
+            erreurs.append(e)
+
+    document = type_doc = None
+    try:
+        if not numero:
+            raise ValueError("numéro de document vide")
+        type_doc = _type_document(entete.get("type"))
+        date = _date(entete.get("date"), "date")
+        client = Client(**{
+            champ: _texte(entete.get(f"client_{champ}"))
+            for champ in ("nom", "prenom", "entreprise", "adresse", "code_postal", "ville", "email", "telephone")
+        })
+        if not client.get_nom_complet():
+            raise ValueError("client sans nom ni entreprise")
+        communs = dict(numero=numero, date=date, client=client, articles=articles, entreprise=entreprise,
+                       conditions=_texte(entete.get("conditions")), notes=_texte(entete.get("notes")))
+        if type_doc == "Devis":
+            validite = _texte(entete.get("validite_jours"))
+            document = Devis(**communs, validite_jours=int(_decimal(validite, "validité")) if validite else 30)
+        else:
+            echeance = entete.get("date_echeance")
+            document = Facture(
+                **communs,
+                date_echeance=_date(echeance, "date d'échéance") if _texte(echeance) else None,
+                reference_devis=_texte(entete.get("reference_devis")),
+                payee=_booleen(entete.get("payee"), "payée"),
+            )
+    except ValueError as e:
+        erreurs.insert(0, ErreurImport(premiere_ligne, str(e), numero))
+
+    if erreurs:
+        return None, erreurs
+    return document, type_doc
+
+
+class _NumerosVerifies:
+    """
+    Numéros des documents validés sans écriture (vérification seule)
+
+    Table SQLite temporaire (débordant sur disque) plutôt qu'un dictionnaire :
+    la mémoire reste constante quelle que soit la taille du fichier. Même
+    interface que le dictionnaire (type, numéro) -> ligne du lot en cours.
+    """
+
+    def __init__(self):
+        self.connexion = sqlite3.connect("")
+        self.connexion.execute("""
+            CREATE TABLE numeros (
+                type TEXT NOT NULL,
+                numero TEXT NOT NULL,
+                ligne INTEGER NOT NULL,
+                PRIMARY KEY (type, numero)
+            ) WITHOUT ROWID
+        """)
+
+    def get(self, cle: Tuple[str, str]) -> Optional[int]:
+        ligne = self.connexion.execute(
+            "SELECT ligne FROM numeros WHERE type = ? AND numero = ?", cle).fetchone()
+        return ligne[0] if ligne else None
+
+    def __setitem__(self, cle: Tuple[str, str], ligne: int):
+        self.connexion.execute("INSERT INTO numeros (type, numero, ligne) VALUES (?, ?, ?)", (*cle, ligne))
+
+    def fermer(self):
+        self.connexion.close()
+
+
+class ImportMasse:
+    """
+    Import en flux de documents dans la base des archives
+
+    Args:
+        archive_store: ArchiveStore de destination
+        entreprise: Entreprise émettrice des documents importés
+        repertoire: RepertoireClients à alimenter (optionnel)
+        catalogue: CatalogueArticles à alimenter (optionnel)
+        taille_lot: Nombre de documents par transaction
+        rappel_erreur: Fonction appelée avec chaque ErreurImport dès qu'elle est détectée
+    """
+
+    def __init__(self, archive_store, entreprise: Entreprise, repertoire=None, catalogue=None,
+                 taille_lot: int = TAILLE_LOT, rappel_erreur: Optional[Callable[[ErreurImport], None]] = None):
+        self.archive_store = archive_store
+        self.entreprise = entreprise
+        self.repertoire = repertoire
+        self.catalogue = catalogue
+        self.taille_lot = taille_lot
+        self.rappel_erreur = rappel_erreur
+
+    def importer(self, lignes: Iterable[Tuple[int, dict]], verifier_seulement: bool = False) -> RapportImport:
+        """
+        Valide et écrit les documents décrits par les lignes
+
+        Args:
+            lignes: Tuples (numéro de ligne, {colonne: valeur}), cf. lire_fichier
+            verifier_seulement: Valider sans rien écrire
+        """
+        rapport = RapportImport()
+        lot = []
+        # (type, numéro) -> ligne, pour les documents pas encore écrits : ceux du
+        # lot en cours (les documents écrits sont retrouvés par archive_store.existe)
+        numeros_en_attente = _NumerosVerifies() if verifier_seulement else {}
+
+        def compter(ligne):
+            rapport.nb_lignes += 1
+            return ligne
+
+        try:
+            for groupe in grouper_par_document(map(compter, lignes)):
+                document, resultat = construire_document(groupe, self.entreprise)
+                if document is None:
+                    rapport.nb_documents_rejetes += 1
+                    for erreur in resultat:
+                        self._signaler(rapport, erreur)
+                    continue
+                doublon = self._verifier_numero(groupe[0][0], document, resultat, numeros_en_attente)
+                if doublon is not None:
+                    rapport.nb_documents_rejetes += 1
+                    self._signaler(rapport, doublon)
+                    continue
+                if verifier_seulement:
+                    rapport.nb_documents += 1
+                    continue
+                lot.append((groupe[0][0], document, resultat))
+                if len(lot) >= self.taille_lot:
+                    self._ecrire_lot(lot, rapport)
+                    lot = []
+                    numeros_en_attente.clear()
+        except ErreurImport as e:
+            # En-tête du fichier invalide
+            self._signaler(rapport, e)
+        finally:
+            if verifier_seulement:
+                numeros_en_attente.fermer()
+        if lot:
+            self._ecrire_lot(lot, rapport)
+        return rapport
+
+    def _verifier_numero(self, numero_ligne: int, document, type_doc: str, numeros_en_attente) -> Optional[ErreurImport]:
+        """Erreur si le numéro du document est déjà pris dans le fichier ou dans les archives"""
+        cle = (type_doc, document.numero)
+        premiere_ligne = numeros_en_attente.get(cle)
+        if premiere_ligne is not None:
+            return ErreurImport(numero_ligne, f"numéro de {type_doc.lower()} déjà utilisé ligne {premiere_ligne}",
+                                document.numero)
+        if self.archive_store is not None and self.archive_store.existe(type_doc, document.numero):
+            return ErreurImport(numero_ligne, f"numéro de {type_doc.lower()} déjà présent dans les archives",
+                                document.numero)
+        numeros_en_attente[cle] = numero_ligne
+        return None
+
+    def _signaler(self, rapport: RapportImport, erreur: ErreurImport):
+        rapport.ajouter_erreur(erreur)
+        if self.rappel_erreur:
+            self.rappel_erreur(erreur)
+
+    def _ecrire_lot(self, lot: list, rapport: RapportImport):
+        """Écrit un lot de documents en une transaction par base"""
+        try:
+            self.archive_store.enregistrer_lot([(document, type_doc) for _, document, type_doc in lot])
+        except Exception:
+            # Écriture document par document pour isoler celui qui échoue
+            ecrits = []
+            for numero_ligne, document, type_doc in lot:
+                try:
+                    self.archive_store.enregistrer(document, type_doc)
+                    ecrits.append((numero_ligne, document, type_doc))
+                except Exception as e:
+                    rapport.nb_documents_rejetes += 1
+                    self._signaler(rapport, ErreurImport(numero_ligne, f"écriture impossible: {e}", document.numero))
+            lot = ecrits
+
+        rapport.nb_documents += len(lot)
+        if self.repertoire is not None:
+            self.repertoire.enregistrer_lot((document.client, document.date) for _, document, _ in lot)
+        if self.catalogue is not None:
+            self.catalogue.enregistrer_lot((document.articles, document.date) for _, document, _ in lot)
+
+
+def charger_entreprise(chemin: str) -> Entreprise:
+    """Lit la configuration de l'entreprise (config/config_entreprise.json)"""
+    with open(chemin, "r", encoding="utf-8") as f:
+        return entreprise_depuis_dict(json.load(f))
+
+
+def main(argv=None):
+    """Import en ligne de commande d'un fichier CSV ou Excel dans la base des archives"""
+    from archive_store import ArchiveStore
+    from catalogue import CatalogueArticles
+    from repertoire_clients import RepertoireClients
+
+    parser = argparse.ArgumentParser(description="Import de factures et devis (CSV ou Excel) dans les archives myInvo")
+    parser.add_argument("fichier", help="Fichier .csv ou .xlsx (une ligne par article)")
+    parser.add_argument("--entreprise", default=os.path.join("config", "config_entreprise.json"),
+                        help="Configuration de l'entreprise émettrice")
+    parser.add_argument("--dossier", default="archives", help="Dossier des archives")
+    parser.add_argument("--base", default=None, help="Base des archives (par défaut: <dossier>/archives.db)")
+    parser.add_argument("--feuille", default=None, help="Feuille du classeur Excel (par défaut: la feuille active)")
+    parser.add_argument("--separateur", default=None, help="Séparateur CSV (détecté par défaut)")
+    parser.add_argument("--lot", type=int, default=TAILLE_LOT, help="Nombre de documents par transaction")
+    parser.add_argument("--verifier", action="store_true", help="Valider le fichier sans rien écrire")
+    parser.add_argument("--sans-index", action="store_true",
+                        help="Ne pas alimenter le répertoire des clients ni le catalogue des articles")
+    parser.add_argument("--erreurs", default=None, help="Fichier CSV où écrire les erreurs")
+    args = parser.parse_args(argv)
+
+    entreprise = charger_entreprise(args.entreprise)
+    store = repertoire = catalogue = None
+    if not args.verifier:
+        store = ArchiveStore(args.base or os.path.join(args.dossier, "archives.db"))
+        if not args.sans_index:
+            repertoire = RepertoireClients(os.path.join(args.dossier, "clients.db"))
+            catalogue = CatalogueArticles(os.path.join(args.dossier, "catalogue.db"))
+
+    fichier_erreurs = open(args.erreurs, "w", encoding="utf-8", newline="") if args.erreurs else None
+    if fichier_erreurs:
+        ecrivain = csv.writer(fichier_erreurs, delimiter=";")
+        ecrivain.writerow(["ligne", "numero", "erreur"])
+
+    def signaler(erreur):
+        if fichier_erreurs:
+            ecrivain.writerow([erreur.ligne, erreur.numero, erreur.message])
+        else:
+            print(f"ERREUR  {erreur}")
+
+    try:
+        import_masse = ImportMasse(store, entreprise, repertoire, catalogue, args.lot, rappel_erreur=signaler)
+        rapport = import_masse.importer(lire_fichier(args.fichier, args.feuille, args.separateur),
+                                        verifier_seulement=args.verifier)
+    finally:
+        if fichier_erreurs:
+            fichier_erreurs.close()
+        for base in (store, repertoire, catalogue):
+            if base is not None:
+                base.fermer()
+
+    action = "valide(s)" if args.verifier else "importé(s)"
+    print(f"{rapport.nb_lignes} ligne(s) lue(s) - {rapport.nb_documents} document(s) {action} - "
+          f"{rapport.nb_documents_rejetes} rejeté(s) - {rapport.nb_erreurs} erreur(s)")
+    return 1 if rapport.nb_erreurs else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,87 @@
+"""
+Instrumentation du rendu PDF - durée et allocations par étape
+"""
+import sys
+import time
+from contextlib import contextmanager, nullcontext
+from dataclasses import dataclass, asdict
+from typing import Callable, List, Optional
+
+
+@dataclass
+class MesureEtape:
+    """Mesure d'une étape de rendu"""
+    etape: str
+    duree: float      # secondes
+    allocations: int  # blocs mémoire alloués (nets) pendant l'étape
+
+
+class CollecteurRendu:
+    """
+    Collecte les mesures des étapes d'un rendu
+
+    Args:
+        rappel: Fonction appelée avec chaque MesureEtape dès qu'elle est prise
+        rappel_avancement: Fonction appelée pendant une étape longue (mise en
+                           page) avec le nom de l'étape et son avancement (0 à 1)
+    """
+
+    def __init__(self, rappel: Optional[Callable[[MesureEtape], None]] = None,
+                 rappel_avancement: Optional[Callable[[str, float], None]] = None):
+        self.rappel = rappel
+        self.rappel_avancement = rappel_avancement
+        self.mesures: List[MesureEtape] = []
+
+    @contextmanager
+    def etape(self, nom: str):
+        """Mesure le bloc de code exécuté dans le contexte"""
+        blocs = sys.getallocatedblocks()
+        debut = time.perf_counter()
+        try:
+            yield
+        finally:
+            mesure = MesureEtape(
+                etape=nom,
+                duree=time.perf_counter() - debut,
+                allocations=sys.getallocatedblocks() - blocs,
+            )
+            self.mesures.append(mesure)
+            if self.rappel:
+                self.rappel(mesure)
+
+    def avancer(self, etape: str, fraction: float):
+        """Signale l'avancement de l'étape en cours"""
+        if self.rappel_avancement:
+            self.rappel_avancement(etape, fraction)
+
+    def duree_totale(self) -> float:
+        """Somme des durées de toutes les étapes (secondes)"""
+        return sum(mesure.duree for mesure in self.mesures)
+
+    def en_dict(self) -> dict:
+        """Mesures au format {etape: {"duree": ..., "allocations": ...}}"""
+        return {mesure.etape: {"duree": mesure.duree, "allocations": mesure.allocations}
+                for mesure in self.mesures}
+
+    def journaliser(self, logger, contexte: str = ""):
+        """Émet un enregistrement structuré par étape sur le logger donné"""
+        for mesure in self.mesures:
+            logger.info(
+                f"RENDU {contexte} etape={mesure.etape} duree_ms={mesure.duree * 1000:.2f} "
+                f"allocations={mesure.allocations}",
+                extra={"mesure": asdict(mesure)}
+            )
+
+
+def collecteur(instrumentation) -> Optional[CollecteurRendu]:
+    """Accepte un CollecteurRendu, une fonction de rappel ou None"""
+    if instrumentation is None or isinstance(instrumentation, CollecteurRendu):
+        return instrumentation
+    return CollecteurRendu(rappel=instrumentation)
+
+
+def etape(instrumentation: Optional[CollecteurRendu], nom: str):
+    """Contexte de mesure d'une étape (sans coût si l'instrumentation est absente)"""
+    if instrumentation is None:
+        return nullcontext()
+    return instrumentation.etape(nom)
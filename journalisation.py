@@ -0,0 +1,155 @@
+"""
+Journalisation asynchrone - QueueHandler / QueueListener
+
+Les enregistrements sont déposés dans une file par le thread appelant (sans
+aucune écriture disque) puis écrits par le thread du QueueListener. Les
+fichiers sont vidés sur disque par lots : quand la file est vide ou tous les
+TAILLE_LOT enregistrements. Ils tournent selon leur taille et leur âge.
+"""
+import atexit
+import logging
+import logging.handlers
+import os
+import queue
+import time
+
+
+# Logger des actions d'édition fréquentes (ajout d'article, totaux...)
+LOGGER_EDITEUR = "myInvo.editeur"
+
+# Niveaux proposés pour ce logger dans les préférences
+NIVEAUX_LOG_EDITEUR = ("DEBUG", "INFO", "WARNING")
+
+FORMAT_JOURNAL = '%(asctime)s - %(levelname)s - %(funcName)s:%(lineno)d - %(message)s'
+FORMAT_DATE = '%Y-%m-%d %H:%M:%S'
+
+# Rotation : taille maximale d'un fichier, âge maximal, nombre d'anciens fichiers gardés
+TAILLE_MAX_JOURNAL = 5 * 1024 * 1024
+AGE_MAX_JOURNAL = 24 * 3600
+NB_SAUVEGARDES = 10
+
+# Nombre maximal d'enregistrements écrits entre deux vidages sur disque
+TAILLE_LOT = 100
+
+
+class FichierJournalRotatif(logging.handlers.RotatingFileHandler):
+    """
+    Fichier de journal qui tourne à la taille ou à l'âge maximal
+
+    L'écriture est mise en tampon : flush() ne vide le fichier que tous les
+    taille_lot enregistrements, vider() le fait immédiatement.
+    """
+
+    def __init__(self, fichier, taille_max=TAILLE_MAX_JOURNAL, age_max=AGE_MAX_JOURNAL,
+                 nb_sauvegardes=NB_SAUVEGARDES, taille_lot=TAILLE_LOT):
+        super().__init__(fichier, maxBytes=taille_max, backupCount=nb_sauvegardes,
+                         encoding='utf-8', delay=True)
+        self.age_max = age_max
+        self.taille_lot = taille_lot
+        self._en_attente = 0
+        debut = os.path.getmtime(fichier) if os.path.exists(fichier) else time.time()
+        self.prochaine_rotation = debut + age_max
+
+    def shouldRollover(self, record):
+        if time.time() >= self.prochaine_rotation:
+            return True
+        return super().shouldRollover(record)
+
+    def doRollover(self):
+        super().doRollover()
+        self.prochaine_rotation = time.time() + self.age_max
+
+    def flush(self):
+        """Appelé après chaque enregistrement : vidage effectif par lots"""
+        self._en_attente += 1
+        if self._en_attente >= self.taille_lot:
+            self.vider()
+
+    def vider(self):
+        """Vide immédiatement le tampon du fichier sur disque"""
+        self._en_attente = 0
+        super().flush()
+
+    def close(self):
+        self.vider()
+        super().close()
+
+
+class EcouteurJournal(logging.handlers.QueueListener):
+    """QueueListener qui vide les fichiers dès que la file est épuisée"""
+
+    def handle(self, record):
+        super().handle(record)
+        if self.queue.empty():
+            for handler in self.handlers:
+                if isinstance(handler, FichierJournalRotatif):
+                    handler.vider()
+                else:
+                    handler.flush()
+
+
+def configurer_journalisation(logger: logging.Logger, dossier_logs: str,
+                              taille_max: int = TAILLE_MAX_JOURNAL, age_max: int = AGE_MAX_JOURNAL,
+                              nb_sauvegardes: int = NB_SAUVEGARDES) -> EcouteurJournal:
+    """
+    Relie le logger à un QueueHandler et démarre l'écouteur qui écrit les fichiers
+
+    Fichiers écrits dans dossier_logs : myinvo.log (tout ce que les loggers
+    laissent passer, leur niveau décide) et myinvo_errors.log (ERROR et plus).
+    Les avertissements sont aussi affichés sur la console.
+
+    Returns:
+        L'écouteur démarré (arrêté automatiquement à la sortie du programme)
+    """
+    formatter = logging.Formatter(FORMAT_JOURNAL, datefmt=FORMAT_DATE)
+
+    fichier_principal = FichierJournalRotatif(os.path.join(dossier_logs, 'myinvo.log'),
+                                              taille_max, age_max, nb_sauvegardes)
+    # Pas de seuil sur le fichier principal : definir_niveau_editeur(DEBUG) doit y aboutir
+    fichier_principal.setLevel(logging.NOTSET)
+    fichier_principal.setFormatter(formatter)
+
+    fichier_erreurs = FichierJournalRotatif(os.path.join(dossier_logs, 'myinvo_errors.log'),
+                                            taille_max, age_max, nb_sauvegardes)
+    fichier_erreurs.setLevel(logging.ERROR)
+    fichier_erreurs.setFormatter(formatter)
+
+    console = logging.StreamHandler()
+    console.setLevel(logging.WARNING)
+    console.setFormatter(formatter)
+
+    file_attente = queue.SimpleQueue()
+    logger.addHandler(logging.handlers.QueueHandler(file_attente))
+
+    ecouteur = EcouteurJournal(file_attente, fichier_principal, fichier_erreurs, console,
+                               respect_handler_level=True)
+    ecouteur.start()
+    atexit.register(arreter_journalisation, ecouteur)
+    return ecouteur
+
+
+def arreter_journalisation(ecouteur: EcouteurJournal):
+    """Écrit les enregistrements en attente puis arrête l'écouteur (sans effet s'il est déjà arrêté)"""
+    if getattr(ecouteur, '_thread', None) is None:
+        return
+    ecouteur.stop()
+    for handler in ecouteur.handlers:
+        handler.close()
+
+
+def definir_niveau_editeur(niveau) -> int:
+    """
+    Règle le niveau du logger des actions d'édition fréquentes
+
+    Args:
+        niveau: Nom ("DEBUG", "INFO", "WARNING"...) ou valeur numérique
+
+    Returns:
+        Le niveau appliqué (INFO si le nom est inconnu)
+    """
+    if isinstance(niveau, str):
+        niveau = logging.getLevelName(niveau.upper())
+    if not isinstance(niveau, int):
+        niveau = logging.INFO
+    logging.getLogger(LOGGER_EDITEUR).setLevel(niveau)
+    return niveau
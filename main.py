@@ -1,6 +1,7 @@
 """
 Interface principale du logiciel de facturation et devis - Version PyQt6
 """
+from demarrage import chrono
 import sys
 from PyQt6.QtWidgets import (QApplication, QMainWindow, QWidget, QVBoxLayout, 
                              QHBoxLayout, QGridLayout, QTabWidget, QGroupBox,
@@ -8,20 +9,36 @@ from PyQt6.QtWidgets import (QApplication, QMainWindow, QWidget, QVBoxLayout,
                              QTreeWidget, QTreeWidgetItem, QTextEdit,
                              QMenuBar, QMenu, QMessageBox, QFileDialog,
                              QButtonGroup, QFormLayout, QScrollArea,
-                             QComboBox, QCheckBox)
-from PyQt6.QtCore import Qt, pyqtSignal, QDate
+                             QComboBox, QCheckBox, QProgressDialog)
+from PyQt6.QtCore import Qt, pyqtSignal, QDate, QThreadPool
 from PyQt6.QtGui import QAction, QFont, QIcon, QPixmap, QPainter, QBrush, QColor, QPen
 from datetime import datetime
-from decimal import Decimal
+from decimal import Decimal, InvalidOperation
 import json
 import os
 import logging
 import traceback
 from datetime import datetime as dt
-from models import Client, Article, Devis, Facture, Entreprise
-from pdf_generator import PDFGenerator
+from models import Client, Article, Devis, Facture, Entreprise, AccumulateurTotaux
+from archive import lire_fichier_archive, EXTENSION_ARCHIVE
+from archive_store import ArchiveStore
+from archive_browser import ArchiveBrowser
+from tache_rendu import TacheRendu, creer_pool_rendu
+from cache_rendu import CacheRendu
+from repertoire_clients import RepertoireClients
+from tache_index import TacheIndex, TacheImportArchives
+from catalogue import CatalogueArticles
+from completeurs import CompleteurClients, CompleteurArticles
 from keygen.license_manager import LicenseManager, LicenseDialog, show_trial_info
+from journalisation import (configurer_journalisation, arreter_journalisation, definir_niveau_editeur,
+                            LOGGER_EDITEUR, NIVEAUX_LOG_EDITEUR)
+from evenements import (JournalEvenements, ARTICLE_AJOUTE, ARTICLE_SUPPRIME, TOTAUX_MIS_A_JOUR,
+                        PDF_GENERE, DOCUMENT_SAUVEGARDE, DOCUMENT_CHARGE, STATUT_ERREUR, STATUT_ANNULE)
 import re
+import threading
+import time
+
+chrono.marquer("imports")
 
 
 class ApplicationFacturation(QMainWindow):
@@ -65,24 +82,41 @@ class ApplicationFacturation(QMainWindow):
         # Créer et définir l'icône de l'application
         self.setWindowIcon(self.create_app_icon())
         
-        self.pdf_generator = PDFGenerator()
         self.articles_list = []
+        self.totaux_articles = AccumulateurTotaux()
+        
+        chrono.marquer("creation_fenetre")
         
         # Définir le répertoire de travail selon le mode d'exécution
-        self.setup_working_directory()
+        with chrono.phase("setup_working_directory"):
+            self.setup_working_directory()
         
         # Créer tous les dossiers nécessaires s'ils n'existent pas
-        folders_to_create = ["config", "devis", "factures", "archives", "logs"]
-        for folder in folders_to_create:
-            folder_path = os.path.join(self.working_dir, folder)
-            if not os.path.exists(folder_path):
-                os.makedirs(folder_path)
+        with chrono.phase("creation_dossiers"):
+            folders_to_create = ["config", "devis", "factures", "archives", "logs"]
+            for folder in folders_to_create:
+                folder_path = os.path.join(self.working_dir, folder)
+                if not os.path.exists(folder_path):
+                    os.makedirs(folder_path)
         
         # Configurer le système de logging
-        self.setup_logging()
+        with chrono.phase("setup_logging"):
+            self.setup_logging()
+        
+        # Générateur PDF créé au premier rendu ou préchauffé après l'affichage
+        # (l'import de reportlab et svglib est le plus coûteux du démarrage)
+        self._pdf_generator = None
+        self._verrou_pdf = threading.Lock()
+        # Les rendus s'exécutent hors du thread de l'interface, un à la fois
+        self.pool_rendu = creer_pool_rendu()
+        
+        # Ouvrir la base indexée des archives
+        with chrono.phase("setup_archive_store"):
+            self.setup_archive_store()
         
         # Initialiser le gestionnaire de licence
-        self.license_manager = LicenseManager(self.working_dir)
+        with chrono.phase("license_manager"):
+            self.license_manager = LicenseManager(self.working_dir)
         
         # Vérifier s'il y a une clé d'installation depuis l'installateur (différé pour optimiser le démarrage)
         from PyQt6.QtCore import QTimer
@@ -92,13 +126,21 @@ class ApplicationFacturation(QMainWindow):
         self.preferences_file = os.path.join(self.working_dir, "config", "preferences_utilisateur.json")
         
         # Charger la configuration de l'entreprise
-        self.entreprise = self.charger_config_entreprise()
+        with chrono.phase("charger_config_entreprise"):
+            self.entreprise = self.charger_config_entreprise()
         
         # Charger les préférences utilisateur
-        self.preferences = self.charger_preferences()
-        
-        self.setup_ui()
-        self.setup_menu()
+        with chrono.phase("charger_preferences"):
+            self.preferences = self.charger_preferences()
+            definir_niveau_editeur(self.preferences.get("niveau_log_editeur", "INFO"))
+            # Journal d'événements structuré (optionnel)
+            self.evenements = JournalEvenements(os.path.join(self.working_dir, 'logs'),
+                                                self.preferences.get("journal_evenements", False))
+        
+        with chrono.phase("setup_ui"):
+            self.setup_ui()
+        with chrono.phase("setup_menu"):
+            self.setup_menu()
         
         # Logger le démarrage de l'application
         version_info = self.get_version_info()
@@ -111,6 +153,41 @@ class ApplicationFacturation(QMainWindow):
         from PyQt6.QtCore import QTimer
         QTimer.singleShot(100, self.check_license)  # Vérifier dans 100ms
     
+    @property
+    def pdf_generator(self):
+        """Générateur PDF avec cache des rendus, créé au premier accès"""
+        with self._verrou_pdf:
+            if self._pdf_generator is None:
+                from pdf_generator import PDFGenerator
+                self._pdf_generator = PDFGenerator(
+                    cache=CacheRendu(os.path.join(self.working_dir, "cache", "pdf")))
+            return self._pdf_generator
+    
+    def prechauffer_pdf(self):
+        """Charge reportlab/svglib et crée le générateur PDF dans un thread d'arrière-plan"""
+        def prechauffer():
+            debut = time.perf_counter()
+            try:
+                self.pdf_generator
+            except Exception as e:
+                self.log_warning(f"Préchauffage du générateur PDF impossible: {e}")
+                return
+            self.logger.info(f"DEMARRAGE prechauffage_pdf duree_ms={(time.perf_counter() - debut) * 1000:.1f}")
+        
+        threading.Thread(target=prechauffer, name="prechauffage-pdf", daemon=True).start()
+    
+    def premier_affichage(self):
+        """Appelé une fois la fenêtre affichée : rapport de démarrage puis préchauffage"""
+        chrono.marquer("premier_affichage")
+        chrono.journaliser(self.logger)
+        if chrono.profilage:
+            try:
+                rapport = chrono.ecrire_rapport(os.path.join(self.working_dir, "logs"))
+                self.log_info(f"Rapport de démarrage écrit: {rapport}")
+            except Exception as e:
+                self.log_error("Erreur lors de l'écriture du rapport de démarrage", e)
+        self.prechauffer_pdf()
+    
     def setup_working_directory(self):
         """Configure le répertoire de travail selon le mode d'exécution"""
         if getattr(sys, 'frozen', False):
@@ -121,6 +198,61 @@ class ApplicationFacturation(QMainWindow):
             # Mode développement - utiliser le dossier courant
             self.working_dir = os.getcwd()
     
+    def setup_archive_store(self):
+        """Ouvre la base indexée des archives et y importe les archives existantes (en arrière-plan)"""
+        archives_dir = os.path.join(self.working_dir, "archives")
+        self.archive_store = ArchiveStore(os.path.join(archives_dir, "archives.db"))
+        self.taches_index = []
+        
+        # Répertoire des clients pour l'auto-complétion (rempli en arrière-plan à sa création)
+        chemin_clients = os.path.join(archives_dir, "clients.db")
+        self.repertoire_clients = RepertoireClients(chemin_clients)
+        
+        # Catalogue des articles pour l'auto-complétion (rempli en arrière-plan à sa création)
+        chemin_catalogue = os.path.join(archives_dir, "catalogue.db")
+        self.catalogue = CatalogueArticles(chemin_catalogue)
+        
+        # Index à construire depuis la base des archives, une fois celle-ci remplie
+        self.imports_index_en_attente = []
+        if self.repertoire_clients.nouveau:
+            self.imports_index_en_attente.append(
+                ("Répertoire clients", lambda: RepertoireClients(chemin_clients)))
+        if self.catalogue.nouveau:
+            self.imports_index_en_attente.append(
+                ("Catalogue", lambda: CatalogueArticles(chemin_catalogue)))
+        
+        if self.archive_store.nouvelle:
+            self.lancer_tache_index(TacheImportArchives("Base des archives", archives_dir, self.archive_store.chemin))
+        else:
+            self.lancer_imports_index_en_attente()
+    
+    def lancer_imports_index_en_attente(self):
+        """Lance la construction des index d'auto-complétion qui n'ont pas encore abouti"""
+        for nom, ouvrir_index in self.imports_index_en_attente:
+            self.lancer_tache_index(TacheIndex(nom, ouvrir_index, self.archive_store.chemin))
+        self.imports_index_en_attente = []
+    
+    def lancer_tache_index(self, tache):
+        """Exécute une TacheIndex (ou TacheImportArchives) hors du thread de l'interface"""
+        tache.signaux.termine.connect(self.import_index_termine)
+        tache.signaux.document_ignore.connect(
+            lambda nom, numero, erreur: self.log_warning(f"{nom} : document {numero} ignoré - {erreur}"))
+        tache.signaux.erreur.connect(
+            lambda nom, message, trace: self.logger.error(
+                f"ERREUR: Import des archives dans l'index {nom} - Exception: {message}\nTraceback:\n{trace}"))
+        # Gardée pour pouvoir l'interrompre à la fermeture (reprise au lancement suivant)
+        self.taches_index.append(tache)
+        QThreadPool.globalInstance().start(tache)
+    
+    def import_index_termine(self, nom, nb_documents, nb_entrees):
+        """Fin de l'import d'un index : les fréquences mises en cache sont périmées"""
+        if nom == "Répertoire clients":
+            self.repertoire_clients.invalider_frequences()
+        self.log_info(f"{nom} créé - {nb_entrees} entrée(s) depuis {nb_documents} archive(s)")
+        if nom == "Base des archives":
+            # Les index se construisent depuis la base des archives désormais complète
+            self.lancer_imports_index_en_attente()
+    
     def check_installer_key(self):
         """Vérifie s'il y a une clé d'installation depuis l'installateur"""
         temp_key_file = os.path.join(self.working_dir, "config", "install_key_temp.txt")
@@ -159,6 +291,10 @@ class ApplicationFacturation(QMainWindow):
         ouvrir_action = QAction("Ouvrir une archive", self)
         ouvrir_action.triggered.connect(self.ouvrir_document)
         file_menu.addAction(ouvrir_action)
+        
+        parcourir_action = QAction("Parcourir les archives", self)
+        parcourir_action.triggered.connect(self.parcourir_archives)
+        file_menu.addAction(parcourir_action)
               
         quitter_action = QAction("Quitter", self)
         quitter_action.triggered.connect(self.close)
@@ -324,6 +460,11 @@ class ApplicationFacturation(QMainWindow):
         self.client_ville = QLineEdit()
         layout.addWidget(self.client_ville, 3, 3)
         
+        # Auto-complétion depuis le répertoire des clients
+        for champ, cle in ((self.client_nom, "nom"), (self.client_entreprise, "entreprise")):
+            completeur = CompleteurClients(self.repertoire_clients, champ, cle, self)
+            completeur.proposition_choisie.connect(self.remplir_client)
+        
         # Configuration des colonnes pour l'étirement
         layout.setColumnStretch(1, 1)
         layout.setColumnStretch(3, 1)
@@ -341,7 +482,10 @@ class ApplicationFacturation(QMainWindow):
         form_layout.addWidget(QLabel("Désignation:"))
         self.article_designation = QLineEdit()
         self.article_designation.setMinimumWidth(250)
+        self.article_designation.setPlaceholderText("Rechercher dans le catalogue...")
         form_layout.addWidget(self.article_designation)
+        completeur = CompleteurArticles(self.catalogue, self.article_designation, self)
+        completeur.proposition_choisie.connect(self.ajouter_article_catalogue)
         
         form_layout.addWidget(QLabel("Qté:"))
         self.article_qte = QLineEdit()
@@ -515,7 +659,7 @@ class ApplicationFacturation(QMainWindow):
                 QMessageBox.warning(self, "Attention", "Veuillez saisir un prix")
                 return
             
-            quantite = float(qte_str.replace(',', '.'))
+            quantite = Decimal(qte_str.replace(',', '.'))
             prix = Decimal(prix_str.replace(',', '.'))
             tva = Decimal(self.article_tva.text().replace(',', '.'))
             
@@ -527,6 +671,7 @@ class ApplicationFacturation(QMainWindow):
             )
             
             self.articles_list.append(article)
+            self.totaux_articles.ajouter(article)
             
             # Ajouter à la TreeWidget
             item = QTreeWidgetItem([
@@ -546,13 +691,26 @@ class ApplicationFacturation(QMainWindow):
             self.article_tva.setText(self.preferences.get("tva_defaut", "20.0"))
             
             self.mettre_a_jour_totaux()
-            self.log_info(f"Article ajouté: {designation} - Qte: {quantite} - Prix: {prix}€ - TVA: {tva}%")
-            self.log_info(f"Nombre total d'articles: {len(self.articles_list)}")
+            self.logger_editeur.info(f"Article ajouté: {designation} - Qte: {quantite} - Prix: {prix}€ - TVA: {tva}%")
+            self.logger_editeur.debug(f"Nombre total d'articles: {len(self.articles_list)}")
+            self.evenements.emettre(ARTICLE_AJOUTE, nb_articles=len(self.articles_list),
+                                    montant_ht=str(article.get_montant_ht()))
             
-        except ValueError as e:
+        except (ValueError, InvalidOperation) as e:
             self.log_error("Erreur de saisie lors de l'ajout d'article", e)
+            self.evenements.emettre(ARTICLE_AJOUTE, STATUT_ERREUR, erreur=str(e))
             QMessageBox.critical(self, "Erreur", f"Erreur de saisie: {e}")
     
+    def ajouter_article_catalogue(self, entree):
+        """Ajoute directement l'article choisi dans le catalogue (quantité 1 si non saisie)"""
+        self.article_designation.setText(entree.designation)
+        # Reprendre les valeurs exactes (pas d'arrondi d'affichage sur un prix à 3 décimales)
+        self.article_prix.setText(str(entree.prix_unitaire))
+        self.article_tva.setText(str(entree.tva))
+        if not self.article_qte.text().strip():
+            self.article_qte.setText("1")
+        self.ajouter_article()
+    
     def supprimer_article(self):
         """Supprime l'article sélectionné"""
         current_item = self.articles_tree.currentItem()
@@ -570,25 +728,29 @@ class ApplicationFacturation(QMainWindow):
         
         index = self.articles_tree.indexOfTopLevelItem(current_item)
         article_supprime = self.articles_list[index]
-        self.log_info(f"Article supprimé: {article_supprime.designation} - Index: {index}")
+        self.logger_editeur.info(f"Article supprimé: {article_supprime.designation} - Index: {index}")
         
         self.articles_tree.takeTopLevelItem(index)
         del self.articles_list[index]
+        self.totaux_articles.retirer(article_supprime)
         
-        self.log_info(f"Nombre d'articles restants: {len(self.articles_list)}")
+        self.logger_editeur.debug(f"Nombre d'articles restants: {len(self.articles_list)}")
+        self.evenements.emettre(ARTICLE_SUPPRIME, nb_articles=len(self.articles_list))
         self.mettre_a_jour_totaux()
     
     def mettre_a_jour_totaux(self):
         """Met à jour l'affichage des totaux"""
-        total_ht = sum(article.get_montant_ht() for article in self.articles_list)
-        total_tva = sum(article.get_montant_tva() for article in self.articles_list)
-        total_ttc = total_ht + total_tva
-        
-        self.label_total_ht.setText(f"Total HT: {total_ht:.2f} €")
-        self.label_total_tva.setText(f"Total TVA: {total_tva:.2f} €")
-        self.label_total_ttc.setText(f"Total TTC: {total_ttc:.2f} €")
+        with self.evenements.mesurer(TOTAUX_MIS_A_JOUR, nb_articles=len(self.articles_list)):
+            totaux = self.totaux_articles.resume()
+            total_ht = totaux.total_ht
+            total_tva = totaux.total_tva
+            total_ttc = totaux.total_ttc
+            
+            self.label_total_ht.setText(f"Total HT: {total_ht:.2f} €")
+            self.label_total_tva.setText(f"Total TVA: {total_tva:.2f} €")
+            self.label_total_ttc.setText(f"Total TTC: {total_ttc:.2f} €")
         
-        self.log_info(f"Totaux mis à jour - HT: {total_ht:.2f}€, TVA: {total_tva:.2f}€, TTC: {total_ttc:.2f}€")
+        self.logger_editeur.debug(f"Totaux mis à jour - HT: {total_ht:.2f}€, TVA: {total_tva:.2f}€, TTC: {total_ttc:.2f}€")
     
     def creer_client(self):
         """Crée un objet Client à partir des champs du formulaire"""
@@ -691,15 +853,10 @@ class ApplicationFacturation(QMainWindow):
                 # Créer les dossiers nécessaires
                 self.creer_dossiers_archive()
                 
-                # Sauvegarder le document en JSON
-                json_filename = self.sauvegarder_document(document, type_label)
-                
-                # Générer le PDF
+                # Générer le PDF et l'archive en arrière-plan
                 is_trial = not self.license_manager.is_activated()
-                self.pdf_generator.generer_pdf(document, fichier, type_label, is_trial)
-                self.log_info(f"{type_label} généré avec succès: {fichier}")
-                QMessageBox.information(self, "Succès", 
-                    f"{type_label} généré(e) avec succès!\nPDF: {fichier}\nArchive: {json_filename}")
+                fichier_archive = os.path.join(self.working_dir, "archives", f"{type_label.lower()}_{numero}{EXTENSION_ARCHIVE}")
+                self.lancer_rendu(document, fichier, type_label, is_trial, fichier_archive)
         
         except ValueError as e:
             self.log_error("Erreur de format de date lors de la génération PDF", e)
@@ -708,6 +865,64 @@ class ApplicationFacturation(QMainWindow):
             self.log_error("Erreur lors de la génération du PDF", e)
             QMessageBox.critical(self, "Erreur", f"Erreur lors de la génération du PDF:\n{e}")
     
+    def lancer_rendu(self, document, fichier, type_label, is_trial, fichier_archive):
+        """Lance la génération du PDF dans le pool de rendu avec une fenêtre de progression"""
+        tache = TacheRendu(self.pdf_generator, document, fichier, type_label, is_trial, fichier_archive)
+        
+        progression = QProgressDialog(f"Génération du {type_label.lower()} {document.numero}...",
+                                      "Annuler", 0, 100, self)
+        progression.setWindowTitle("Génération PDF")
+        progression.setWindowModality(Qt.WindowModality.WindowModal)
+        progression.setMinimumDuration(300)
+        progression.setAutoClose(False)
+        progression.setAutoReset(False)
+        progression.canceled.connect(tache.annuler)
+        
+        def avancer(pourcentage, libelle):
+            progression.setValue(pourcentage)
+            if libelle:
+                progression.setLabelText(libelle)
+        
+        def terminer(mesures):
+            progression.close()
+            self.evenements.emettre(PDF_GENERE, type_doc=type_label, nb_articles=len(document.articles),
+                                    duree_ms=round(mesures.duree_totale() * 1000, 3),
+                                    taille_octets=os.path.getsize(fichier) if os.path.exists(fichier) else None)
+            try:
+                # Indexation dans la base (connexion SQLite du thread de l'interface) ;
+                # la durée de l'écriture de l'archive par la tâche est comptée avec
+                with self.evenements.mesurer(DOCUMENT_SAUVEGARDE, duree_prealable=tache.duree_archive,
+                                             type_doc=type_label, nb_articles=len(document.articles),
+                                             duree_ecriture_ms=round(tache.duree_archive * 1000, 3)):
+                    self.archive_store.enregistrer(document, type_label)
+                    self.repertoire_clients.enregistrer(document.client, document.date)
+                    self.catalogue.enregistrer(document.articles, document.date)
+            except Exception as e:
+                self.log_error(f"Erreur lors de l'indexation de {type_label} {document.numero}", e)
+            mesures.journaliser(self.logger.getChild('rendu'), f"{type_label} {document.numero}")
+            self.log_info(f"{type_label} généré avec succès: {fichier} ({mesures.duree_totale() * 1000:.0f} ms)")
+            QMessageBox.information(self, "Succès", 
+                f"{type_label} généré(e) avec succès!\nPDF: {fichier}\nArchive: {fichier_archive}")
+        
+        def echouer(message, trace):
+            progression.close()
+            self.logger.error(f"ERREUR: Erreur lors de la génération du PDF - Exception: {message}\nTraceback:\n{trace}")
+            self.evenements.emettre(PDF_GENERE, STATUT_ERREUR, type_doc=type_label, erreur=message)
+            QMessageBox.critical(self, "Erreur", f"Erreur lors de la génération du PDF:\n{message}")
+        
+        def annuler():
+            progression.close()
+            self.log_info(f"Génération de {type_label} {document.numero} annulée")
+            self.evenements.emettre(PDF_GENERE, STATUT_ANNULE, type_doc=type_label)
+        
+        tache.signaux.progression.connect(avancer)
+        tache.signaux.termine.connect(terminer)
+        tache.signaux.erreur.connect(echouer)
+        tache.signaux.annule.connect(annuler)
+        
+        self.log_info(f"Génération de {type_label} {document.numero} lancée en arrière-plan")
+        self.pool_rendu.start(tache)
+    
     def reinitialiser(self):
         """Réinitialise le formulaire"""
         reply = QMessageBox.question(self, "Confirmation", 
@@ -732,6 +947,7 @@ class ApplicationFacturation(QMainWindow):
             nb_articles = len(self.articles_list)
             self.articles_tree.clear()
             self.articles_list.clear()
+            self.totaux_articles.vider()
             self.mettre_a_jour_totaux()
             
             self.log_info(f"Formulaire réinitialisé - {nb_articles} articles supprimés")
@@ -756,115 +972,11 @@ class ApplicationFacturation(QMainWindow):
             if not os.path.exists(dossier_path):
                 os.makedirs(dossier_path)
     
-    def sauvegarder_document(self, document, type_doc):
-        """Sauvegarde un document en JSON dans le dossier archives"""
-        self.creer_dossiers_archive()
-        
-        # Préparer les données pour JSON
-        data = {
-            'numero': document.numero,
-            'date': document.date.isoformat(),
-            'entreprise': {
-                'nom': document.entreprise.nom,
-                'adresse': document.entreprise.adresse,
-                'code_postal': document.entreprise.code_postal,
-                'ville': document.entreprise.ville,
-                'siret': document.entreprise.siret,
-                'tva_intracommunautaire': document.entreprise.tva_intracommunautaire,
-                'telephone': document.entreprise.telephone,
-                'email': document.entreprise.email,
-                'logo': document.entreprise.logo
-            },
-            'client': {
-                'nom': document.client.nom,
-                'prenom': document.client.prenom,
-                'entreprise': document.client.entreprise,
-                'adresse': document.client.adresse,
-                'code_postal': document.client.code_postal,
-                'ville': document.client.ville,
-                'email': document.client.email,
-                'telephone': document.client.telephone
-            },
-            'articles': [
-                {
-                    'designation': art.designation,
-                    'quantite': float(art.quantite),
-                    'prix_unitaire': float(art.prix_unitaire),
-                    'tva': float(art.tva)
-                } for art in document.articles
-            ],
-            'conditions': document.conditions,
-            'notes': document.notes,
-            'type': type_doc.lower()
-        }
-        
-        # Ajouter les champs spécifiques
-        if isinstance(document, Devis):
-            data['validite_jours'] = document.validite_jours
-        elif isinstance(document, Facture):
-            data['date_echeance'] = document.date_echeance.isoformat()
-            data['reference_devis'] = document.reference_devis
-            data['payee'] = document.payee
-        
-        # Sauvegarder
-        filename = os.path.join(self.working_dir, "archives", f"{type_doc.lower()}_{document.numero}.json")
-        with open(filename, 'w', encoding='utf-8') as f:
-            json.dump(data, f, ensure_ascii=False, indent=4)
-        
-        return filename
-    
     def charger_document(self, filename):
-        """Charge un document depuis un fichier JSON"""
+        """Charge un document depuis un fichier d'archive (compact ou JSON)"""
         try:
-            with open(filename, 'r', encoding='utf-8') as f:
-                data = json.load(f)
-            
-            # Reconstituer l'entreprise
-            entreprise_data = data['entreprise']
-            entreprise = Entreprise(**entreprise_data)
-            
-            # Reconstituer le client
-            client_data = data['client']
-            client = Client(**client_data)
-            
-            # Reconstituer les articles
-            articles = []
-            for art_data in data['articles']:
-                article = Article(
-                    designation=art_data['designation'],
-                    quantite=Decimal(str(art_data['quantite'])),
-                    prix_unitaire=Decimal(str(art_data['prix_unitaire'])),
-                    tva=Decimal(str(art_data['tva']))
-                )
-                articles.append(article)
-            
-            # Créer le document approprié
-            if data['type'] == 'devis':
-                document = Devis(
-                    numero=data['numero'],
-                    date=datetime.fromisoformat(data['date']),
-                    client=client,
-                    articles=articles,
-                    entreprise=entreprise,
-                    conditions=data['conditions'],
-                    notes=data['notes'],
-                    validite_jours=data['validite_jours']
-                )
-            else:  # facture
-                document = Facture(
-                    numero=data['numero'],
-                    date=datetime.fromisoformat(data['date']),
-                    client=client,
-                    articles=articles,
-                    entreprise=entreprise,
-                    conditions=data['conditions'],
-                    notes=data['notes'],
-                    date_echeance=datetime.fromisoformat(data['date_echeance']),
-                    reference_devis=data.get('reference_devis', ''),
-                    payee=data.get('payee', False)
-                )
-            
-            return document, data['type']
+            with self.evenements.mesurer(DOCUMENT_CHARGE, source="fichier"):
+                return lire_fichier_archive(filename)
             
         except Exception as e:
             self.log_error(f"Erreur lors du chargement du document {filename}", e)
@@ -879,7 +991,7 @@ class ApplicationFacturation(QMainWindow):
             self,
             "Ouvrir un document",
             archives_dir,
-            "Documents JSON (*.json);;All Files (*)"
+            f"Archives myInvo (*{EXTENSION_ARCHIVE} *.json);;All Files (*)"
         )
         
         if fichier:
@@ -891,25 +1003,61 @@ class ApplicationFacturation(QMainWindow):
         else:
             self.log_info("Chargement de document annulé")
     
+    def parcourir_archives(self):
+        """Ouvre le navigateur des archives"""
+        self.log_info("Ouverture du navigateur des archives")
+        if getattr(self, 'archive_browser', None) is None:
+            self.archive_browser = ArchiveBrowser(self.archive_store, self)
+            self.archive_browser.document_selectionne.connect(self.ouvrir_document_archive)
+        else:
+            self.archive_browser.model.recharger()
+        self.archive_browser.show()
+        self.archive_browser.raise_()
+        self.archive_browser.activateWindow()
+    
+    def charger_document_archive(self, id_document):
+        """Charge un document depuis la base des archives"""
+        try:
+            with self.evenements.mesurer(DOCUMENT_CHARGE, source="archives"):
+                return self.archive_store.charger(id_document)
+            
+        except Exception as e:
+            self.log_error(f"Erreur lors du chargement du document d'archive {id_document}", e)
+            QMessageBox.critical(self, "Erreur", f"Erreur lors du chargement: {e}")
+            return None, None
+    
+    def ouvrir_document_archive(self, id_document):
+        """Charge dans l'interface le document choisi dans le navigateur des archives"""
+        self.log_info(f"Chargement du document d'archive: {id_document}")
+        document, type_doc = self.charger_document_archive(id_document)
+        if document:
+            self.charger_document_dans_interface(document, type_doc)
+    
+    def remplir_client(self, client):
+        """Remplit les champs client du formulaire"""
+        self.client_nom.setText(client.nom)
+        self.client_prenom.setText(client.prenom)
+        self.client_entreprise.setText(client.entreprise)
+        self.client_adresse.setText(client.adresse)
+        self.client_cp.setText(client.code_postal)
+        self.client_ville.setText(client.ville)
+        self.client_email.setText(client.email)
+        self.client_tel.setText(client.telephone)
+    
     def charger_document_dans_interface(self, document, type_doc):
         """Charge un document dans l'interface utilisateur"""
         # Effacer les données actuelles
         self.articles_list.clear()
         self.articles_tree.clear()
+        self.totaux_articles.vider()
         
         # Charger les informations client
-        self.client_nom.setText(document.client.nom)
-        self.client_prenom.setText(document.client.prenom)
-        self.client_entreprise.setText(document.client.entreprise)
-        self.client_adresse.setText(document.client.adresse)
-        self.client_cp.setText(document.client.code_postal)
-        self.client_ville.setText(document.client.ville)
-        self.client_email.setText(document.client.email)
-        self.client_tel.setText(document.client.telephone)
+        self.remplir_client(document.client)
         
         # Charger les articles
         for article in document.articles:
             self.articles_list.append(article)
+            self.totaux_articles.ajouter(article)
             item = QTreeWidgetItem([
                 article.designation,
                 str(article.quantite),
@@ -948,7 +1096,9 @@ class ApplicationFacturation(QMainWindow):
         return {
             "auto_sauvegarde": True,
             "confirmer_suppression": True,
-            "tva_defaut": "20.0"
+            "tva_defaut": "20.0",
+            "niveau_log_editeur": "INFO",
+            "journal_evenements": False
         }
     
     def sauvegarder_preferences(self):
@@ -973,6 +1123,13 @@ class ApplicationFacturation(QMainWindow):
             self.sauvegarder_preferences()
             # Appliquer la TVA par défaut
             self.article_tva.setText(self.preferences.get("tva_defaut", "20.0"))
+            # Niveau du journal des actions d'édition
+            definir_niveau_editeur(self.preferences.get("niveau_log_editeur", "INFO"))
+            # Activer ou arrêter le journal d'événements
+            if self.preferences.get("journal_evenements", False):
+                self.evenements.activer()
+            else:
+                self.evenements.desactiver()
             QMessageBox.information(self, "Succès", "Préférences mises à jour avec succès")
         else:
             self.log_info("Configuration des préférences annulée")
@@ -1085,37 +1242,20 @@ class ApplicationFacturation(QMainWindow):
         """Configure le système de logging pour les rapports de crash"""
         # Créer le logger principal
         self.logger = logging.getLogger('myInvo')
-        self.logger.setLevel(logging.DEBUG)
+        # Le filtrage se fait sur les loggers : les fichiers écrivent tout ce qui leur parvient
+        self.logger.setLevel(logging.INFO)
         
-        # Éviter la duplication des logs
+        # Logger des actions d'édition fréquentes (niveau réglable dans les préférences)
+        self.logger_editeur = logging.getLogger(LOGGER_EDITEUR)
+        
+        # Éviter la duplication des logs (écouteur déjà démarré par une autre fenêtre)
+        self.ecouteur_journal = None
         if self.logger.handlers:
             return
         
-        # Format des messages de log
-        formatter = logging.Formatter(
-            '%(asctime)s - %(levelname)s - %(funcName)s:%(lineno)d - %(message)s',
-            datefmt='%Y-%m-%d %H:%M:%S'
-        )
-        
-        # Handler pour fichier principal (INFO et plus)
-        log_file = os.path.join(self.working_dir, 'logs', f'myinvo_{dt.now().strftime("%Y%m%d")}.log')
-        file_handler = logging.FileHandler(log_file, encoding='utf-8')
-        file_handler.setLevel(logging.INFO)
-        file_handler.setFormatter(formatter)
-        self.logger.addHandler(file_handler)
-        
-        # Handler pour fichier d'erreurs (ERROR et plus)
-        error_file = os.path.join(self.working_dir, 'logs', f'myinvo_errors_{dt.now().strftime("%Y%m%d")}.log')
-        error_handler = logging.FileHandler(error_file, encoding='utf-8')
-        error_handler.setLevel(logging.ERROR)
-        error_handler.setFormatter(formatter)
-        self.logger.addHandler(error_handler)
-        
-        # Handler pour la console (développement)
-        console_handler = logging.StreamHandler()
-        console_handler.setLevel(logging.WARNING)
-        console_handler.setFormatter(formatter)
-        self.logger.addHandler(console_handler)
+        # Écriture des fichiers (rotation par taille et par âge) dans un thread dédié :
+        # les actions de l'interface ne font que déposer les messages dans une file
+        self.ecouteur_journal = configurer_journalisation(self.logger, os.path.join(self.working_dir, 'logs'))
     
     def log_error(self, message, exception=None):
         """Enregistre une erreur avec tous les détails"""
@@ -1385,10 +1525,31 @@ class ApplicationFacturation(QMainWindow):
                         # Fallback: lancer directement
                         subprocess.Popen([fichier])
             
+            # Laisser se terminer un rendu en cours, interrompre les imports d'index
+            # (repris au prochain lancement) avant de fermer les bases
+            if hasattr(self, 'pool_rendu'):
+                self.pool_rendu.waitForDone()
+            for tache in getattr(self, 'taches_index', []):
+                tache.annuler()
+            QThreadPool.globalInstance().waitForDone()
+            
+            if hasattr(self, 'archive_store'):
+                self.archive_store.fermer()
+            if hasattr(self, 'repertoire_clients'):
+                self.repertoire_clients.fermer()
+            if hasattr(self, 'catalogue'):
+                self.catalogue.fermer()
+            
             # Logger la fermeture
             if hasattr(self, 'logger'):
                 self.log_info("=== Fermeture de myInvo ===")
             
+            # Écrire les messages en attente avant de quitter
+            if hasattr(self, 'evenements'):
+                self.evenements.fermer()
+            if getattr(self, 'ecouteur_journal', None) is not None:
+                arreter_journalisation(self.ecouteur_journal)
+            
             # Accepter l'événement de fermeture
             event.accept()
             
@@ -1514,7 +1675,7 @@ class PreferencesDialog(QWidget):
     def __init__(self, preferences, parent=None):
         super().__init__(parent, Qt.WindowType.Dialog)
         self.setWindowTitle("Préférences")
-        self.setFixedSize(400, 300)
+        self.setFixedSize(400, 330)
         self.setWindowModality(Qt.WindowModality.ApplicationModal)
         self.preferences = preferences.copy()
         self.result_code = 0
@@ -1544,6 +1705,18 @@ class PreferencesDialog(QWidget):
         self.tva_defaut_entry.setText(self.preferences.get("tva_defaut", "20.0"))
         form_layout.addRow("TVA par défaut (%):", self.tva_defaut_entry)
         
+        # Journal d'événements (logs/evenements.jsonl)
+        self.journal_evenements_check = QCheckBox()
+        self.journal_evenements_check.setChecked(self.preferences.get("journal_evenements", False))
+        form_layout.addRow("Journal d'événements:", self.journal_evenements_check)
+        
+        # Niveau du journal des actions d'édition (DEBUG : détail de chaque saisie)
+        self.niveau_log_editeur_combo = QComboBox()
+        self.niveau_log_editeur_combo.addItems(NIVEAUX_LOG_EDITEUR)
+        niveau = str(self.preferences.get("niveau_log_editeur", "INFO")).upper()
+        self.niveau_log_editeur_combo.setCurrentText(niveau if niveau in NIVEAUX_LOG_EDITEUR else "INFO")
+        form_layout.addRow("Journal d'édition:", self.niveau_log_editeur_combo)
+        
         layout.addLayout(form_layout)
         
         # Boutons
@@ -1566,6 +1739,8 @@ class PreferencesDialog(QWidget):
         self.preferences["auto_sauvegarde"] = self.auto_sauvegarde_check.isChecked()
         self.preferences["confirmer_suppression"] = self.confirmer_suppression_check.isChecked()
         self.preferences["tva_defaut"] = self.tva_defaut_entry.text()
+        self.preferences["journal_evenements"] = self.journal_evenements_check.isChecked()
+        self.preferences["niveau_log_editeur"] = self.niveau_log_editeur_combo.currentText()
         
         self.result_code = 1
         self.close()
@@ -1590,7 +1765,13 @@ class PreferencesDialog(QWidget):
 
 
 def main():
-    """Point d'entrée de l'application"""
+    """
+    Point d'entrée de l'application
+    
+    Options:
+        --profile-startup  Écrit un rapport de démarrage (phases, imports) dans logs/
+        --cprofile         Avec --profile-startup, ajoute un profil cProfile du démarrage
+    """
     app = QApplication(sys.argv)
     
     # Style moderne
@@ -1601,6 +1782,10 @@ def main():
     window = ApplicationFacturation()
     window.show()
     
+    # Exécuté après le premier passage de la boucle d'événements (fenêtre peinte)
+    from PyQt6.QtCore import QTimer
+    QTimer.singleShot(0, window.premier_affichage)
+    
     try:
         sys.exit(app.exec())
     except Exception as e:
@@ -3,7 +3,7 @@ Modèles de données pour le système de facturation et devis
 """
 from dataclasses import dataclass, field
 from datetime import datetime
-from typing import List
+from typing import List, Tuple
 from decimal import Decimal
 
 
@@ -26,27 +26,164 @@ class Client:
         return f"{self.prenom} {self.nom}".strip()
 
 
-@dataclass
 class Article:
-    """Représente un article ou service"""
-    designation: str
-    quantite: float
-    prix_unitaire: Decimal
-    tva: Decimal = Decimal("20.0")  # TVA par défaut à 20%
+    """
+    Représente un article ou service
+    
+    Les montants HT, TVA et TTC sont calculés à la première demande puis
+    conservés jusqu'à la modification de la quantité, du prix ou de la TVA.
+    La quantité est toujours stockée en Decimal.
+    """
+    __slots__ = ("designation", "quantite", "prix_unitaire", "tva", "_montant_ht", "_montant_tva")
+    
+    # Champs dont la modification invalide les montants en cache
+    _CHAMPS_MONTANTS = frozenset(("quantite", "prix_unitaire", "tva"))
+    
+    def __init__(self, designation: str, quantite, prix_unitaire: Decimal, tva: Decimal = Decimal("20.0")):  # TVA par défaut à 20%
+        object.__setattr__(self, "designation", designation)
+        object.__setattr__(self, "quantite", quantite if isinstance(quantite, Decimal) else Decimal(str(quantite)))
+        object.__setattr__(self, "prix_unitaire", prix_unitaire)
+        object.__setattr__(self, "tva", tva)
+        object.__setattr__(self, "_montant_ht", None)
+        object.__setattr__(self, "_montant_tva", None)
+    
+    def __setattr__(self, nom, valeur):
+        if nom == "quantite" and not isinstance(valeur, Decimal):
+            valeur = Decimal(str(valeur))
+        object.__setattr__(self, nom, valeur)
+        if nom in self._CHAMPS_MONTANTS:
+            object.__setattr__(self, "_montant_ht", None)
+            object.__setattr__(self, "_montant_tva", None)
+    
+    def __getstate__(self):
+        return (self.designation, self.quantite, self.prix_unitaire, self.tva)
+    
+    def __setstate__(self, etat):
+        self.__init__(*etat)
+    
+    def __eq__(self, autre):
+        if not isinstance(autre, Article):
+            return NotImplemented
+        return ((self.designation, self.quantite, self.prix_unitaire, self.tva) ==
+                (autre.designation, autre.quantite, autre.prix_unitaire, autre.tva))
+    
+    __hash__ = None
+    
+    def __repr__(self):
+        return (f"Article(designation={self.designation!r}, quantite={self.quantite!r}, "
+                f"prix_unitaire={self.prix_unitaire!r}, tva={self.tva!r})")
     
     def get_montant_ht(self) -> Decimal:
         """Calcule le montant HT de l'article"""
-        return Decimal(str(self.quantite)) * self.prix_unitaire
+        if self._montant_ht is None:
+            object.__setattr__(self, "_montant_ht", self.quantite * self.prix_unitaire)
+        return self._montant_ht
     
     def get_montant_tva(self) -> Decimal:
         """Calcule le montant de TVA"""
-        return self.get_montant_ht() * (self.tva / Decimal("100"))
+        if self._montant_tva is None:
+            object.__setattr__(self, "_montant_tva", self.get_montant_ht() * (self.tva / Decimal("100")))
+        return self._montant_tva
     
     def get_montant_ttc(self) -> Decimal:
         """Calcule le montant TTC"""
         return self.get_montant_ht() + self.get_montant_tva()
 
 
+@dataclass(frozen=True)
+class Totaux:
+    """Résumé immuable des totaux d'un document"""
+    total_ht: Decimal
+    total_tva: Decimal
+    total_ttc: Decimal
+    # Tuple de (taux, base HT, montant TVA), trié par taux
+    tva_par_taux: Tuple[Tuple[Decimal, Decimal, Decimal], ...] = ()
+    
+    def get_tva_par_taux(self) -> dict:
+        """Retourne le détail de TVA au format {taux: {"base": ..., "montant": ...}}"""
+        return {taux: {"base": base, "montant": montant} for taux, base, montant in self.tva_par_taux}
+
+
+class AccumulateurTotaux:
+    """
+    Totaux tenus à jour de façon incrémentale
+    
+    L'ajout ou le retrait d'un article met à jour les cumuls en O(1), par
+    taux de TVA, sans reparcourir la liste des articles. Les montants de
+    chaque article sont mémorisés à l'ajout : le retrait soustrait ces
+    montants même si l'article a été modifié entre-temps.
+    """
+    
+    def __init__(self, articles: List[Article] = ()):
+        self.vider()
+        for article in articles:
+            self.ajouter(article)
+    
+    def vider(self):
+        """Remet tous les cumuls à zéro"""
+        self.nb_articles = 0
+        self.total_ht = Decimal("0")
+        self.total_tva = Decimal("0")
+        # taux -> [base HT, montant TVA, nombre d'articles]
+        self._par_taux = {}
+        # id(article) -> (taux, montant HT, montant TVA) au moment de l'ajout
+        self._montants = {}
+    
+    def ajouter(self, article: Article):
+        """Ajoute les montants d'un article aux cumuls"""
+        montants = (article.tva, article.get_montant_ht(), article.get_montant_tva())
+        self._montants[id(article)] = montants
+        self._cumuler(*montants, 1)
+    
+    def retirer(self, article: Article):
+        """Retire des cumuls les montants ajoutés pour cet article"""
+        montants = self._montants.pop(id(article), None)
+        if montants is None:
+            montants = (article.tva, article.get_montant_ht(), article.get_montant_tva())
+        self._cumuler(*montants, -1)
+    
+    def _cumuler(self, taux: Decimal, montant_ht: Decimal, montant_tva: Decimal, sens: int):
+        """Ajoute (sens=1) ou retire (sens=-1) des montants des cumuls"""
+        if sens < 0:
+            montant_ht, montant_tva = -montant_ht, -montant_tva
+        self.nb_articles += sens
+        self.total_ht += montant_ht
+        self.total_tva += montant_tva
+        
+        cumul = self._par_taux.get(taux)
+        if cumul is None:
+            self._par_taux[taux] = [montant_ht, montant_tva, sens]
+        else:
+            cumul[0] += montant_ht
+            cumul[1] += montant_tva
+            cumul[2] += sens
+            if cumul[2] == 0:
+                del self._par_taux[taux]
+    
+    def resume(self) -> Totaux:
+        """Retourne un instantané immuable des totaux"""
+        return Totaux(
+            total_ht=self.total_ht,
+            total_tva=self.total_tva,
+            total_ttc=self.total_ht + self.total_tva,
+            tva_par_taux=tuple((taux, base, montant)
+                               for taux, (base, montant, _) in sorted(self._par_taux.items()))
+        )
+
+
+def calculer_totaux(articles: List[Article]) -> Totaux:
+    """
+    Calcule en une seule passe les totaux HT, TVA (par taux) et TTC
+    
+    Le montant HT de chaque article n'est calculé qu'une fois et le calcul
+    reste exact (Decimal).
+    """
+    accumulateur = AccumulateurTotaux()
+    for article in articles:
+        accumulateur._cumuler(article.tva, article.get_montant_ht(), article.get_montant_tva(), 1)
+    return accumulateur.resume()
+
+
 @dataclass
 class Entreprise:
     """Informations de l'entreprise émettrice"""
@@ -72,28 +209,39 @@ class Document:
     conditions: str = ""
     notes: str = ""
     
+    def ajouter_article(self, article: Article):
+        """Ajoute un article au document"""
+        self.articles.append(article)
+    
+    def retirer_article(self, index: int) -> Article:
+        """Retire l'article à la position donnée"""
+        return self.articles.pop(index)
+    
+    def get_totaux(self) -> Totaux:
+        """
+        Retourne l'ensemble des totaux du document
+        
+        Recalculés à chaque appel depuis self.articles, en une passe : la
+        liste et les articles peuvent être modifiés directement. Le montant
+        de chaque article reste en cache jusqu'à sa modification.
+        """
+        return calculer_totaux(self.articles)
+    
     def get_total_ht(self) -> Decimal:
         """Calcule le total HT"""
-        return sum((article.get_montant_ht() for article in self.articles), Decimal("0"))
+        return self.get_totaux().total_ht
     
     def get_total_tva(self) -> Decimal:
         """Calcule le total TVA"""
-        return sum((article.get_montant_tva() for article in self.articles), Decimal("0"))
+        return self.get_totaux().total_tva
     
     def get_total_ttc(self) -> Decimal:
         """Calcule le total TTC"""
-        return self.get_total_ht() + self.get_total_tva()
+        return self.get_totaux().total_ttc
     
     def get_tva_par_taux(self) -> dict:
         """Retourne un dictionnaire des montants de TVA par taux"""
-        tva_dict = {}
-        for article in self.articles:
-            taux = article.tva
-            if taux not in tva_dict:
-                tva_dict[taux] = {"base": Decimal("0"), "montant": Decimal("0")}
-            tva_dict[taux]["base"] += article.get_montant_ht()
-            tva_dict[taux]["montant"] += article.get_montant_tva()
-        return tva_dict
+        return self.get_totaux().get_tva_par_taux()
 
 
 @dataclass
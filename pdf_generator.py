@@ -4,22 +4,123 @@ Générateur de PDF pour les devis et factures
 from reportlab.lib.pagesizes import A4
 from reportlab.lib.units import mm
 from reportlab.lib import colors
-from reportlab.platypus import SimpleDocTemplate, Table, TableStyle, Paragraph, Spacer, Image
+from reportlab.platypus import SimpleDocTemplate, Table, TableStyle, Paragraph, Spacer, PageBreak, Flowable
 from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
 from reportlab.lib.enums import TA_LEFT, TA_RIGHT, TA_CENTER
 from reportlab.graphics import renderPDF
+from reportlab.lib.utils import ImageReader
 from datetime import datetime
 from models import Devis, Facture, Document
+from archive import type_document
+from instrumentation import collecteur, etape
 from svglib.svglib import svg2rlg
+from collections import OrderedDict
+from dataclasses import dataclass
+import io
 import os
 
 
+# Nombre de logos décodés conservés en mémoire par générateur
+TAILLE_CACHE_LOGOS = 16
+
+
+@dataclass(frozen=True)
+class ThemePDF:
+    """Charte graphique des documents PDF (couleurs et largeurs de colonnes)"""
+    couleur_principale: str = '#1a5490'
+    couleur_fond_info: str = '#e8f4f8'
+    couleur_fond_entreprise: str = '#f0f7fb'
+    couleur_grille: str = '#cccccc'
+    couleur_ligne_alternee: str = '#f7f7f7'
+    taille_logo: float = 70*mm
+    largeurs_entete: tuple = (30*mm, 110*mm)
+    largeurs_infos: tuple = (85*mm, 85*mm)
+    largeurs_parties: tuple = (85*mm, 85*mm)
+    largeurs_articles: tuple = (80*mm, 20*mm, 25*mm, 20*mm, 25*mm)
+    largeurs_totaux: tuple = (120*mm, 50*mm)
+
+
+class Signet(Flowable):
+    """Élément invisible qui ajoute une entrée au sommaire (signets) du PDF"""
+    
+    def __init__(self, titre: str, cle: str, niveau: int = 0):
+        super().__init__()
+        self.titre = titre
+        self.cle = cle
+        self.niveau = niveau
+        self.width = self.height = 0
+    
+    def wrap(self, largeur_dispo, hauteur_dispo):
+        return 0, 0
+    
+    def draw(self):
+        self.canv.bookmarkPage(self.cle)
+        self.canv.addOutlineEntry(self.titre, self.cle, level=self.niveau)
+
+
+class LogoVectoriel(Flowable):
+    """Flowable qui dessine un logo vectoriel décodé, partagé entre les rendus"""
+    
+    def __init__(self, drawing):
+        super().__init__()
+        self.drawing = drawing
+        self.width = drawing.width
+        self.height = drawing.height
+    
+    def wrap(self, largeur_dispo, hauteur_dispo):
+        return self.width, self.height
+    
+    def draw(self):
+        renderPDF.draw(self.drawing, self.canv, 0, 0)
+
+
+class LogoImage(Flowable):
+    """Flowable qui dessine un logo image décodé (ImageReader), partagé entre les rendus"""
+    
+    def __init__(self, image, largeur, hauteur):
+        super().__init__()
+        self.image = image
+        self.width = largeur
+        self.height = hauteur
+    
+    def wrap(self, largeur_dispo, hauteur_dispo):
+        return self.width, self.height
+    
+    def draw(self):
+        self.canv.drawImage(self.image, 0, 0, self.width, self.height, mask="auto")
+
+
 class PDFGenerator:
     """Génère des PDF pour les devis et factures"""
     
-    def __init__(self):
+    def __init__(self, taille_cache_logos: int = TAILLE_CACHE_LOGOS, theme: ThemePDF = None, cache=None):
+        self.appliquer_theme(theme or ThemePDF())
+        
+        # Cache disque des PDF déjà générés (CacheRendu), optionnel
+        self.cache = cache
+        
+        # Cache LRU des logos décodés : (chemin, mtime, taille) -> Drawing ou contenu de l'image
+        self._cache_logos = OrderedDict()
+        self._taille_cache_logos = taille_cache_logos
+    
+    def appliquer_theme(self, theme: ThemePDF):
+        """
+        Compile les styles du thème une fois pour toutes
+        
+        Les TableStyle, ParagraphStyle et couleurs sont ensuite partagés par
+        tous les documents générés avec cette instance.
+        """
+        self.theme = theme
         self.styles = getSampleStyleSheet()
+        
+        self._couleur_principale = colors.HexColor(theme.couleur_principale)
+        self._couleur_fond_info = colors.HexColor(theme.couleur_fond_info)
+        self._couleur_fond_entreprise = colors.HexColor(theme.couleur_fond_entreprise)
+        self._couleur_grille = colors.HexColor(theme.couleur_grille)
+        self._couleur_ligne_alternee = colors.HexColor(theme.couleur_ligne_alternee)
+        
         self._setup_custom_styles()
+        self._setup_table_styles()
     
     def _setup_custom_styles(self):
         """Configure les styles personnalisés"""
@@ -27,7 +128,7 @@ class PDFGenerator:
             name='CustomTitle',
             parent=self.styles['Heading1'],
             fontSize=28,
-            textColor=colors.HexColor('#1a5490'),
+            textColor=self._couleur_principale,
             spaceAfter=20,
             alignment=TA_CENTER,
             fontName='Helvetica-Bold'
@@ -37,7 +138,7 @@ class PDFGenerator:
             name='CustomHeading',
             parent=self.styles['Heading2'],
             fontSize=13,
-            textColor=colors.HexColor('#1a5490'),
+            textColor=self._couleur_principale,
             spaceAfter=8,
             spaceBefore=10,
             fontName='Helvetica-Bold'
@@ -50,16 +151,140 @@ class PDFGenerator:
             fontSize=10
         ))
     
-    def generer_pdf(self, document: Document, fichier_sortie: str, type_doc: str = "Devis", is_trial: bool = False):
+    def _setup_table_styles(self):
+        """Précompile les styles de tableaux partagés par tous les documents"""
+        principale = self._couleur_principale
+        grille = self._couleur_grille
+        
+        self._style_entete = TableStyle([
+            ('VALIGN', (0, 0), (-1, -1), 'MIDDLE'),
+            ('ALIGN', (1, 0), (1, 0), 'CENTER'),
+            ('LEFTPADDING', (0, 0), (-1, -1), 0),
+            ('RIGHTPADDING', (0, 0), (-1, -1), 0),
+            ('TOPPADDING', (0, 0), (-1, -1), 0),
+            ('BOTTOMPADDING', (0, 0), (-1, -1), 0),
+        ])
+        
+        self._style_infos = TableStyle([
+            ('BACKGROUND', (0, 0), (-1, -1), self._couleur_fond_info),
+            ('ALIGN', (0, 0), (0, 0), 'LEFT'),
+            ('ALIGN', (1, 0), (1, 0), 'RIGHT'),
+            ('PADDING', (0, 0), (-1, -1), 8),
+            ('FONTSIZE', (0, 0), (-1, -1), 11),
+        ])
+        
+        self._style_parties = TableStyle([
+            ('VALIGN', (0, 0), (-1, -1), 'TOP'),
+            ('BOX', (0, 0), (-1, -1), 1.5, principale),
+            ('GRID', (0, 0), (-1, -1), 0.5, grille),
+            ('BACKGROUND', (0, 0), (0, -1), self._couleur_fond_entreprise),
+            ('BACKGROUND', (1, 0), (1, -1), colors.white),
+            ('PADDING', (0, 0), (-1, -1), 8),
+            ('FONTSIZE', (0, 0), (-1, -1), 10),
+        ])
+        
+        self._style_articles = TableStyle([
+            ('BACKGROUND', (0, 0), (-1, 0), principale),
+            ('TEXTCOLOR', (0, 0), (-1, 0), colors.white),
+            ('ALIGN', (1, 0), (-1, -1), 'CENTER'),
+            ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
+            ('FONTSIZE', (0, 0), (-1, 0), 11),
+            ('BOTTOMPADDING', (0, 0), (-1, 0), 10),
+            ('TOPPADDING', (0, 0), (-1, 0), 10),
+            ('GRID', (0, 0), (-1, -1), 0.5, grille),
+            ('VALIGN', (0, 0), (-1, -1), 'MIDDLE'),
+            ('ROWBACKGROUNDS', (0, 1), (-1, -1), [colors.white, self._couleur_ligne_alternee]),
+            ('FONTSIZE', (0, 1), (-1, -1), 10),
+            ('TOPPADDING', (0, 1), (-1, -1), 8),
+            ('BOTTOMPADDING', (0, 1), (-1, -1), 8),
+        ])
+        
+        self._style_totaux = TableStyle([
+            ('ALIGN', (0, 0), (-1, -1), 'RIGHT'),
+            ('LINEABOVE', (0, -1), (-1, -1), 2, principale),
+            ('LINEABOVE', (0, 0), (-1, 0), 1, grille),
+            ('FONTSIZE', (0, -1), (-1, -1), 13),
+            ('FONTNAME', (0, -1), (-1, -1), 'Helvetica-Bold'),
+            ('BACKGROUND', (0, -1), (-1, -1), self._couleur_fond_info),
+            ('TOPPADDING', (0, -1), (-1, -1), 10),
+            ('BOTTOMPADDING', (0, -1), (-1, -1), 10),
+            ('TOPPADDING', (0, 0), (-1, -2), 5),
+            ('BOTTOMPADDING', (0, 0), (-1, -2), 5),
+        ])
+    
+    def generer_pdf(self, document: Document, fichier_sortie, type_doc: str = "Devis", is_trial: bool = False,
+                    instrumentation=None):
         """
         Génère un PDF pour un document
         
         Args:
             document: Instance de Devis ou Facture
-            fichier_sortie: Chemin du fichier PDF à générer
+            fichier_sortie: Chemin du fichier PDF à générer, ou flux binaire
+                            ouvert en écriture (fichier, BytesIO, réponse HTTP...)
             type_doc: "Devis" ou "Facture"
             is_trial: True si version d'essai (ajoute un filigrane)
+            instrumentation: CollecteurRendu ou fonction de rappel recevant la
+                             mesure (durée, allocations) de chaque étape du rendu
         """
+        instrumentation = collecteur(instrumentation)
+        
+        # Document inchangé depuis un rendu précédent : copie depuis le cache
+        cle_cache = None
+        destination = fichier_sortie
+        if self.cache is not None:
+            with etape(instrumentation, "cache"):
+                cle_cache = self.cache.cle(document, type_doc, is_trial, self.theme)
+                if self.cache.obtenir(cle_cache, fichier_sortie):
+                    return
+            if not isinstance(fichier_sortie, str):
+                # Rendu en mémoire puis copie : le flux (tube, réponse HTTP...)
+                # n'a pas à être relisible pour alimenter le cache
+                destination = io.BytesIO()
+        
+        doc = SimpleDocTemplate(
+            destination,
+            pagesize=A4,
+            rightMargin=20*mm,
+            leftMargin=20*mm,
+            topMargin=20*mm,
+            bottomMargin=20*mm
+        )
+        
+        story = self._construire_story(document, type_doc, is_trial, instrumentation)
+        
+        # Construction du PDF
+        self._suivre_mise_en_page(doc, story, instrumentation)
+        with etape(instrumentation, "build"):
+            doc.build(story)
+        
+        if cle_cache is not None:
+            if isinstance(fichier_sortie, str):
+                self.cache.ajouter(cle_cache, fichier_sortie)
+            else:
+                contenu = destination.getvalue()
+                fichier_sortie.write(contenu)
+                self.cache.ajouter_contenu(cle_cache, contenu)
+    
+    def generer_pdf_groupe(self, documents, fichier_sortie, is_trial: bool = False, signets: bool = True,
+                           instrumentation=None):
+        """
+        Génère un seul PDF contenant plusieurs devis/factures, un par page(s)
+        
+        Les styles et les logos décodés sont partagés par tous les documents et
+        la mise en page est faite en une seule passe, sans fichier intermédiaire.
+        
+        Args:
+            documents: Instances de Devis ou Facture, dans l'ordre du PDF
+            fichier_sortie: Chemin du fichier PDF à générer, ou flux binaire
+            is_trial: True si version d'essai (ajoute un filigrane)
+            signets: True pour ajouter un signet par document
+            instrumentation: CollecteurRendu ou fonction de rappel (voir generer_pdf)
+        
+        Returns:
+            Nombre de documents inclus
+        """
+        instrumentation = collecteur(instrumentation)
+        
         doc = SimpleDocTemplate(
             fichier_sortie,
             pagesize=A4,
@@ -69,19 +294,84 @@ class PDFGenerator:
             bottomMargin=20*mm
         )
         
+        story = []
+        nb_documents = 0
+        for index, document in enumerate(documents):
+            type_doc = type_document(document)
+            if index:
+                story.append(PageBreak())
+            if signets:
+                story.append(Signet(f"{type_doc} {document.numero} - {document.client.get_nom_complet()}",
+                                    f"document_{index}"))
+            # Étapes préfixées par le rang du document : une mesure par document
+            story.extend(self._construire_story(document, type_doc, is_trial, instrumentation,
+                                                prefixe_etapes=f"document_{index}/"))
+            nb_documents += 1
+        
+        def afficher_signets(canv, doc):
+            canv.showOutline()
+        
+        self._suivre_mise_en_page(doc, story, instrumentation)
+        with etape(instrumentation, "build"):
+            if signets and nb_documents:
+                doc.build(story, onFirstPage=afficher_signets)
+            else:
+                doc.build(story)
+        
+        return nb_documents
+    
+    @staticmethod
+    def _suivre_mise_en_page(doc, story, instrumentation):
+        """
+        Signale l'avancement de doc.build() après chaque élément placé
+        
+        Un tableau compte pour son nombre de lignes : ses morceaux, placés
+        page après page, font progresser l'avancement régulièrement. Le
+        rappel d'avancement peut interrompre le rendu en levant une exception.
+        """
+        if instrumentation is None or instrumentation.rappel_avancement is None:
+            return
+        
+        def poids(flowable):
+            return len(flowable._cellvalues) if isinstance(flowable, Table) else 1
+        
+        total = sum(poids(flowable) for flowable in story) or 1
+        place = 0
+        
+        def apres_element(flowable):
+            nonlocal place
+            place += poids(flowable)
+            instrumentation.avancer("build", min(place / total, 1.0))
+        
+        doc.afterFlowable = apres_element
+    
+    def generer_pdf_bytes(self, document: Document, type_doc: str = "Devis", is_trial: bool = False,
+                          instrumentation=None) -> bytes:
+        """Génère le PDF d'un document en mémoire et retourne son contenu"""
+        tampon = io.BytesIO()
+        self.generer_pdf(document, tampon, type_doc, is_trial, instrumentation)
+        return tampon.getvalue()
+    
+    def _construire_story(self, document: Document, type_doc: str, is_trial: bool, instrumentation=None,
+                          prefixe_etapes: str = ""):
+        """Construit la liste des éléments (flowables) du document"""
         story = []
         
         # En-tête du document
-        story.extend(self._creer_entete(document, type_doc))
+        with etape(instrumentation, f"{prefixe_etapes}entete"):
+            story.extend(self._creer_entete(document, type_doc))
         
         # Informations client et entreprise
-        story.extend(self._creer_infos_parties(document))
+        with etape(instrumentation, f"{prefixe_etapes}infos_parties"):
+            story.extend(self._creer_infos_parties(document))
         
         # Tableau des articles
-        story.extend(self._creer_tableau_articles(document))
+        with etape(instrumentation, f"{prefixe_etapes}tableau_articles"):
+            story.extend(self._creer_tableau_articles(document))
         
         # Totaux
-        story.extend(self._creer_totaux(document))
+        with etape(instrumentation, f"{prefixe_etapes}totaux"):
+            story.extend(self._creer_totaux(document))
         
         # Informations spécifiques selon le type
         if isinstance(document, Devis):
@@ -109,28 +399,14 @@ class PDFGenerator:
             story.insert(0, watermark)
             story.insert(1, Spacer(1, 5))
         
-        # Construction du PDF
-        doc.build(story)
+        return story
     
     def _creer_entete(self, document: Document, type_doc: str):
         """Crée l'en-tête du document avec logo centré verticalement par rapport au titre"""
         elements = []
 
         # --- Chargement du logo ---
-        logo_obj = None
-        if document.entreprise.logo and os.path.exists(document.entreprise.logo):
-            try:
-                if document.entreprise.logo.lower().endswith(".svg"):
-                    drawing = svg2rlg(document.entreprise.logo)
-                    scale_factor = min(70*mm / drawing.width, 70*mm / drawing.height)
-                    drawing.width *= scale_factor
-                    drawing.height *= scale_factor
-                    drawing.scale(scale_factor, scale_factor)
-                    logo_obj = drawing
-                else:
-                    logo_obj = Image(document.entreprise.logo, width=70*mm, height=70*mm)
-            except:
-                logo_obj = None
+        logo_obj = self._charger_logo(document.entreprise.logo, self.theme.taille_logo)
 
         # --- Titre ---
         title = Paragraph(f"<b>{type_doc.upper()}</b>", self.styles['CustomTitle'])
@@ -141,18 +417,11 @@ class PDFGenerator:
                 [
                     [logo_obj, title]
                 ],
-                colWidths=[30*mm, 110*mm],
+                colWidths=self.theme.largeurs_entete,
                 rowHeights=[25*mm]
             )
 
-            header_table.setStyle(TableStyle([
-                ('VALIGN', (0, 0), (-1, -1), 'MIDDLE'),
-                ('ALIGN', (1, 0), (1, 0), 'CENTER'),
-                ('LEFTPADDING', (0, 0), (-1, -1), 0),
-                ('RIGHTPADDING', (0, 0), (-1, -1), 0),
-                ('TOPPADDING', (0, 0), (-1, -1), 0),
-                ('BOTTOMPADDING', (0, 0), (-1, -1), 0),
-            ]))
+            header_table.setStyle(self._style_entete)
             
             header_table.hAlign = 'LEFT'
 
@@ -172,14 +441,8 @@ class PDFGenerator:
             ]
         ]
 
-        info_table = Table(info_data, colWidths=[85*mm, 85*mm])
-        info_table.setStyle(TableStyle([
-            ('BACKGROUND', (0, 0), (-1, -1), colors.HexColor("#e8f4f8")),
-            ('ALIGN', (0, 0), (0, 0), 'LEFT'),
-            ('ALIGN', (1, 0), (1, 0), 'RIGHT'),
-            ('PADDING', (0, 0), (-1, -1), 8),
-            ('FONTSIZE', (0, 0), (-1, -1), 11),
-        ]))
+        info_table = Table(info_data, colWidths=self.theme.largeurs_infos)
+        info_table.setStyle(self._style_infos)
 
         elements.append(info_table)
         elements.append(Spacer(1, 8*mm))
@@ -187,6 +450,54 @@ class PDFGenerator:
         return elements
 
     
+    def _charger_logo(self, chemin: str, taille: float):
+        """
+        Retourne un logo mis à l'échelle, décodé une seule fois grâce au cache
+        
+        La clé du cache inclut la date de modification du fichier : un logo
+        remplacé sur le disque est donc rechargé automatiquement. Le cache
+        contient le dessin décodé (SVG) ou l'ImageReader de l'image, dont les
+        pixels ne sont décodés qu'au premier rendu ; un nouveau flowable est
+        créé à chaque appel, car un flowable ne peut pas figurer à plusieurs
+        endroits d'un même PDF.
+        """
+        if not chemin or not os.path.exists(chemin):
+            return None
+        
+        try:
+            cle = (chemin, os.path.getmtime(chemin), taille)
+        except OSError:
+            return None
+        
+        if cle in self._cache_logos:
+            self._cache_logos.move_to_end(cle)
+            decode = self._cache_logos[cle]
+        else:
+            try:
+                if chemin.lower().endswith(".svg"):
+                    drawing = svg2rlg(chemin)
+                    scale_factor = min(taille / drawing.width, taille / drawing.height)
+                    drawing.width *= scale_factor
+                    drawing.height *= scale_factor
+                    drawing.scale(scale_factor, scale_factor)
+                    decode = drawing
+                else:
+                    with open(chemin, 'rb') as f:
+                        decode = ImageReader(io.BytesIO(f.read()))
+                    # Décodage immédiat : une image illisible est écartée ici, pas au rendu
+                    decode.getSize()
+                    decode.getRGBData()
+            except Exception:
+                return None
+            
+            self._cache_logos[cle] = decode
+            if len(self._cache_logos) > self._taille_cache_logos:
+                self._cache_logos.popitem(last=False)
+        
+        if isinstance(decode, ImageReader):
+            return LogoImage(decode, taille, taille)
+        return LogoVectoriel(decode)
+    
     def _creer_infos_parties(self, document: Document):
         """Crée le tableau avec les infos entreprise et client"""
         elements = []
@@ -227,16 +538,8 @@ class PDFGenerator:
             ]
         ]
         
-        table = Table(data, colWidths=[85*mm, 85*mm])
-        table.setStyle(TableStyle([
-            ('VALIGN', (0, 0), (-1, -1), 'TOP'),
-            ('BOX', (0, 0), (-1, -1), 1.5, colors.HexColor('#1a5490')),
-            ('GRID', (0, 0), (-1, -1), 0.5, colors.HexColor('#cccccc')),
-            ('BACKGROUND', (0, 0), (0, -1), colors.HexColor('#f0f7fb')),
-            ('BACKGROUND', (1, 0), (1, -1), colors.white),
-            ('PADDING', (0, 0), (-1, -1), 8),
-            ('FONTSIZE', (0, 0), (-1, -1), 10),
-        ]))
+        table = Table(data, colWidths=self.theme.largeurs_parties)
+        table.setStyle(self._style_parties)
         
         elements.append(table)
         elements.append(Spacer(1, 8*mm))
@@ -259,22 +562,8 @@ class PDFGenerator:
                 f"{article.get_montant_ht():.2f} €"
             ])
         
-        table = Table(data, colWidths=[80*mm, 20*mm, 25*mm, 20*mm, 25*mm])
-        table.setStyle(TableStyle([
-            ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor('#1a5490')),
-            ('TEXTCOLOR', (0, 0), (-1, 0), colors.white),
-            ('ALIGN', (1, 0), (-1, -1), 'CENTER'),
-            ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
-            ('FONTSIZE', (0, 0), (-1, 0), 11),
-            ('BOTTOMPADDING', (0, 0), (-1, 0), 10),
-            ('TOPPADDING', (0, 0), (-1, 0), 10),
-            ('GRID', (0, 0), (-1, -1), 0.5, colors.HexColor('#cccccc')),
-            ('VALIGN', (0, 0), (-1, -1), 'MIDDLE'),
-            ('ROWBACKGROUNDS', (0, 1), (-1, -1), [colors.white, colors.HexColor('#f7f7f7')]),
-            ('FONTSIZE', (0, 1), (-1, -1), 10),
-            ('TOPPADDING', (0, 1), (-1, -1), 8),
-            ('BOTTOMPADDING', (0, 1), (-1, -1), 8),
-        ]))
+        table = Table(data, colWidths=self.theme.largeurs_articles)
+        table.setStyle(self._style_articles)
         
         elements.append(table)
         elements.append(Spacer(1, 5*mm))
@@ -285,19 +574,19 @@ class PDFGenerator:
         """Crée le tableau des totaux"""
         elements = []
         
-        # Détail TVA
-        tva_par_taux = document.get_tva_par_taux()
+        # Totaux et détail TVA calculés en une seule passe
+        totaux = document.get_totaux()
         
         data = []
-        data.append(['Total HT:', f"{document.get_total_ht():.2f} €"])
+        data.append(['Total HT:', f"{totaux.total_ht:.2f} €"])
         
-        for taux, montants in sorted(tva_par_taux.items()):
+        for taux, base, montant in totaux.tva_par_taux:
             data.append([
-                f"TVA {taux:.1f}% sur {montants['base']:.2f} €:",
-                f"{montants['montant']:.2f} €"
+                f"TVA {taux:.1f}% sur {base:.2f} €:",
+                f"{montant:.2f} €"
             ])
         
-        data.append(['<b>Total TTC:</b>', f"<b>{document.get_total_ttc():.2f} €</b>"])
+        data.append(['<b>Total TTC:</b>', f"<b>{totaux.total_ttc:.2f} €</b>"])
         
         # Transformation en Paragraphs pour le style
         styled_data = []
@@ -307,19 +596,8 @@ class PDFGenerator:
                 Paragraph(row[1], self.styles['RightAlign'])
             ])
         
-        table = Table(styled_data, colWidths=[120*mm, 50*mm])
-        table.setStyle(TableStyle([
-            ('ALIGN', (0, 0), (-1, -1), 'RIGHT'),
-            ('LINEABOVE', (0, -1), (-1, -1), 2, colors.HexColor('#1a5490')),
-            ('LINEABOVE', (0, 0), (-1, 0), 1, colors.HexColor('#cccccc')),
-            ('FONTSIZE', (0, -1), (-1, -1), 13),
-            ('FONTNAME', (0, -1), (-1, -1), 'Helvetica-Bold'),
-            ('BACKGROUND', (0, -1), (-1, -1), colors.HexColor('#e8f4f8')),
-            ('TOPPADDING', (0, -1), (-1, -1), 10),
-            ('BOTTOMPADDING', (0, -1), (-1, -1), 10),
-            ('TOPPADDING', (0, 0), (-1, -2), 5),
-            ('BOTTOMPADDING', (0, 0), (-1, -2), 5),
-        ]))
+        table = Table(styled_data, colWidths=self.theme.largeurs_totaux)
+        table.setStyle(self._style_totaux)
         
         elements.append(table)
         
@@ -0,0 +1,305 @@
+"""
+Répertoire des clients (SQLite) pour l'auto-complétion de la saisie
+
+Chaque client n'y figure qu'une fois : la clé de dédoublonnage est formée du
+nom complet et de l'email normalisés (minuscules, sans accents ni espaces
+superflus). La recherche combine un index de préfixe sur le nom et sur
+l'entreprise, puis un index de trigrammes pour les correspondances en milieu
+de mot.
+"""
+import argparse
+import os
+import re
+import sqlite3
+import sys
+import unicodedata
+from datetime import datetime
+from typing import Callable, Iterable, List, Optional, Tuple
+
+from models import Client
+
+
+# Champs d'un client, dans l'ordre des colonnes de la table
+CHAMPS_CLIENT = ("nom", "prenom", "entreprise", "adresse", "code_postal", "ville", "email", "telephone")
+
+# Champs sur lesquels porte la recherche par préfixe
+COLONNES_RECHERCHE = {
+    "nom": "nom_normalise",
+    "entreprise": "entreprise_normalisee",
+}
+
+# Taille minimale de saisie pour la recherche par trigrammes
+TAILLE_TRIGRAMME = 3
+
+# Au-delà de ce nombre de clients, un trigramme est considéré comme fréquent
+PLAFOND_FREQUENCE = 500
+
+
+def normaliser(texte: str) -> str:
+    """Minuscules, sans accents, espaces réduits"""
+    decompose = unicodedata.normalize("NFKD", texte or "")
+    sans_accents = "".join(c for c in decompose if not unicodedata.combining(c))
+    return re.sub(r"\s+", " ", sans_accents).strip().lower()
+
+
+def trigrammes(texte: str) -> set:
+    """Trigrammes d'un texte normalisé"""
+    return {texte[i:i + TAILLE_TRIGRAMME] for i in range(len(texte) - TAILLE_TRIGRAMME + 1)}
+
+
+def cle_client(client: Client) -> str:
+    """Clé de dédoublonnage : nom complet et email normalisés"""
+    nom = normaliser(f"{client.entreprise} {client.nom} {client.prenom}")
+    return f"{nom}|{normaliser(client.email)}"
+
+
+def _borne_prefixe(prefixe: str) -> str:
+    """Plus petite chaîne supérieure à toutes celles qui commencent par prefixe"""
+    return prefixe + "\U0010ffff"
+
+
+class RepertoireClients:
+    """Base SQLite des clients connus"""
+
+    def __init__(self, chemin: str):
+        self.chemin = chemin
+        self.connexion = sqlite3.connect(chemin)
+        self.connexion.row_factory = sqlite3.Row
+        self.connexion.execute("PRAGMA journal_mode=WAL")
+        self.connexion.execute("PRAGMA synchronous=NORMAL")
+
+        # True tant que l'import initial des archives n'a pas abouti (PRAGMA
+        # user_version n'est écrit qu'à la fin de importer_archives)
+        self.nouveau = self.connexion.execute("PRAGMA user_version").fetchone()[0] == 0
+        self._creer_schema()
+
+        # Nombre de clients par trigramme (approché : compté à la première
+        # recherche, oublié dès qu'un client contenant le trigramme est enregistré)
+        self._frequences_trigrammes = {}
+
+    def _creer_schema(self):
+        """Crée les tables et index si nécessaire"""
+        with self.connexion:
+            self.connexion.executescript("""
+                CREATE TABLE IF NOT EXISTS clients (
+                    id INTEGER PRIMARY KEY,
+                    cle TEXT NOT NULL UNIQUE,
+                    nom TEXT NOT NULL,
+                    prenom TEXT NOT NULL,
+                    entreprise TEXT NOT NULL,
+                    adresse TEXT NOT NULL,
+                    code_postal TEXT NOT NULL,
+                    ville TEXT NOT NULL,
+                    email TEXT NOT NULL,
+                    telephone TEXT NOT NULL,
+                    nom_normalise TEXT NOT NULL,
+                    entreprise_normalisee TEXT NOT NULL,
+                    derniere_utilisation TEXT NOT NULL,
+                    nb_documents INTEGER NOT NULL DEFAULT 0
+                );
+                CREATE INDEX IF NOT EXISTS idx_clients_nom ON clients (nom_normalise);
+                CREATE INDEX IF NOT EXISTS idx_clients_entreprise ON clients (entreprise_normalisee);
+                CREATE TABLE IF NOT EXISTS clients_trigrammes (
+                    trigramme TEXT NOT NULL,
+                    client_id INTEGER NOT NULL,
+                    PRIMARY KEY (trigramme, client_id)
+                ) WITHOUT ROWID;
+            """)
+
+    def fermer(self):
+        """Ferme la connexion à la base"""
+        self.connexion.close()
+
+    def enregistrer(self, client: Client, date: Optional[datetime] = None) -> int:
+        """Ajoute un client ou met à jour sa fiche et retourne son identifiant"""
+        with self.connexion:
+            return self._inserer(client, date or datetime.now())
+
+    def enregistrer_lot(self, clients: Iterable[Tuple[Client, datetime]]) -> int:
+        """
+        Ajoute ou met à jour plusieurs clients en une seule transaction
+
+        Args:
+            clients: Tuples (client, date du document)
+
+        Returns:
+            Nombre de fiches enregistrées
+        """
+        nb_clients = 0
+        with self.connexion:
+            for client, date in clients:
+                self._inserer(client, date)
+                nb_clients += 1
+        return nb_clients
+
+    def _inserer(self, client: Client, date: datetime) -> int:
+        """Insère ou met à jour un client sans gérer la transaction"""
+        cle = cle_client(client)
+        nom_normalise = normaliser(f"{client.nom} {client.prenom}")
+        entreprise_normalisee = normaliser(client.entreprise)
+        # La fiche la plus récente remplace les coordonnées connues
+        self.connexion.execute("""
+            INSERT INTO clients (cle, nom, prenom, entreprise, adresse, code_postal, ville, email, telephone,
+                                 nom_normalise, entreprise_normalisee, derniere_utilisation, nb_documents)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, 1)
+            ON CONFLICT (cle) DO UPDATE SET
+                nom = CASE WHEN excluded.derniere_utilisation >= derniere_utilisation THEN excluded.nom ELSE nom END,
+                prenom = CASE WHEN excluded.derniere_utilisation >= derniere_utilisation THEN excluded.prenom ELSE prenom END,
+                entreprise = CASE WHEN excluded.derniere_utilisation >= derniere_utilisation THEN excluded.entreprise ELSE entreprise END,
+                adresse = CASE WHEN excluded.derniere_utilisation >= derniere_utilisation THEN excluded.adresse ELSE adresse END,
+                code_postal = CASE WHEN excluded.derniere_utilisation >= derniere_utilisation THEN excluded.code_postal ELSE code_postal END,
+                ville = CASE WHEN excluded.derniere_utilisation >= derniere_utilisation THEN excluded.ville ELSE ville END,
+                email = CASE WHEN excluded.derniere_utilisation >= derniere_utilisation THEN excluded.email ELSE email END,
+                telephone = CASE WHEN excluded.derniere_utilisation >= derniere_utilisation THEN excluded.telephone ELSE telephone END,
+                derniere_utilisation = MAX(derniere_utilisation, excluded.derniere_utilisation),
+                nb_documents = nb_documents + 1
+        """, (
+            cle,
+            *(getattr(client, champ) or "" for champ in CHAMPS_CLIENT),
+            nom_normalise,
+            entreprise_normalisee,
+            date.isoformat(),
+        ))
+        id_client = self.connexion.execute("SELECT id FROM clients WHERE cle = ?", (cle,)).fetchone()[0]
+        motifs = trigrammes(f"{entreprise_normalisee} {nom_normalise}")
+        self.connexion.executemany(
+            "INSERT OR IGNORE INTO clients_trigrammes (trigramme, client_id) VALUES (?, ?)",
+            [(trigramme, id_client) for trigramme in motifs]
+        )
+        # Les fréquences en cache de ces trigrammes ne sont plus à jour
+        for motif in motifs:
+            self._frequences_trigrammes.pop(motif, None)
+        return id_client
+
+    def rechercher(self, saisie: str, champ: str = "nom", limite: int = 20) -> List[Client]:
+        """
+        Clients correspondant à une saisie partielle
+
+        Les clients dont le champ commence par la saisie viennent en premier
+        (ordre alphabétique), complétés par ceux qui contiennent la saisie
+        ailleurs dans leur nom ou leur entreprise (les plus utilisés d'abord).
+
+        Args:
+            saisie: Texte saisi par l'utilisateur
+            champ: "nom" ou "entreprise"
+            limite: Nombre maximal de résultats
+        """
+        texte = normaliser(saisie)
+        if not texte:
+            return []
+        colonne = COLONNES_RECHERCHE[champ]
+
+        lignes = self.connexion.execute(f"""
+            SELECT * FROM clients
+            WHERE {colonne} >= ? AND {colonne} < ?
+            ORDER BY {colonne}
+            LIMIT ?
+        """, (texte, _borne_prefixe(texte), limite)).fetchall()
+
+        if len(lignes) < limite and len(texte) >= TAILLE_TRIGRAMME:
+            # Parcours de la liste du trigramme le moins fréquent, vérifiée par instr()
+            motif = self._trigramme_le_plus_rare(trigrammes(texte))
+            deja_trouves = [ligne['id'] for ligne in lignes]
+            exclusion = f"AND clients.id NOT IN ({', '.join('?' * len(deja_trouves))})" if deja_trouves else ""
+            lignes += self.connexion.execute(f"""
+                SELECT clients.* FROM clients_trigrammes
+                JOIN clients ON clients.id = clients_trigrammes.client_id
+                WHERE clients_trigrammes.trigramme = ?
+                  AND instr(entreprise_normalisee || ' ' || nom_normalise, ?) > 0
+                  {exclusion}
+                LIMIT ?
+            """, (motif, texte, *deja_trouves, limite - len(lignes))).fetchall()
+
+        return [Client(**{champ_client: ligne[champ_client] for champ_client in CHAMPS_CLIENT})
+                for ligne in lignes]
+
+    def _trigramme_le_plus_rare(self, motifs: set) -> str:
+        """Trigramme de la saisie qui apparaît chez le moins de clients"""
+        frequences = self._frequences_trigrammes
+        for motif in motifs:
+            if motif not in frequences:
+                # Comptage plafonné : seul l'ordre de grandeur compte
+                frequences[motif] = self.connexion.execute("""
+                    SELECT COUNT(*) FROM (
+                        SELECT 1 FROM clients_trigrammes WHERE trigramme = ? LIMIT ?
+                    )
+                """, (motif, PLAFOND_FREQUENCE)).fetchone()[0]
+        return min(motifs, key=lambda motif: (frequences[motif], motif))
+
+    def invalider_frequences(self):
+        """Oublie les fréquences de trigrammes en cache (base modifiée par une autre connexion)"""
+        self._frequences_trigrammes.clear()
+
+    def vider(self):
+        """Supprime tous les clients du répertoire"""
+        with self.connexion:
+            self.connexion.execute("DELETE FROM clients_trigrammes")
+            self.connexion.execute("DELETE FROM clients")
+        self.invalider_frequences()
+
+    def compter(self) -> int:
+        """Nombre de clients du répertoire"""
+        return self.connexion.execute("SELECT COUNT(*) FROM clients").fetchone()[0]
+
+    def importer_archives(self, archive_store, taille_page: int = 500,
+                          interrompre: Optional[Callable[[], bool]] = None) -> tuple:
+        """
+        Alimente le répertoire avec les clients des documents archivés
+
+        Chaque page est validée dans sa propre transaction (la base reste
+        accessible en écriture aux autres connexions) ; un document illisible
+        est ignoré et rapporté. Le répertoire n'est marqué comme importé
+        qu'après la dernière page : un import interrompu est repris à
+        l'ouverture suivante.
+
+        Args:
+            interrompre: Fonction consultée avant chaque page, arrête l'import si elle retourne True
+
+        Returns:
+            Tuple (nombre de documents parcourus, liste des (numéro, erreur))
+        """
+        nb_documents = 0
+        erreurs = []
+        while True:
+            if interrompre is not None and interrompre():
+                return nb_documents, erreurs
+            page = archive_store.lister(tri="date", decroissant=False,
+                                       limite=taille_page, decalage=nb_documents)
+            with self.connexion:
+                for entete in page:
+                    try:
+                        self._inserer(entete.client, entete.date)
+                    except Exception as e:
+                        erreurs.append((entete.numero, str(e)))
+            nb_documents += len(page)
+            if len(page) < taille_page:
+                break
+        with self.connexion:
+            self.connexion.execute("PRAGMA user_version = 1")
+        self.nouveau = False
+        return nb_documents, erreurs
+
+
+def main(argv=None):
+    """Construction en ligne de commande du répertoire depuis la base des archives"""
+    from archive_store import ArchiveStore
+
+    parser = argparse.ArgumentParser(description="Construit le répertoire des clients depuis les archives myInvo")
+    parser.add_argument("dossier", nargs="?", default="archives", help="Dossier des archives")
+    parser.add_argument("--base", default=None, help="Base des archives (par défaut: <dossier>/archives.db)")
+    args = parser.parse_args(argv)
+
+    store = ArchiveStore(args.base or os.path.join(args.dossier, "archives.db"))
+    repertoire = RepertoireClients(os.path.join(args.dossier, "clients.db"))
+    repertoire.vider()
+    nb_documents, erreurs = repertoire.importer_archives(store)
+    for numero, erreur in erreurs:
+        print(f"ERREUR  {numero} - {erreur}")
+    print(f"{nb_documents} document(s) parcouru(s) - {repertoire.compter()} client(s) - {len(erreurs)} erreur(s)")
+    repertoire.fermer()
+    store.fermer()
+    return 1 if erreurs else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
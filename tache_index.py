@@ -0,0 +1,108 @@
+"""
+Alimentation de la base des archives et des index d'auto-complétion en
+arrière-plan - tâches QThreadPool
+"""
+import threading
+import traceback
+
+from PyQt6.QtCore import QObject, QRunnable, pyqtSignal
+
+from archive_store import ArchiveStore
+
+
+class SignauxIndex(QObject):
+    """Signaux émis par une TacheIndex ou une TacheImportArchives (reçus dans le thread de l'interface)"""
+
+    # (nom de l'index, nombre de documents parcourus, nombre d'entrées de l'index)
+    termine = pyqtSignal(str, int, int)
+    # (nom de l'index, document ignoré : numéro ou fichier, erreur)
+    document_ignore = pyqtSignal(str, str, str)
+    # Nom de l'index, message d'erreur, trace complète
+    erreur = pyqtSignal(str, str, str)
+
+
+class TacheIndex(QRunnable):
+    """
+    Importe les archives dans un index (répertoire des clients, catalogue)
+    hors du thread de l'interface
+
+    Une connexion SQLite ne peut pas passer d'un thread à l'autre : la tâche
+    ouvre ses propres connexions à la base des archives et à l'index. Un
+    import interrompu (annulation, fermeture, erreur) laisse l'index marqué
+    comme nouveau : il est repris depuis un index vide au lancement suivant.
+
+    Args:
+        nom: Nom de l'index (pour les journaux)
+        ouvrir_index: Fonction sans argument qui ouvre l'index à alimenter
+                      (objet offrant importer_archives, vider, compter et fermer)
+        chemin_archives: Chemin de la base des archives
+    """
+
+    def __init__(self, nom, ouvrir_index, chemin_archives):
+        super().__init__()
+        self.nom = nom
+        self.ouvrir_index = ouvrir_index
+        self.chemin_archives = chemin_archives
+        self.signaux = SignauxIndex()
+        self._annulation = threading.Event()
+
+    def annuler(self):
+        """Demande l'arrêt de l'import avant la page suivante"""
+        self._annulation.set()
+
+    def run(self):
+        try:
+            store = ArchiveStore(self.chemin_archives)
+            try:
+                index = self.ouvrir_index()
+                try:
+                    # Les pages validées par un import interrompu seraient comptées deux fois
+                    index.vider()
+                    nb_documents, erreurs = index.importer_archives(store, interrompre=self._annulation.is_set)
+                    nb_entrees = index.compter()
+                finally:
+                    index.fermer()
+            finally:
+                store.fermer()
+        except Exception as e:
+            self.signaux.erreur.emit(self.nom, str(e), traceback.format_exc())
+            return
+        for numero, erreur in erreurs:
+            self.signaux.document_ignore.emit(self.nom, numero, erreur)
+        if not self._annulation.is_set():
+            self.signaux.termine.emit(self.nom, nb_documents, nb_entrees)
+
+
+class TacheImportArchives(TacheIndex):
+    """
+    Importe les fichiers d'archive d'un dossier dans la base des archives
+    hors du thread de l'interface (création de la base)
+
+    La base n'est marquée comme importée qu'une fois tous les fichiers lus :
+    un import interrompu est repris au lancement suivant.
+
+    Args:
+        nom: Nom de la base (pour les journaux)
+        dossier: Dossier des fichiers d'archive
+        chemin_archives: Chemin de la base des archives
+    """
+
+    def __init__(self, nom, dossier, chemin_archives):
+        super().__init__(nom, None, chemin_archives)
+        self.dossier = dossier
+
+    def run(self):
+        try:
+            store = ArchiveStore(self.chemin_archives)
+            try:
+                nb_importes, erreurs = store.importer_json(self.dossier, interrompre=self._annulation.is_set)
+                nb_documents = store.compter()
+            finally:
+                store.fermer()
+        except Exception as e:
+            self.signaux.erreur.emit(self.nom, str(e), traceback.format_exc())
+            return
+        for fichier, erreur in erreurs:
+            self.signaux.document_ignore.emit(self.nom, fichier, erreur)
+        if not self._annulation.is_set():
+            self.signaux.termine.emit(self.nom, nb_importes, nb_documents)
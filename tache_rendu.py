@@ -0,0 +1,164 @@
+"""
+Génération PDF en arrière-plan - tâche QThreadPool avec progression et annulation
+"""
+import os
+import threading
+import time
+import traceback
+
+from PyQt6.QtCore import QObject, QRunnable, QThreadPool, pyqtSignal
+
+from archive import ecrire_fichier_archive
+from instrumentation import CollecteurRendu
+
+
+# Avancement (%) atteint à la fin de chaque étape du rendu
+PROGRESSION_ETAPES = {
+    "cache": 5,
+    "entete": 10,
+    "infos_parties": 15,
+    "tableau_articles": 40,
+    "totaux": 45,
+    "build": 95,
+}
+
+# Libellé affiché pendant l'étape qui suit
+LIBELLES_ETAPES = {
+    "cache": "Préparation de l'en-tête...",
+    "entete": "Informations client...",
+    "infos_parties": "Tableau des articles...",
+    "tableau_articles": "Totaux...",
+    "totaux": "Mise en page du PDF...",
+    "build": "Archivage du document...",
+}
+
+
+class RenduAnnule(Exception):
+    """Levée dans la tâche lorsque l'utilisateur annule le rendu"""
+
+
+class SignauxRendu(QObject):
+    """Signaux émis par une TacheRendu (reçus dans le thread de l'interface)"""
+
+    # (pourcentage, libellé de l'étape suivante)
+    progression = pyqtSignal(int, str)
+    # CollecteurRendu contenant les mesures du rendu
+    termine = pyqtSignal(object)
+    # Message d'erreur, trace complète
+    erreur = pyqtSignal(str, str)
+    annule = pyqtSignal()
+
+
+class TacheRendu(QRunnable):
+    """
+    Génère le PDF d'un document et son archive hors du thread de l'interface
+
+    L'annulation est prise en compte à la fin de chaque étape du rendu et,
+    pendant la mise en page, après chaque élément placé. Le PDF est écrit
+    dans un fichier temporaire voisin, qui remplace le fichier demandé
+    seulement si le rendu aboutit : annulation ou erreur ne suppriment que
+    ce fichier temporaire.
+
+    Args:
+        generateur: PDFGenerator utilisé uniquement par le pool de rendu
+        document: Devis ou Facture à générer
+        fichier: Chemin du PDF à écrire
+        type_doc: "Devis" ou "Facture"
+        is_trial: True si version d'essai (ajoute un filigrane)
+        fichier_archive: Chemin de l'archive à écrire (optionnel)
+    """
+
+    def __init__(self, generateur, document, fichier, type_doc, is_trial=False, fichier_archive=None):
+        super().__init__()
+        self.generateur = generateur
+        self.document = document
+        self.fichier = fichier
+        self.type_doc = type_doc
+        self.is_trial = is_trial
+        self.fichier_archive = fichier_archive
+        # Durée de l'écriture de l'archive (secondes), hors des mesures du rendu PDF
+        self.duree_archive = 0.0
+        self.signaux = SignauxRendu()
+        self._annulation = threading.Event()
+
+    def annuler(self):
+        """Demande l'arrêt du rendu à la prochaine fin d'étape"""
+        self._annulation.set()
+
+    def _verifier_annulation(self):
+        if self._annulation.is_set():
+            raise RenduAnnule()
+
+    def _etape_terminee(self, mesure):
+        """Rappel de l'instrumentation : progression puis point d'annulation"""
+        self._pourcentage = PROGRESSION_ETAPES.get(mesure.etape, 0)
+        self.signaux.progression.emit(self._pourcentage, LIBELLES_ETAPES.get(mesure.etape, ""))
+        self._verifier_annulation()
+
+    def _avancement(self, etape, fraction):
+        """
+        Rappel pendant la mise en page : progression par élément placé
+
+        Le pourcentage est interpolé entre la fin de l'étape précédente et
+        celle de l'étape en cours ; l'annulation est vérifiée à chaque appel.
+        """
+        debut = self._pourcentage
+        fin = PROGRESSION_ETAPES.get(etape, debut)
+        pourcentage = debut + int((fin - debut) * fraction)
+        if pourcentage != self._dernier_emis:
+            self._dernier_emis = pourcentage
+            self.signaux.progression.emit(pourcentage, "")
+        self._verifier_annulation()
+
+    def run(self):
+        self._pourcentage = self._dernier_emis = 0
+        mesures = CollecteurRendu(rappel=self._etape_terminee, rappel_avancement=self._avancement)
+        # Rendu dans un fichier temporaire : un PDF existant n'est remplacé qu'en cas de succès
+        fichier_temporaire = f"{self.fichier}.tmp"
+        try:
+            self._verifier_annulation()
+            self.generateur.generer_pdf(self.document, fichier_temporaire, self.type_doc,
+                                        self.is_trial, mesures)
+            os.replace(fichier_temporaire, self.fichier)
+        except RenduAnnule:
+            self._supprimer(fichier_temporaire)
+            self.signaux.annule.emit()
+            return
+        except Exception as e:
+            self._supprimer(fichier_temporaire)
+            self.signaux.erreur.emit(str(e), traceback.format_exc())
+            return
+
+        if self.fichier_archive:
+            # Le PDF est complet : un échec de l'archive ne le supprime pas
+            try:
+                debut = time.perf_counter()
+                ecrire_fichier_archive(self.document, self.type_doc, self.fichier_archive)
+                self.duree_archive = time.perf_counter() - debut
+            except Exception as e:
+                self.signaux.erreur.emit(f"PDF écrit ({self.fichier}) mais archive non enregistrée: {e}",
+                                         traceback.format_exc())
+                return
+        self.signaux.progression.emit(100, "")
+        self.signaux.termine.emit(mesures)
+
+    @staticmethod
+    def _supprimer(fichier):
+        """Supprime le fichier temporaire d'un rendu annulé ou en échec"""
+        if os.path.exists(fichier):
+            try:
+                os.remove(fichier)
+            except OSError:
+                pass
+
+
+def creer_pool_rendu() -> QThreadPool:
+    """
+    Pool dédié au rendu PDF
+
+    Un seul thread : le PDFGenerator (et son cache de logos) n'est jamais
+    utilisé par deux rendus en même temps.
+    """
+    pool = QThreadPool()
+    pool.setMaxThreadCount(1)
+    return pool
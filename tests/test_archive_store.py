@@ -0,0 +1,77 @@
+"""
+Tests de la base des archives (filtres de date et de client)
+
+Lancement : python -m unittest discover tests
+"""
+import os
+import tempfile
+import unittest
+from datetime import date, datetime
+from decimal import Decimal
+
+from archive_store import ArchiveStore
+from models import Article, Client, Entreprise, Facture
+
+
+ENTREPRISE = Entreprise(nom="Atelier Test", adresse="1 rue de la Paix", code_postal="75001", ville="Paris")
+
+
+def facture(numero, date_document):
+    return Facture(numero=numero, date=date_document, client=Client(nom="Dupont"), entreprise=ENTREPRISE,
+                   articles=[Article("Prestation", 1, Decimal("100"))])
+
+
+class TestFiltresDate(unittest.TestCase):
+
+    def setUp(self):
+        self.dossier = tempfile.TemporaryDirectory()
+        self.store = ArchiveStore(os.path.join(self.dossier.name, "archives.db"))
+        self.store.enregistrer(facture("F1", datetime(2024, 3, 14, 9, 0)), "Facture")
+        self.store.enregistrer(facture("F2", datetime(2024, 3, 15, 17, 45)), "Facture")
+        self.store.enregistrer(facture("F3", datetime(2024, 3, 16, 0, 0)), "Facture")
+
+    def tearDown(self):
+        self.store.fermer()
+        self.dossier.cleanup()
+
+    def numeros(self, **filtres):
+        return sorted(document.numero for document in self.store.lister(**filtres))
+
+    def test_jour_de_fin_inclus(self):
+        # Un document du jour de fin, quelle que soit son heure, est retenu
+        self.assertEqual(self.numeros(date_fin=date(2024, 3, 15)), ["F1", "F2"])
+        self.assertEqual(self.numeros(date_fin=datetime(2024, 3, 15)), ["F1", "F2"])
+        self.assertEqual(self.store.compter(date_fin=date(2024, 3, 15)), 2)
+
+    def test_intervalle_d_un_jour(self):
+        self.assertEqual(self.numeros(date_debut=date(2024, 3, 15), date_fin=date(2024, 3, 15)), ["F2"])
+
+
+class TestFiltreClient(unittest.TestCase):
+
+    def setUp(self):
+        self.dossier = tempfile.TemporaryDirectory()
+        self.store = ArchiveStore(os.path.join(self.dossier.name, "archives.db"))
+        for numero, nom in (("F1", "Dupont"), ("F2", "dupont_sarl"), ("F3", "Dup%"), ("F4", "Martin")):
+            document = facture(numero, datetime(2024, 3, 15))
+            document.client = Client(nom=nom)
+            self.store.enregistrer(document, "Facture")
+
+    def tearDown(self):
+        self.store.fermer()
+        self.dossier.cleanup()
+
+    def numeros(self, client):
+        return sorted(document.numero for document in self.store.lister(client=client))
+
+    def test_prefixe_sans_casse(self):
+        self.assertEqual(self.numeros("DUP"), ["F1", "F2", "F3"])
+
+    def test_jokers_pris_litteralement(self):
+        self.assertEqual(self.numeros("Dup%"), ["F3"])
+        self.assertEqual(self.numeros("dupont_"), ["F2"])
+        self.assertEqual(self.store.compter(client="%"), 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,50 @@
+"""
+Tests du cache de rendu (clé de cache)
+
+Lancement : python -m unittest discover tests
+"""
+import tempfile
+import unittest
+from datetime import datetime
+from decimal import Decimal
+
+from cache_rendu import CacheRendu
+from models import Article, Client, Entreprise, Facture
+
+
+ENTREPRISE = Entreprise(nom="Atelier Test", adresse="1 rue de la Paix", code_postal="75001", ville="Paris")
+
+
+class TestCleCache(unittest.TestCase):
+
+    def setUp(self):
+        self.dossier = tempfile.TemporaryDirectory()
+        self.cache = CacheRendu(self.dossier.name)
+        self.article = Article("Prestation", 1, Decimal("10.00"))
+        self.facture = Facture(numero="F1", date=datetime(2024, 3, 15), client=Client(nom="Dupont"),
+                               articles=[self.article], entreprise=ENTREPRISE)
+
+    def tearDown(self):
+        self.dossier.cleanup()
+
+    def cle(self):
+        return self.cache.cle(self.facture, "Facture", False)
+
+    def test_cle_stable(self):
+        self.assertEqual(self.cle(), self.cle())
+
+    def test_cle_change_avec_les_articles(self):
+        cle = self.cle()
+        self.article.quantite = 2
+        cle_quantite = self.cle()
+        self.assertNotEqual(cle_quantite, cle)
+        # Valeur égale mais affichée différemment sur le PDF : 10.00 -> 10.0
+        self.article.prix_unitaire = Decimal("10.0")
+        self.assertNotEqual(self.cle(), cle_quantite)
+
+    def test_cle_change_avec_le_mode_essai(self):
+        self.assertNotEqual(self.cle(), self.cache.cle(self.facture, "Facture", True))
+
+
+if __name__ == "__main__":
+    unittest.main()
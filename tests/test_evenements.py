@@ -0,0 +1,38 @@
+"""
+Tests des statistiques du journal d'événements (percentiles)
+
+Lancement : python -m unittest discover tests
+"""
+import unittest
+
+from evenements import StatistiquesEvenement
+
+
+def statistiques(durees):
+    stats = StatistiquesEvenement()
+    for duree in durees:
+        stats.ajouter({"evenement": "pdf_genere", "duree_ms": duree})
+    return stats
+
+
+class TestPercentiles(unittest.TestCase):
+
+    def test_interpolation_dans_la_classe(self):
+        # Classes de l'histogramme : ]1, 5] (3 durées) et ]5, 10] (4 durées)
+        stats = statistiques([2, 3, 4, 6, 7, 8, 9, 20, 600, 700])
+        self.assertAlmostEqual(stats.percentile_ms(50), 7.5)
+        self.assertAlmostEqual(stats.percentile_ms(10), 1 + 4 / 3)
+        # Dernière classe fermée par le maximum observé
+        self.assertAlmostEqual(stats.percentile_ms(95), 650.0)
+        self.assertEqual(stats.percentile_ms(100), 700.0)
+
+    def test_plafond_au_maximum(self):
+        stats = statistiques([2, 2, 2])
+        self.assertLessEqual(stats.percentile_ms(99), 2.0)
+
+    def test_sans_duree(self):
+        self.assertIsNone(StatistiquesEvenement().percentile_ms(50))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,141 @@
+"""
+Tests de l'import en masse (regroupement, en-têtes, nombres, doublons)
+
+Lancement : python -m unittest discover tests
+"""
+import os
+import tempfile
+import unittest
+from decimal import Decimal
+
+from archive_store import ArchiveStore
+from import_masse import (ErreurImport, ImportMasse, _decimal, construire_document,
+                          grouper_par_document, lire_csv, normaliser_colonne)
+from models import Entreprise
+
+
+ENTREPRISE = Entreprise(nom="Atelier Test", adresse="1 rue de la Paix", code_postal="75001", ville="Paris")
+
+
+def ligne(numero_ligne, numero, designation="Prestation", type_doc="facture", **valeurs):
+    return numero_ligne, {"type": type_doc, "numero": numero, "date": "15/03/2024", "client_nom": "Dupont",
+                          "designation": designation, "quantite": "1", "prix_unitaire": "100", **valeurs}
+
+
+class TestColonnes(unittest.TestCase):
+
+    def test_alias_et_accents(self):
+        self.assertEqual(normaliser_colonne("N° facture"), "numero")
+        self.assertEqual(normaliser_colonne("Numéro"), "numero")
+        self.assertEqual(normaliser_colonne("Qté"), "quantite")
+        self.assertEqual(normaliser_colonne("Prix HT"), "prix_unitaire")
+        self.assertEqual(normaliser_colonne("Taux TVA"), "tva")
+        self.assertEqual(normaliser_colonne("Code-Postal"), "client_code_postal")
+        self.assertEqual(normaliser_colonne(None), "")
+
+    def test_entete_incomplete(self):
+        with tempfile.TemporaryDirectory() as dossier:
+            chemin = os.path.join(dossier, "import.csv")
+            with open(chemin, "w", encoding="utf-8") as f:
+                f.write("numero;date;designation;quantite\n1;01/01/2024;A;1\n")
+            with self.assertRaises(ErreurImport) as contexte:
+                list(lire_csv(chemin))
+            self.assertIn("prix_unitaire", contexte.exception.message)
+
+    def test_lecture_csv_separateur_detecte(self):
+        with tempfile.TemporaryDirectory() as dossier:
+            chemin = os.path.join(dossier, "import.csv")
+            with open(chemin, "w", encoding="utf-8") as f:
+                f.write("N° facture,Date,Client,Article,Qte,Prix\n"
+                        "F1,01/01/2024,Dupont,A,1,10\n"
+                        ",,,,,\n"
+                        "F1,01/01/2024,Dupont,B,2,5\n")
+            lignes = list(lire_csv(chemin))
+        self.assertEqual([numero for numero, _ in lignes], [2, 4])
+        self.assertEqual(lignes[1][1]["designation"], "B")
+
+
+class TestNombres(unittest.TestCase):
+
+    def test_formats_francais(self):
+        self.assertEqual(_decimal("1 234,50", "prix"), Decimal("1234.50"))
+        self.assertEqual(_decimal("1 234,5 €", "prix"), Decimal("1234.5"))
+        self.assertEqual(_decimal("5,5%", "TVA"), Decimal("5.5"))
+        self.assertEqual(_decimal("12.125", "prix"), Decimal("12.125"))
+
+    def test_valeurs_excel(self):
+        self.assertEqual(_decimal(0.1, "prix"), Decimal("0.1"))
+        self.assertEqual(_decimal(3, "quantité"), Decimal("3"))
+
+    def test_valeurs_invalides(self):
+        for valeur in ("", "abc", "1,2,3", "NaN", "inf", True):
+            with self.subTest(valeur=valeur), self.assertRaises(ValueError):
+                _decimal(valeur, "prix")
+
+
+class TestRegroupement(unittest.TestCase):
+
+    def test_lignes_consecutives(self):
+        groupes = list(grouper_par_document([
+            ligne(2, "F1", "A"), ligne(3, "F1", "B"), ligne(4, "F2", "C"), ligne(5, "F1", "D", type_doc="devis"),
+        ]))
+        self.assertEqual([[numero for numero, _ in groupe] for groupe in groupes], [[2, 3], [4], [5]])
+
+    def test_document_construit(self):
+        document, type_doc = construire_document([ligne(2, "F1", "A"), ligne(3, "F1", "B", tva="5,5")], ENTREPRISE)
+        self.assertEqual(type_doc, "Facture")
+        self.assertEqual([article.designation for article in document.articles], ["A", "B"])
+        self.assertEqual(document.articles[1].tva, Decimal("5.5"))
+
+    def test_document_rejete_en_entier(self):
+        document, erreurs = construire_document([ligne(2, "F1"), ligne(3, "F1", quantite="x")], ENTREPRISE)
+        self.assertIsNone(document)
+        self.assertEqual([erreur.ligne for erreur in erreurs], [3])
+
+
+class TestDoublons(unittest.TestCase):
+
+    def setUp(self):
+        self.dossier = tempfile.TemporaryDirectory()
+        self.store = ArchiveStore(os.path.join(self.dossier.name, "archives.db"))
+
+    def tearDown(self):
+        self.store.fermer()
+        self.dossier.cleanup()
+
+    def test_numero_repete_dans_le_lot(self):
+        rapport = ImportMasse(self.store, ENTREPRISE).importer([
+            ligne(2, "F1", "A"), ligne(3, "F2", "B"), ligne(4, "F1", "C"), ligne(5, "F1", "C", type_doc="devis"),
+        ])
+        self.assertEqual((rapport.nb_documents, rapport.nb_documents_rejetes), (3, 1))
+        self.assertEqual(rapport.erreurs[0].ligne, 4)
+        self.assertIn("ligne 2", rapport.erreurs[0].message)
+        document, _ = self.store.charger_numero("F1", "Facture")
+        self.assertEqual([article.designation for article in document.articles], ["A"])
+
+    def test_numero_repete_apres_ecriture_du_lot(self):
+        rapport = ImportMasse(self.store, ENTREPRISE, taille_lot=2).importer([
+            ligne(2, "F1", "A"), ligne(3, "F2", "B"), ligne(4, "F1", "C"),
+        ])
+        self.assertEqual((rapport.nb_documents, rapport.nb_documents_rejetes), (2, 1))
+        self.assertIn("archives", rapport.erreurs[0].message)
+        document, _ = self.store.charger_numero("F1", "Facture")
+        self.assertEqual([article.designation for article in document.articles], ["A"])
+
+    def test_numero_deja_archive(self):
+        ImportMasse(self.store, ENTREPRISE).importer([ligne(2, "F1", "A")])
+        rapport = ImportMasse(self.store, ENTREPRISE).importer([ligne(2, "F1", "B"), ligne(3, "F2", "C")])
+        self.assertEqual((rapport.nb_documents, rapport.nb_documents_rejetes), (1, 1))
+        self.assertIn("archives", rapport.erreurs[0].message)
+        document, _ = self.store.charger_numero("F1", "Facture")
+        self.assertEqual(document.articles[0].designation, "A")
+
+    def test_verification_sans_ecriture(self):
+        rapport = ImportMasse(self.store, ENTREPRISE).importer([ligne(2, "F1"), ligne(3, "F2"), ligne(4, "F1")],
+                                                               verifier_seulement=True)
+        self.assertEqual((rapport.nb_documents, rapport.nb_documents_rejetes), (2, 1))
+        self.assertEqual(self.store.compter(), 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,40 @@
+"""
+Tests des modèles (totaux des documents)
+
+Lancement : python -m unittest discover tests
+"""
+import unittest
+from datetime import datetime
+from decimal import Decimal
+
+from models import Article, Client, Devis, Entreprise
+
+
+ENTREPRISE = Entreprise(nom="Atelier Test", adresse="1 rue de la Paix", code_postal="75001", ville="Paris")
+
+
+class TestTotaux(unittest.TestCase):
+
+    def setUp(self):
+        self.article = Article("Prestation", 1, Decimal("10"), Decimal("20"))
+        self.devis = Devis(numero="D1", date=datetime(2024, 3, 15), client=Client(nom="Dupont"),
+                           articles=[self.article], entreprise=ENTREPRISE)
+
+    def test_totaux_apres_modification_de_la_quantite(self):
+        self.assertEqual(self.devis.get_total_ttc(), Decimal("12"))
+        self.article.quantite = 5
+        self.assertEqual(self.article.get_montant_ht(), Decimal("50"))
+        self.assertEqual(self.devis.get_total_ht(), Decimal("50"))
+        self.assertEqual(self.devis.get_total_ttc(), Decimal("60"))
+        self.assertEqual(self.devis.get_tva_par_taux()[Decimal("20")]["montant"], Decimal("10"))
+
+    def test_totaux_apres_modification_de_la_liste(self):
+        self.devis.get_totaux()
+        self.devis.articles.append(Article("Déplacement", 2, Decimal("15"), Decimal("10")))
+        self.assertEqual(self.devis.get_total_ttc(), Decimal("45"))
+        del self.devis.articles[0]
+        self.assertEqual(self.devis.get_total_ttc(), Decimal("33"))
+
+
+if __name__ == "__main__":
+    unittest.main()